@@ -2,7 +2,9 @@ from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from pymongo import MongoClient
+import atexit
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,6 +15,46 @@ def create_app():
     # Configuration
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET', 'your-secret-key-change-in-production')
     app.config['MONGODB_URI'] = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/codds')
+    app.config['ANALYSIS_CACHE_SIZE'] = int(os.getenv('ANALYSIS_CACHE_SIZE', 1024))
+    app.config['ANALYSIS_CACHE_SHARED'] = os.getenv('ANALYSIS_CACHE_SHARED', 'False').lower() == 'true'
+    app.config['ANALYSIS_CACHE_TTL'] = int(os.getenv('ANALYSIS_CACHE_TTL', 86400))
+    app.config['ANALYSIS_POOL_SIZE'] = int(os.getenv('ANALYSIS_POOL_SIZE', 0))
+    app.config['ANALYSIS_POOL_MAX_QUEUE'] = int(os.getenv('ANALYSIS_POOL_MAX_QUEUE', 32))
+    app.config['ANALYSIS_TASK_TIMEOUT'] = float(os.getenv('ANALYSIS_TASK_TIMEOUT', 30))
+    app.config['INCREMENTAL_MAX_DRAFTS'] = int(os.getenv('INCREMENTAL_MAX_DRAFTS', 256))
+    app.config['INCREMENTAL_SHARED'] = os.getenv('INCREMENTAL_SHARED', 'True').lower() == 'true'
+    app.config['INCREMENTAL_TTL'] = int(os.getenv('INCREMENTAL_TTL', 86400))
+    app.config['ANALYSIS_INLINE_MAX_CHARS'] = int(os.getenv('ANALYSIS_INLINE_MAX_CHARS', 2000))
+    app.config['JOB_WORKERS'] = int(os.getenv('JOB_WORKERS', 2))
+    app.config['JOB_WORKERS_AUTOSTART'] = os.getenv('JOB_WORKERS_AUTOSTART', 'False').lower() == 'true'
+    app.config['JOB_MAX_QUEUED'] = int(os.getenv('JOB_MAX_QUEUED', 1000))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    app.config['JOB_LEASE_SECONDS'] = int(os.getenv('JOB_LEASE_SECONDS', 120))
+    app.config['JOB_RETENTION_SECONDS'] = int(os.getenv('JOB_RETENTION_SECONDS', 7 * 86400))
+    app.config['TIMING_SAMPLE_RATE'] = float(os.getenv('TIMING_SAMPLE_RATE', 1.0))
+    app.config['MONGO_ENSURE_INDEXES'] = os.getenv('MONGO_ENSURE_INDEXES', 'True').lower() == 'true'
+    app.config['ADMISSION_MAX_INFLIGHT_CHARS'] = int(os.getenv('ADMISSION_MAX_INFLIGHT_CHARS', 2000000))
+    app.config['ADMISSION_SMALL_REQUEST_CHARS'] = int(os.getenv('ADMISSION_SMALL_REQUEST_CHARS', 20000))
+    app.config['ADMISSION_LARGE_SHARE'] = float(os.getenv('ADMISSION_LARGE_SHARE', 0.5))
+    app.config['ADMISSION_MAX_QUEUE'] = int(os.getenv('ADMISSION_MAX_QUEUE', 64))
+    app.config['ADMISSION_MAX_WAIT'] = float(os.getenv('ADMISSION_MAX_WAIT', 2.0))
+    app.config['RATE_LIMIT_BACKEND'] = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+    app.config['RATE_LIMIT_SHM_PATH'] = os.getenv(
+        'RATE_LIMIT_SHM_PATH', os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'codds-rate-limits')
+    )
+    app.config['RATE_LIMIT_SHM_SLOTS'] = int(os.getenv('RATE_LIMIT_SHM_SLOTS', 65536))
+    app.config['RATE_LIMIT_BATCH_SIZE'] = int(os.getenv('RATE_LIMIT_BATCH_SIZE', 10))
+    app.config['RATE_LIMIT_FLUSH_SECONDS'] = float(os.getenv('RATE_LIMIT_FLUSH_SECONDS', 1.0))
+    app.config['ADMIN_CACHE_TTL'] = float(os.getenv('ADMIN_CACHE_TTL', 15))
+    app.config['ADMIN_CACHE_INVALIDATE_ON_WRITE'] = os.getenv('ADMIN_CACHE_INVALIDATE_ON_WRITE', 'False').lower() == 'true'
+    app.config['WRITE_BEHIND'] = os.getenv('WRITE_BEHIND', 'False').lower() == 'true'
+    app.config['WRITE_BEHIND_DIR'] = os.getenv(
+        'WRITE_BEHIND_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'write_behind'))
+    )
+    app.config['WRITE_BEHIND_FLUSH_MS'] = int(os.getenv('WRITE_BEHIND_FLUSH_MS', 200))
+    app.config['WRITE_BEHIND_BATCH'] = int(os.getenv('WRITE_BEHIND_BATCH', 100))
+    app.config['WRITE_BEHIND_MAX_PENDING'] = int(os.getenv('WRITE_BEHIND_MAX_PENDING', 10000))
+    app.config['WRITE_BEHIND_FSYNC'] = os.getenv('WRITE_BEHIND_FSYNC', 'False').lower() == 'true'
     
     # Initialize extensions
     CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -26,6 +68,84 @@ def create_app():
     except Exception as e:
         print(f"MongoDB connection error: {e}")
     
+    # Analysis result cache (in-process LRU, optionally backed by Mongo)
+    from app.utils.result_cache import ResultCache
+    shared_cache = app.db.analysis_cache if app.config['ANALYSIS_CACHE_SHARED'] and hasattr(app, 'db') else None
+    app.result_cache = ResultCache(
+        max_entries=app.config['ANALYSIS_CACHE_SIZE'],
+        collection=shared_cache,
+        ttl_seconds=app.config['ANALYSIS_CACHE_TTL']
+    )
+    
+    # Short-lived cache of admin dashboard responses (0 seconds = disabled)
+    from app.utils.admin_cache import ResponseCache
+    app.admin_cache = ResponseCache(
+        ttl_seconds=app.config['ADMIN_CACHE_TTL'],
+        invalidate_on_write=app.config['ADMIN_CACHE_INVALIDATE_ON_WRITE']
+    )
+    
+    # Process pool for CPU-bound analysis (0 workers = analyze inline)
+    from app.utils.analysis_executor import AnalysisExecutor
+    app.analysis_executor = AnalysisExecutor(
+        workers=app.config['ANALYSIS_POOL_SIZE'],
+        max_queue=app.config['ANALYSIS_POOL_MAX_QUEUE'],
+        timeout=app.config['ANALYSIS_TASK_TIMEOUT'],
+        inline_max_chars=app.config['ANALYSIS_INLINE_MAX_CHARS']
+    )
+    
+    # Cost-based admission control in front of the analysis routes (0 chars = disabled)
+    from app.utils.admission import AdmissionController
+    app.admission = AdmissionController(
+        max_cost=app.config['ADMISSION_MAX_INFLIGHT_CHARS'],
+        small_request_cost=app.config['ADMISSION_SMALL_REQUEST_CHARS'],
+        large_share=app.config['ADMISSION_LARGE_SHARE'],
+        max_queue=app.config['ADMISSION_MAX_QUEUE'],
+        max_wait=app.config['ADMISSION_MAX_WAIT']
+    )
+    
+    # Rate limit store for @rate_limit: per process (memory), per host (shared) or fleet-wide (mongo)
+    from app.utils.rate_limiter import rate_limiter, SharedMemoryRateLimiter, MongoRateLimiter
+    if app.config['RATE_LIMIT_BACKEND'] == 'shared':
+        app.rate_limiter = SharedMemoryRateLimiter(
+            app.config['RATE_LIMIT_SHM_PATH'], slots=app.config['RATE_LIMIT_SHM_SLOTS']
+        )
+    elif app.config['RATE_LIMIT_BACKEND'] == 'mongo' and hasattr(app, 'db'):
+        app.rate_limiter = MongoRateLimiter(
+            app.db.rate_limits,
+            batch_size=app.config['RATE_LIMIT_BATCH_SIZE'],
+            flush_interval=app.config['RATE_LIMIT_FLUSH_SECONDS']
+        )
+    else:
+        app.rate_limiter = rate_limiter
+    
+    # Warm the analyzer (patterns compiled at import, first-call costs paid here)
+    from app.utils.ai_analyzer import OriginallityAnalyzer
+    OriginallityAnalyzer.warm_up()
+    
+    # Per-draft paragraph statistics for incremental re-analysis (paragraph stats shared via Mongo)
+    from app.utils.incremental_analyzer import IncrementalAnalyzer
+    shared_paragraphs = app.db.paragraph_stats if app.config['INCREMENTAL_SHARED'] and hasattr(app, 'db') else None
+    app.incremental_analyzer = IncrementalAnalyzer(
+        max_drafts=app.config['INCREMENTAL_MAX_DRAFTS'],
+        collection=shared_paragraphs
+    )
+    
+    # Request timing spans (Server-Timing header + in-process histograms)
+    from app.utils.timing import TimingHistograms, install_request_timing
+    app.timing_histograms = TimingHistograms()
+    if app.config['TIMING_SAMPLE_RATE'] > 0:
+        install_request_timing(app, app.timing_histograms, sample_rate=app.config['TIMING_SAMPLE_RATE'])
+    
+    # Create any missing indexes from the manifest in app/models/indexes.py
+    if app.config['MONGO_ENSURE_INDEXES'] and hasattr(app, 'db'):
+        from app.models.indexes import apply_indexes, index_manifest
+        try:
+            for result in apply_indexes(app.db, index_manifest(app.config)):
+                if result['status'] in ('error', 'conflict'):
+                    print(f"Index {result['collection']}.{result['index']} error: {result['error']}")
+        except Exception as e:
+            print(f"Index setup error: {e}")
+    
     # Register blueprints
     from app.routes import auth_routes, analyze_routes, admin_routes
     
@@ -33,4 +153,34 @@ def create_app():
     app.register_blueprint(analyze_routes.bp)
     app.register_blueprint(admin_routes.bp)
     
+    # Maintenance commands (flask --app run <command>)
+    from app.cli import register_commands
+    register_commands(app)
+    
+    # Background workers draining the async analysis job queue. Only server processes
+    # start them (gunicorn.conf.py, run.py), so CLI commands never claim jobs
+    if app.config['JOB_WORKERS'] > 0 and hasattr(app, 'db'):
+        from app.utils.job_worker import JobWorkerPool
+        app.job_workers = JobWorkerPool(
+            app,
+            workers=app.config['JOB_WORKERS'],
+            lease_seconds=app.config['JOB_LEASE_SECONDS'],
+            max_attempts=app.config['JOB_MAX_ATTEMPTS']
+        )
+        if app.config['JOB_WORKERS_AUTOSTART']:
+            app.job_workers.start()
+    
+    # Optional write-behind buffer batching report inserts and user counter updates
+    if app.config['WRITE_BEHIND'] and hasattr(app, 'db'):
+        from app.utils.write_behind import WriteBehindBuffer
+        app.write_behind = WriteBehindBuffer(
+            app.config['WRITE_BEHIND_DIR'],
+            flush_interval=app.config['WRITE_BEHIND_FLUSH_MS'] / 1000.0,
+            max_items=app.config['WRITE_BEHIND_BATCH'],
+            max_pending=app.config['WRITE_BEHIND_MAX_PENDING'],
+            fsync=app.config['WRITE_BEHIND_FSYNC']
+        )
+        app.write_behind.start(app)
+        atexit.register(app.write_behind.stop, app)
+    
     return app
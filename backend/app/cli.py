@@ -0,0 +1,138 @@
+import time
+import click
+
+
+def register_commands(app):
+    """Register the app's maintenance commands with `flask`"""
+
+    @app.cli.command('known-texts-build')
+    def known_texts_build():
+        """Rebuild the known-text shingle index from the reference texts"""
+        from app.utils.ai_analyzer import KNOWN_TEXTS, KNOWN_TEXTS_DIR, KNOWN_TEXTS_INDEX_DIR
+        from app.utils.known_texts import KnownTextIndex
+
+        index = KnownTextIndex.rebuild(KNOWN_TEXTS_DIR, KNOWN_TEXTS_INDEX_DIR)
+        KNOWN_TEXTS.reset()
+        click.echo(f"Indexed {len(index)} shingles from {len(index.names)} texts into {KNOWN_TEXTS_INDEX_DIR}")
+
+    @app.cli.command('scoring-model-train')
+    @click.argument('corpus', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--output', type=click.Path(dir_okay=False), default=None,
+                  help='Weights file to write (default: SCORING_MODEL_PATH)')
+    @click.option('--regularization', type=float, default=1.0, show_default=True,
+                  help='Inverse regularization strength (C) of the logistic regression')
+    @click.option('--holdout', type=float, default=0.2, show_default=True,
+                  help='Fraction of the corpus held out to report accuracy')
+    @click.option('--seed', type=int, default=0, show_default=True)
+    def scoring_model_train(corpus, output, regularization, holdout, seed):
+        """Train the originality weights from a labeled JSON-lines corpus"""
+        import numpy as np
+        from app.utils.ai_analyzer import OriginallityAnalyzer, SCORING_MODEL_PATH
+        from app.utils.scoring_model import ScoringModel, signal_row
+
+        rows = []
+        labels = []
+        for text, label in ScoringModel.read_corpus(corpus):
+            if len(text.strip()) < 10 or OriginallityAnalyzer.check_special_cases(text):
+                continue
+            features = OriginallityAnalyzer.extract_features(text)
+            fingerprint = OriginallityAnalyzer.get_style_fingerprint(text, features)
+            rows.append(signal_row(OriginallityAnalyzer.extract_signals(text, fingerprint, features)))
+            labels.append(label)
+        if len(set(labels)) < 2:
+            raise click.ClickException('The corpus needs both "ai" and "human" samples')
+
+        signals = np.asarray(rows, dtype=np.float64)
+        labels = np.asarray(labels)
+        order = np.random.default_rng(seed).permutation(len(labels))
+        held_out = order[:int(len(labels) * holdout)]
+        train = order[len(held_out):]
+        if len(held_out) and len(set(labels[train])) == 2:
+            model = ScoringModel.train(signals[train], labels[train], regularization)
+            click.echo(f"Held-out accuracy: {model.accuracy(signals[held_out], labels[held_out]):.3f} "
+                       f"({len(held_out)} samples)")
+
+        model = ScoringModel.train(signals, labels, regularization)
+        output = output or SCORING_MODEL_PATH
+        model.save(output)
+        click.echo(f"Trained on {len(labels)} samples (training accuracy {model.accuracy(signals, labels):.3f}); "
+                   f"wrote model {model.version} to {output}")
+        click.echo('Restart the workers to load it.')
+
+    @app.cli.command('reports-rescore')
+    @click.option('--workers', type=int, default=2, show_default=True,
+                  help='Analysis worker processes (0 analyzes inline)')
+    @click.option('--batch-size', type=int, default=200, show_default=True)
+    @click.option('--partitions', type=int, default=8, show_default=True,
+                  help='_id ranges the collection is split into for checkpointing')
+    @click.option('--max-rate', type=float, default=0, show_default=True,
+                  help='Reports re-scored per second at most (0 for no limit)')
+    @click.option('--include-previews', is_flag=True,
+                  help='Also re-score reports whose stored content is a truncated preview, from that preview')
+    @click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and start over')
+    def reports_rescore(workers, batch_size, partitions, max_rate, include_previews, restart):
+        """Re-score stored reports with the current analyzer version (resumable)"""
+        from app.utils.ai_analyzer import ANALYZER_VERSION
+        from app.utils.rescorer import ReportRescorer
+
+        rescorer = ReportRescorer(workers, batch_size, partitions, max_rate, rescore_previews=include_previews)
+        last_echo = [0.0]
+
+        def progress(totals):
+            if time.monotonic() - last_echo[0] >= 5:
+                last_echo[0] = time.monotonic()
+                click.echo(f"scanned {totals['scanned']}, rescored {totals['rescored']}, skipped {totals['skipped']}")
+
+        totals = rescorer.run(restart=restart, progress=progress)
+        click.echo(f"Done ({ANALYZER_VERSION}): scanned {totals['scanned']}, "
+                   f"rescored {totals['rescored']}, skipped {totals['skipped']}")
+        if totals['rescored']:
+            from app.models.analytics import AnalyticsRollup
+            click.echo(f"Rebuilt analytics rollups for {AnalyticsRollup.rebuild()} days")
+
+    @app.cli.command('analytics-backfill')
+    def analytics_backfill():
+        """Rebuild the per-day analytics rollups from the reports collection"""
+        from app.models.analytics import AnalyticsRollup
+
+        click.echo(f"Rebuilt analytics rollups for {AnalyticsRollup.rebuild()} days")
+
+    @app.cli.command('indexes-apply')
+    def indexes_apply():
+        """Create missing MongoDB indexes from the index manifest (idempotent)"""
+        from app.models.indexes import apply_indexes, index_manifest
+
+        failed = False
+        for result in apply_indexes(app.db, index_manifest(app.config)):
+            line = f"{result['status']:>8}  {result['collection']}.{result['index']}"
+            if 'error' in result:
+                failed = True
+                line += f"  ({result['error']})"
+            click.echo(line)
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.command('indexes-verify')
+    @click.option('--strict', is_flag=True, help='Exit with status 1 if any query is not index-backed')
+    def indexes_verify(strict):
+        """Explain every model query and report the ones that scan or sort in memory"""
+        from app.models.indexes import index_manifest, index_name, verify_queries
+
+        missing = [
+            f"{spec['collection']}.{index_name(spec['keys'])}"
+            for spec in index_manifest(app.config)
+            if index_name(spec['keys']) not in app.db[spec['collection']].index_information()
+        ]
+        for name in missing:
+            click.echo(f"missing index  {name}")
+
+        unindexed = 0
+        for entry in verify_queries(app.db):
+            flag = '  ' if entry['plan'] in ('index', 'covered') else '!!'
+            if flag == '!!':
+                unindexed += 1
+            detail = entry.get('error') or ' > '.join(entry['stages'])
+            click.echo(f"{flag} {entry['plan']:<16} {entry['query']}  [{detail}]")
+        click.echo(f"{unindexed} queries not index-backed, {len(missing)} manifest indexes missing")
+        if strict and (unindexed or missing):
+            raise SystemExit(1)
@@ -0,0 +1,156 @@
+from flask import current_app
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+# Originality bands counted per day: (field, lowest score in the band)
+SCORE_BUCKETS = (
+    ('highly_original', 80),
+    ('original', 50),
+    ('mixed', 20),
+    ('low_original', float('-inf'))
+)
+
+
+def score_bucket(score):
+    """Name of the originality band a score falls in"""
+    for name, lowest in SCORE_BUCKETS:
+        if score >= lowest:
+            return name
+
+
+class AnalyticsRollup:
+    """Per-day report statistics in the analytics_daily collection
+
+    One small document per UTC day (_id "YYYY-MM-DD") holds the report
+    count, the score sum (for averages), the lowest and highest score
+    and a count per SCORE_BUCKETS band. Reports are folded in with $inc
+    as they are created and subtracted when deleted, so the admin
+    dashboard reads one document per day instead of scanning reports.
+    A deleted report's score can't be taken back out of min_score /
+    max_score; those are the extremes of every report recorded that day.
+
+    `rebuild` recomputes every day from the reports collection: run it
+    once to backfill, and after bulk changes such as re-scoring.
+    """
+
+    @staticmethod
+    def day_key(created_at):
+        """Rollup _id of the day a report was created on"""
+        return created_at.strftime('%Y-%m-%d')
+
+    @staticmethod
+    def apply(added=(), removed=()):
+        """Fold (created_at, originality_score) pairs into the rollups; removed pairs are subtracted
+
+        Rollup failures are logged rather than raised so they never fail
+        the report write; `rebuild` repairs any drift.
+        """
+        days = {}
+        for sign, pairs in ((1, added), (-1, removed)):
+            for created_at, score in pairs:
+                score = score or 0
+                key = AnalyticsRollup.day_key(created_at)
+                day = days.setdefault(key, {'inc': {}, 'min': None, 'max': None})
+                inc = day['inc']
+                inc['count'] = inc.get('count', 0) + sign
+                inc['score_sum'] = inc.get('score_sum', 0) + sign * score
+                bucket = score_bucket(score)
+                inc[bucket] = inc.get(bucket, 0) + sign
+                if sign > 0:
+                    day['min'] = score if day['min'] is None else min(day['min'], score)
+                    day['max'] = score if day['max'] is None else max(day['max'], score)
+        if not days:
+            return
+
+        updates = []
+        for key, day in days.items():
+            update = {
+                '$inc': day['inc'],
+                '$setOnInsert': {'date': datetime.strptime(key, '%Y-%m-%d')}
+            }
+            if day['min'] is not None:
+                update['$min'] = {'min_score': day['min']}
+                update['$max'] = {'max_score': day['max']}
+            updates.append(UpdateOne({'_id': key}, update, upsert=True))
+        try:
+            current_app.db.analytics_daily.bulk_write(updates, ordered=False)
+        except PyMongoError as e:
+            print(f"Analytics rollup error: {e}")
+
+    @staticmethod
+    def record(reports):
+        """Add newly inserted report documents to the rollups"""
+        AnalyticsRollup.apply(added=[
+            (report['created_at'], report.get('originality_score')) for report in reports
+        ])
+
+    @staticmethod
+    def rebuild():
+        """Recompute every day's rollup from the reports collection; returns the number of days
+
+        Reports written while this runs may be counted in their day twice
+        or not at all, so run it when report writes are quiet.
+        """
+        db = current_app.db
+        group = {
+            '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
+            'count': {'$sum': 1},
+            'score_sum': {'$sum': {'$ifNull': ['$originality_score', 0]}},
+            'min_score': {'$min': {'$ifNull': ['$originality_score', 0]}},
+            'max_score': {'$max': {'$ifNull': ['$originality_score', 0]}}
+        }
+        upper = None
+        for name, lowest in SCORE_BUCKETS:
+            band = [{'$gte': [{'$ifNull': ['$originality_score', 0]}, lowest]}] if lowest > float('-inf') else []
+            if upper is not None:
+                band.append({'$lt': [{'$ifNull': ['$originality_score', 0]}, upper]})
+            group[name] = {'$sum': {'$cond': [{'$and': band}, 1, 0]}}
+            upper = lowest
+
+        days = list(db.reports.aggregate([
+            {'$match': {'created_at': {'$type': 'date'}}},
+            {'$group': group}
+        ], allowDiskUse=True))
+        writes = [
+            ReplaceOne({'_id': day['_id']}, {**day, 'date': datetime.strptime(day['_id'], '%Y-%m-%d')}, upsert=True)
+            for day in days
+        ]
+        if writes:
+            db.analytics_daily.bulk_write(writes, ordered=False)
+        db.analytics_daily.delete_many({'_id': {'$nin': [day['_id'] for day in days]}})
+        return len(days)
+
+    @staticmethod
+    def summary(trend_days=7):
+        """All-time report statistics plus per-day counts for the last `trend_days` days"""
+        db = current_app.db
+        totals = {name: 0 for name, _ in SCORE_BUCKETS}
+        count = 0
+        score_sum = 0
+        lowest = None
+        highest = None
+        trend = []
+        trend_start = AnalyticsRollup.day_key(datetime.utcnow() - timedelta(days=trend_days))
+
+        for day in db.analytics_daily.find({}).sort('_id', 1):
+            if day.get('count', 0) <= 0:
+                continue
+            count += day['count']
+            score_sum += day.get('score_sum', 0)
+            for name in totals:
+                totals[name] += day.get(name, 0)
+            if day.get('min_score') is not None:
+                lowest = day['min_score'] if lowest is None else min(lowest, day['min_score'])
+                highest = day['max_score'] if highest is None else max(highest, day['max_score'])
+            if day['_id'] >= trend_start:
+                trend.append({'date': day['_id'], 'analyses': day['count']})
+
+        return {
+            'total_analyses': count,
+            'average_originality': score_sum / count if count else 0,
+            'highest_originality': highest or 0,
+            'lowest_originality': lowest or 0,
+            **totals,
+            'trend': trend
+        }
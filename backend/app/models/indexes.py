@@ -0,0 +1,224 @@
+from datetime import datetime
+from bson.objectid import ObjectId
+from bson.son import SON
+import pymongo
+from pymongo.errors import OperationFailure
+
+ASC = pymongo.ASCENDING
+DESC = pymongo.DESCENDING
+
+# Index-only stages: a plan made of these (no FETCH) never reads documents
+COVERING_STAGES = ('IXSCAN', 'IDHACK', 'COUNT_SCAN', 'DISTINCT_SCAN', 'EXPRESS_IXSCAN', 'EXPRESS_IDHACK')
+
+
+def index_manifest(config):
+    """Every index the app relies on, as {'collection', 'keys', 'options', 'reason'} entries
+
+    TTL lifetimes and the optional collections follow the app config.
+    """
+    manifest = [
+        # Users
+        {'collection': 'users', 'keys': [('username', ASC)], 'options': {'unique': True},
+         'reason': 'User.get_user_by_username, User.create_user'},
+        {'collection': 'users', 'keys': [('email', ASC)], 'options': {'unique': True},
+         'reason': 'User.create_user'},
+        {'collection': 'users', 'keys': [('analysis_count', DESC)], 'options': {},
+         'reason': 'active user counts and top users (admin analytics)'},
+        {'collection': 'users', 'keys': [('created_at', DESC), ('_id', DESC)], 'options': {},
+         'reason': 'admin user list (keyset pages)'},
+
+        # Reports
+        {'collection': 'reports', 'keys': [('user_id', ASC), ('created_at', DESC), ('_id', DESC)], 'options': {},
+         'reason': 'Report.get_user_reports and exports (keyset pages), Report.get_user_originality_trend'},
+        {'collection': 'reports', 'keys': [('lsh_bands', ASC)], 'options': {'sparse': True},
+         'reason': 'Report.find_similar across users'},
+        {'collection': 'reports', 'keys': [('user_id', ASC), ('lsh_bands', ASC)], 'options': {},
+         'reason': "Report.find_similar within a user's reports"},
+
+        # Async analysis jobs
+        {'collection': 'analysis_jobs', 'keys': [('status', ASC), ('created_at', ASC)], 'options': {},
+         'reason': 'AnalysisJob.claim_next, AnalysisJob.count_queued'},
+        {'collection': 'analysis_jobs', 'keys': [('finished_at', ASC)],
+         'options': {'expireAfterSeconds': config['JOB_RETENTION_SECONDS']},
+         'reason': 'finished jobs expire'}
+    ]
+    if config.get('ANALYSIS_CACHE_SHARED'):
+        manifest.append(
+            {'collection': 'analysis_cache', 'keys': [('created_at', ASC)],
+             'options': {'expireAfterSeconds': config['ANALYSIS_CACHE_TTL']},
+             'reason': 'shared analysis cache entries expire'}
+        )
+    if config.get('INCREMENTAL_SHARED'):
+        manifest.append(
+            {'collection': 'paragraph_stats', 'keys': [('created_at', ASC)],
+             'options': {'expireAfterSeconds': config['INCREMENTAL_TTL']},
+             'reason': 'stored incremental paragraph stats expire'}
+        )
+    if config.get('RATE_LIMIT_BACKEND') == 'mongo':
+        manifest.append(
+            {'collection': 'rate_limits', 'keys': [('expires_at', ASC)],
+             'options': {'expireAfterSeconds': 0},
+             'reason': 'rate limit windows expire'}
+        )
+    return manifest
+
+
+def index_name(keys):
+    """Name MongoDB gives an index on these keys by default ("user_id_1_created_at_-1")"""
+    return '_'.join(f'{field}_{direction}' for field, direction in keys)
+
+
+def apply_indexes(db, manifest):
+    """Create missing indexes and update changed TTLs; returns one result per manifest entry
+
+    Safe to run repeatedly: existing identical indexes are left alone.
+    Failures (e.g. duplicates blocking a unique index) are reported, not raised.
+    """
+    results = []
+    existing = {}
+    for spec in manifest:
+        collection = db[spec['collection']]
+        if spec['collection'] not in existing:
+            existing[spec['collection']] = collection.index_information()
+        name = index_name(spec['keys'])
+        current = existing[spec['collection']].get(name)
+        options = spec['options']
+        result = {'collection': spec['collection'], 'index': name}
+
+        try:
+            if current is None:
+                collection.create_index(spec['keys'], **options)
+                result['status'] = 'created'
+            elif current.get('unique', False) != options.get('unique', False) \
+                    or current.get('sparse', False) != options.get('sparse', False):
+                result['status'] = 'conflict'
+                result['error'] = 'exists with different unique/sparse options; drop it to rebuild'
+            elif current.get('expireAfterSeconds') != options.get('expireAfterSeconds'):
+                if 'expireAfterSeconds' not in options or 'expireAfterSeconds' not in current:
+                    result['status'] = 'conflict'
+                    result['error'] = 'TTL can only be changed, not added or removed, in place'
+                else:
+                    db.command(SON([
+                        ('collMod', spec['collection']),
+                        ('index', {'keyPattern': dict(spec['keys']), 'expireAfterSeconds': options['expireAfterSeconds']})
+                    ]))
+                    result['status'] = 'updated'
+            else:
+                result['status'] = 'exists'
+        except OperationFailure as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+        results.append(result)
+    return results
+
+
+def query_catalog():
+    """Representative form of every model and admin query, as explainable commands
+
+    Keep in step with the queries in app/models and app/routes: the
+    filters and sorts matter, the sample values don't.
+    """
+    user_id = ObjectId()
+    report_id = ObjectId()
+    now = datetime.utcnow()
+    count = lambda collection, query: {
+        'aggregate': collection,
+        'pipeline': [{'$match': query}, {'$group': {'_id': 1, 'n': {'$sum': 1}}}],
+        'cursor': {}
+    }
+    keyset = lambda query: {
+        **query,
+        'created_at': {'$lte': now},
+        '$or': [{'created_at': {'$lt': now}}, {'_id': {'$lt': report_id}}]
+    }
+    return [
+        ('User.create_user (duplicate check)',
+         {'find': 'users', 'filter': {'$or': [{'username': 'sample'}, {'email': 'sample@example.com'}]}, 'limit': 1}),
+        ('User.get_user_by_username', {'find': 'users', 'filter': {'username': 'sample'}, 'limit': 1}),
+        ('User.get_user_by_id', {'find': 'users', 'filter': {'_id': user_id}, 'limit': 1}),
+        ('User.update_style_profile',
+         {'findAndModify': 'users', 'query': {'_id': user_id}, 'update': {'$inc': {'analysis_count': 1}}}),
+        ('Report.get_user_reports',
+         {'find': 'reports', 'filter': {'user_id': user_id}, 'projection': {'content': 0},
+          'sort': SON([('created_at', -1), ('_id', -1)]), 'limit': 11}),
+        ('Report.get_user_reports (next page)',
+         {'find': 'reports', 'filter': keyset({'user_id': user_id}), 'projection': {'content': 0},
+          'sort': SON([('created_at', -1), ('_id', -1)]), 'limit': 11}),
+        ('Report.get_user_originality_trend',
+         {'find': 'reports', 'filter': {'user_id': user_id, 'created_at': {'$gte': now}},
+          'projection': {'originality_score': 1, 'created_at': 1}, 'sort': {'created_at': 1}}),
+        ('Report.get_report_by_id', {'find': 'reports', 'filter': {'_id': report_id}, 'limit': 1}),
+        ('Report.find_similar (own reports)',
+         {'find': 'reports', 'filter': {'lsh_bands': {'$in': [1, 2]}, 'user_id': user_id}, 'limit': 500}),
+        ('Report.find_similar (all users)',
+         {'find': 'reports', 'filter': {'lsh_bands': {'$in': [1, 2]}}, 'limit': 500}),
+        ('Report.iter_stale_batches',
+         {'find': 'reports', 'filter': {'_id': {'$gte': report_id}, 'analyzer_version': {'$ne': '0'}},
+          'projection': {'content': 1}, 'sort': {'_id': 1}}),
+        ('AnalysisJob.count_queued', count('analysis_jobs', {'status': 'queued'})),
+        ('AnalysisJob.claim_next',
+         {'findAndModify': 'analysis_jobs',
+          'query': {'$or': [{'status': 'queued'}, {'status': 'running', 'locked_until': {'$lt': now}}]},
+          'sort': {'created_at': 1}, 'update': {'$set': {'status': 'running'}}}),
+        ('admin: total users', count('users', {})),
+        ('admin: active users', count('users', {'analysis_count': {'$gt': 0}})),
+        ('admin: top users',
+         {'find': 'users', 'filter': {'analysis_count': {'$gt': 0}}, 'projection': {'username': 1, 'analysis_count': 1},
+          'sort': {'analysis_count': -1}, 'limit': 10}),
+        ('admin: user list',
+         {'find': 'users', 'filter': {}, 'projection': {'password': 0},
+          'sort': SON([('created_at', -1), ('_id', -1)]), 'limit': 51}),
+        ('admin: user list (next page)',
+         {'find': 'users', 'filter': keyset({}), 'projection': {'password': 0},
+          'sort': SON([('created_at', -1), ('_id', -1)]), 'limit': 51}),
+        ('AnalyticsRollup.summary', {'find': 'analytics_daily', 'filter': {}, 'sort': {'_id': 1}}),
+        ('Report.delete_user_reports',
+         {'find': 'reports', 'filter': {'user_id': user_id}, 'projection': {'created_at': 1, 'originality_score': 1}})
+    ]
+
+
+def plan_stages(explain):
+    """Names of every stage in the winning plan(s) of an explain() result"""
+    stages = []
+
+    def walk(node, in_plan):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == 'rejectedPlans':
+                    continue
+                if key == 'stage' and in_plan and isinstance(value, str):
+                    stages.append(value)
+                walk(value, in_plan or key == 'winningPlan')
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_plan)
+
+    walk(explain, False)
+    return stages
+
+
+def classify_plan(stages):
+    """'collection scan', 'in-memory sort', 'covered' or 'index' for a winning plan's stages"""
+    if 'COLLSCAN' in stages:
+        return 'collection scan'
+    if 'SORT' in stages:
+        return 'in-memory sort'
+    if any(stage in COVERING_STAGES for stage in stages) and 'FETCH' not in stages:
+        return 'covered'
+    return 'index'
+
+
+def verify_queries(db):
+    """Explain every catalogued query; returns [{'query', 'plan', 'stages'}] (or 'error')"""
+    report = []
+    for name, command in query_catalog():
+        entry = {'query': name}
+        try:
+            explain = db.command(SON([('explain', command), ('verbosity', 'queryPlanner')]))
+            entry['stages'] = plan_stages(explain)
+            entry['plan'] = classify_plan(entry['stages'])
+        except OperationFailure as e:
+            entry['plan'] = 'error'
+            entry['error'] = str(e)
+        report.append(entry)
+    return report
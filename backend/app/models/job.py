@@ -0,0 +1,113 @@
+from flask import current_app
+from bson.objectid import ObjectId
+from datetime import datetime, timedelta
+import pymongo
+
+class AnalysisJob:
+    """Persistent analysis job queue stored in the analysis_jobs collection
+
+    Status flow: queued -> running -> done | failed. A running job holds
+    a lease (locked_until); if its worker dies the lease expires and the
+    job is claimed again, up to max_attempts times.
+    """
+
+    @staticmethod
+    def create_job(user_id, text=None, texts=None):
+        """Queue a job for a single text or a batch of texts"""
+        db = current_app.db
+        now = datetime.utcnow()
+
+        job_data = {
+            'user_id': ObjectId(user_id) if isinstance(user_id, str) else user_id,
+            'kind': 'batch' if texts is not None else 'text',
+            'text': text,
+            'texts': texts,
+            'status': 'queued',
+            'attempts': 0,
+            'created_at': now,
+            'updated_at': now,
+            'locked_until': None
+        }
+
+        result = db.analysis_jobs.insert_one(job_data)
+        return str(result.inserted_id)
+
+    @staticmethod
+    def count_queued():
+        """Number of jobs waiting for a worker"""
+        db = current_app.db
+        return db.analysis_jobs.count_documents({'status': 'queued'})
+
+    @staticmethod
+    def claim_next(worker_id, lease_seconds):
+        """Atomically claim the oldest queued job (or one whose lease expired)"""
+        db = current_app.db
+        now = datetime.utcnow()
+
+        return db.analysis_jobs.find_one_and_update(
+            {'$or': [
+                {'status': 'queued'},
+                {'status': 'running', 'locked_until': {'$lt': now}}
+            ]},
+            {
+                '$set': {
+                    'status': 'running',
+                    'worker_id': worker_id,
+                    'locked_until': now + timedelta(seconds=lease_seconds),
+                    'updated_at': now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('created_at', pymongo.ASCENDING)],
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def complete_job(job_id, worker_id, result, report_ids):
+        """Store the result of a job this worker still holds, dropping its input text"""
+        db = current_app.db
+        now = datetime.utcnow()
+        db.analysis_jobs.update_one(
+            {'_id': ObjectId(job_id), 'status': 'running', 'worker_id': worker_id},
+            {
+                '$set': {
+                    'status': 'done',
+                    'result': result,
+                    'report_ids': report_ids,
+                    'updated_at': now,
+                    'finished_at': now
+                },
+                '$unset': {'text': '', 'texts': '', 'locked_until': ''}
+            }
+        )
+
+    @staticmethod
+    def release_job(job_id, worker_id, error, retry, refund_attempt=False):
+        """Return a job to the queue after an error, or mark it failed"""
+        db = current_app.db
+        now = datetime.utcnow()
+        update = {'error': error, 'updated_at': now, 'locked_until': None}
+        if retry:
+            update['status'] = 'queued'
+        else:
+            update.update({'status': 'failed', 'finished_at': now})
+        changes = {'$set': update}
+        if refund_attempt:
+            changes['$inc'] = {'attempts': -1}
+        db.analysis_jobs.update_one(
+            {'_id': ObjectId(job_id), 'status': 'running', 'worker_id': worker_id},
+            changes
+        )
+
+    @staticmethod
+    def get_job(job_id):
+        """Get a job without its (possibly large) input"""
+        db = current_app.db
+        try:
+            job = db.analysis_jobs.find_one({'_id': ObjectId(job_id)}, {'text': 0, 'texts': 0})
+        except Exception:
+            return None
+        if job:
+            job['_id'] = str(job['_id'])
+            job['user_id'] = str(job['user_id'])
+        return job
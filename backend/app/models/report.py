@@ -1,53 +1,197 @@
 from flask import current_app
 from bson.objectid import ObjectId
 from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.models.analytics import AnalyticsRollup
+from app.models.user import User
+from app.utils.admin_cache import invalidate_admin_cache
+from app.utils.ai_analyzer import ANALYZER_VERSION
+from app.utils.minhash import MINHASHER
+from app.utils.write_behind import DUPLICATE_KEY, WriteBehindFull
+from app.utils.pagination import fetch_page
+from app.utils.timing import span
+
+# Internal near-duplicate index fields, never returned to clients
+SIGNATURE_KEYS = ('minhash', 'lsh_bands')
+SIGNATURE_FIELDS = {key: 0 for key in SIGNATURE_KEYS}
 
 class Report:
     @staticmethod
-    def create_report(user_id, content, originality_score, drift_details, style_analysis):
-        """Create a new originality report"""
-        db = current_app.db
-        
+    def build_report(user_id, content, originality_score, drift_details, style_analysis, signature=None):
+        """Build a report document ready for insertion
+
+        `signature` is the MinHash signature of the full text; when given,
+        the report is added to the near-duplicate index.
+        """
         report_data = {
             'user_id': ObjectId(user_id) if isinstance(user_id, str) else user_id,
             'content': content,
+            'created_at': datetime.utcnow(),
+            **Report.score_fields(originality_score, drift_details, style_analysis)
+        }
+        if signature is not None:
+            report_data['minhash'] = MINHASHER.to_bytes(signature)
+            report_data['lsh_bands'] = MINHASHER.band_keys(signature)
+        return report_data
+    
+    @staticmethod
+    def score_fields(originality_score, drift_details, style_analysis):
+        """Report fields that come from the analysis, stamped with the analyzer version"""
+        return {
             'originality_score': originality_score,
             'drift_details': drift_details,
             'style_analysis': style_analysis,
-            'created_at': datetime.utcnow(),
             'ai_similarity_score': drift_details.get('ai_similarity', 0),
-            'style_drift': drift_details.get('style_drift', 0)
+            'style_drift': drift_details.get('style_drift', 0),
+            'analyzer_version': ANALYZER_VERSION
         }
+    
+    @staticmethod
+    def create_report(user_id, content, originality_score, drift_details, style_analysis, signature=None):
+        """Create a new originality report"""
+        db = current_app.db
+        
+        report_data = Report.build_report(
+            user_id, content, originality_score, drift_details, style_analysis, signature
+        )
         
-        result = db.reports.insert_one(report_data)
+        with span('db.report'):
+            result = db.reports.insert_one(report_data)
+        with span('db.rollup'):
+            AnalyticsRollup.record([report_data])
+        invalidate_admin_cache(write=True)
         return str(result.inserted_id)
     
     @staticmethod
-    def get_user_reports(user_id, limit=10):
-        """Get all reports for a user"""
+    def create_reports(report_docs):
+        """Insert many report documents (from build_report) in one round trip"""
+        if not report_docs:
+            return []
+        
         db = current_app.db
-        reports = list(db.reports.find(
+        with span('db.report'):
+            result = db.reports.insert_many(report_docs)
+        with span('db.rollup'):
+            AnalyticsRollup.record(report_docs)
+        invalidate_admin_cache(write=True)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+    
+    @staticmethod
+    def insert_new(report_docs):
+        """Insert report documents with preset _ids, skipping any already stored
+
+        Returns the documents that were newly inserted, so a retried
+        write can tell which of its reports still need counting.
+        """
+        if not report_docs:
+            return []
+
+        db = current_app.db
+        duplicates = set()
+        try:
+            with span('db.report'):
+                db.reports.insert_many(report_docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if any(error.get('code') != DUPLICATE_KEY for error in errors):
+                raise
+            duplicates = {report_docs[error['index']]['_id'] for error in errors}
+
+        inserted = [report for report in report_docs if report['_id'] not in duplicates]
+        with span('db.rollup'):
+            AnalyticsRollup.record(inserted)
+        invalidate_admin_cache(write=True)
+        return inserted
+    
+    @staticmethod
+    def save_analyses(user_id, report_docs, analyses):
+        """Store reports (from build_report) and add their analyses to the user's counters and baseline
+
+        Returns (report ids, the user's style profile before these
+        analyses). With the app's write-behind buffer enabled, both writes
+        are queued for the next batch flush and only the profile is read
+        now; report ids are assigned up front.
+        """
+        if not report_docs:
+            return [], {}
+
+        buffer = getattr(current_app, 'write_behind', None)
+        if buffer is not None:
+            for report in report_docs:
+                report.setdefault('_id', ObjectId())
+            try:
+                with span('db.user'):
+                    profile = User.get_style_profile(user_id)
+                with span('write_behind.add'):
+                    buffer.add(user_id, report_docs, User.profile_increments(analyses))
+                return [str(report['_id']) for report in report_docs], profile
+            except WriteBehindFull as e:
+                print(f"Write-behind buffer full, writing directly: {e}")
+
+        report_ids = Report.create_reports(report_docs)
+        with span('db.user'):
+            profile = User.update_style_profile(user_id, analyses)
+        return report_ids, profile
+    
+    @staticmethod
+    def delete_user_reports(user_id):
+        """Delete all of a user's reports and take them out of the analytics rollups"""
+        db = current_app.db
+        query = {"user_id": ObjectId(user_id)}
+        removed = [
+            (report['created_at'], report.get('originality_score'))
+            for report in db.reports.find(query, {"created_at": 1, "originality_score": 1})
+        ]
+        result = db.reports.delete_many(query)
+        AnalyticsRollup.apply(removed=removed)
+        return result.deleted_count
+    
+    @staticmethod
+    def get_user_reports(user_id, limit=10, cursor=None):
+        """Get one page of a user's reports, newest first, and the cursor for the next page
+
+        Raises ValueError for a malformed cursor.
+        """
+        db = current_app.db
+        reports, next_cursor = fetch_page(
+            db.reports,
             {"user_id": ObjectId(user_id)},
-            {"content": 0}  # Exclude large content field
-        ).sort("created_at", -1).limit(limit))
+            {"content": 0, **SIGNATURE_FIELDS},  # Exclude large content field
+            limit,
+            cursor
+        )
         
         # Convert ObjectId to string
         for report in reports:
             report['_id'] = str(report['_id'])
             report['user_id'] = str(report['user_id'])
         
-        return reports
+        return reports, next_cursor
     
     @staticmethod
     def get_report_by_id(report_id):
         """Get a specific report"""
         db = current_app.db
-        report = db.reports.find_one({"_id": ObjectId(report_id)})
+        report = db.reports.find_one({"_id": ObjectId(report_id)}, dict(SIGNATURE_FIELDS))
+        if report is None:
+            report = Report.get_pending_report(report_id)
         if report:
             report['_id'] = str(report['_id'])
             report['user_id'] = str(report['user_id'])
         return report
     
+    @staticmethod
+    def get_pending_report(report_id):
+        """A report still waiting in this process' write-behind buffer, or None"""
+        buffer = getattr(current_app, 'write_behind', None)
+        if buffer is None:
+            return None
+        report = buffer.pending_report(ObjectId(report_id))
+        if report is None:
+            return None
+        return {key: value for key, value in report.items() if key not in SIGNATURE_KEYS}
+    
     @staticmethod
     def get_user_originality_trend(user_id, days=30):
         """Get originality trend for a user"""
@@ -64,3 +208,96 @@ class Report:
         ).sort("created_at", 1))
         
         return reports
+    
+    @staticmethod
+    def get_report_signature(report_id):
+        """Stored MinHash signature of a report, or None"""
+        db = current_app.db
+        report = db.reports.find_one({"_id": ObjectId(report_id)}, {"minhash": 1})
+        if not report or not report.get('minhash'):
+            return None
+        return MINHASHER.from_bytes(report['minhash'])
+    
+    @staticmethod
+    def find_similar(signature, user_id=None, exclude_id=None, min_similarity=0.5, limit=10, max_candidates=500):
+        """Reports whose text is estimated to be near-duplicate of the signature's
+
+        Candidates come from an index lookup on the LSH band keys (no
+        collection scan), then are ranked by estimated Jaccard similarity.
+        Restricted to one user's reports when user_id is given.
+        """
+        db = current_app.db
+        query = {"lsh_bands": {"$in": MINHASHER.band_keys(signature)}}
+        if user_id is not None:
+            query["user_id"] = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        if exclude_id is not None:
+            query["_id"] = {"$ne": ObjectId(exclude_id)}
+        
+        candidates = db.reports.find(
+            query,
+            {"minhash": 1, "user_id": 1, "originality_score": 1, "created_at": 1}
+        ).limit(max_candidates)
+        
+        matches = []
+        for report in candidates:
+            similarity = MINHASHER.similarity(signature, MINHASHER.from_bytes(report['minhash']))
+            if similarity >= min_similarity:
+                matches.append({
+                    'report_id': str(report['_id']),
+                    'user_id': str(report['user_id']),
+                    'similarity': round(similarity, 3),
+                    'originality_score': report.get('originality_score'),
+                    'created_at': report.get('created_at')
+                })
+        
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        return matches[:limit]
+    
+    @staticmethod
+    def id_range():
+        """First and last report _id, or (None, None) without reports"""
+        db = current_app.db
+        first = db.reports.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+        last = db.reports.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        if not first:
+            return None, None
+        return first['_id'], last['_id']
+    
+    @staticmethod
+    def iter_stale_batches(start_id, end_id, after_id=None, batch_size=200):
+        """Batches of {_id, content} for reports in [start_id, end_id) not scored by this analyzer version
+
+        Reports are streamed in _id order; `after_id` resumes past an
+        already processed report and `end_id` None means no upper bound.
+        """
+        db = current_app.db
+        id_range = {"$gt": after_id} if after_id is not None else {"$gte": start_id}
+        if end_id is not None:
+            id_range["$lt"] = end_id
+        cursor = db.reports.find(
+            {"_id": id_range, "analyzer_version": {"$ne": ANALYZER_VERSION}},
+            {"content": 1}
+        ).sort("_id", 1).batch_size(batch_size)
+        
+        batch = []
+        for report in cursor:
+            batch.append(report)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    @staticmethod
+    def apply_rescores(updates):
+        """Write (report_id, score_fields) pairs in one unordered bulk write; returns the modified count"""
+        if not updates:
+            return 0
+        
+        db = current_app.db
+        rescored_at = datetime.utcnow()
+        result = db.reports.bulk_write([
+            UpdateOne({"_id": report_id}, {"$set": {**fields, 'rescored_at': rescored_at}})
+            for report_id, fields in updates
+        ], ordered=False)
+        return result.modified_count
@@ -1,7 +1,10 @@
 from flask import current_app
 from bson.objectid import ObjectId
 import bcrypt
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
+from app.utils.style_baseline import StyleBaseline
 
 class User:
     @staticmethod
@@ -26,7 +29,11 @@ class User:
             'analysis_count': 0
         }
         
-        result = db.users.insert_one(user_data)
+        try:
+            result = db.users.insert_one(user_data)
+        except DuplicateKeyError:
+            # Lost a race with a concurrent signup (unique username/email indexes)
+            return None, "User already exists"
         return str(result.inserted_id), "User created successfully"
     
     @staticmethod
@@ -53,19 +60,56 @@ class User:
         return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
     
     @staticmethod
-    def update_style_profile(user_id, style_data):
-        """Update user's style profile"""
+    def update_style_profile(user_id, analyses):
+        """Fold new analyses into the user's style baseline and analysis count
+
+        A single atomic $inc, so concurrent analyses never lose updates.
+        Returns the style profile as it was before these analyses.
+        """
         db = current_app.db
-        db.users.update_one(
+        increments = User.profile_increments(analyses)
+        user = db.users.find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": {"style_profile": style_data}}
+            {"$inc": increments, "$set": {"style_profile.updated_at": datetime.utcnow()}},
+            projection={"style_profile": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        return (user or {}).get('style_profile') or {}
+    
+    @staticmethod
+    def profile_increments(analyses):
+        """$inc document adding analyses to a user's style baseline and analysis count"""
+        increments = StyleBaseline.increments([StyleBaseline.metrics(a) for a in analyses])
+        increments['analysis_count'] = len(analyses)
+        return increments
+    
+    @staticmethod
+    def get_style_profile(user_id):
+        """The user's current style profile ({} if none yet)"""
+        db = current_app.db
+        user = db.users.find_one({"_id": ObjectId(user_id)}, {"style_profile": 1})
+        return (user or {}).get('style_profile') or {}
+    
+    @staticmethod
+    def apply_profile_increments(increments_by_user):
+        """Apply {user_id: $inc document} in one unordered bulk write"""
+        if not increments_by_user:
+            return
+        db = current_app.db
+        now = datetime.utcnow()
+        db.users.bulk_write([
+            UpdateOne(
+                {"_id": ObjectId(user_id)},
+                {"$inc": increments, "$set": {"style_profile.updated_at": now}}
+            )
+            for user_id, increments in increments_by_user.items()
+        ], ordered=False)
     
     @staticmethod
-    def increment_analysis_count(user_id):
+    def increment_analysis_count(user_id, count=1):
         """Increment user's analysis count"""
         db = current_app.db
         db.users.update_one(
             {"_id": ObjectId(user_id)},
-            {"$inc": {"analysis_count": 1}}
+            {"$inc": {"analysis_count": count}}
         )
@@ -1,6 +1,10 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.analytics import AnalyticsRollup
+from app.models.report import Report
 from app.models.user import User
+from app.utils.admin_cache import cached_response, invalidate_admin_cache
+from app.utils.pagination import fetch_page, page_size
 from flask import current_app
 from datetime import datetime, timedelta
 from functools import wraps
@@ -26,6 +30,7 @@ def admin_required(f):
 
 @bp.route('/analytics', methods=['GET'])
 @admin_required
+@cached_response
 def get_analytics():
     """Get admin analytics"""
     db = current_app.db
@@ -35,111 +40,14 @@ def get_analytics():
         total_users = db.users.count_documents({})
         active_users = db.users.count_documents({'analysis_count': {'$gt': 0}})
         
-        # Analysis statistics
-        total_analyses = db.reports.count_documents({})
-        
-        # Originality score statistics
-        pipeline = [
-            {
-                '$group': {
-                    '_id': None,
-                    'average_originality': {'$avg': '$originality_score'},
-                    'max_score': {'$max': '$originality_score'},
-                    'min_score': {'$min': '$originality_score'},
-                    'highly_original': {
-                        '$sum': {
-                            '$cond': [{'$gte': ['$originality_score', 80]}, 1, 0]
-                        }
-                    },
-                    'original': {
-                        '$sum': {
-                            '$cond': [
-                                {
-                                    '$and': [
-                                        {'$gte': ['$originality_score', 50]},
-                                        {'$lt': ['$originality_score', 80]}
-                                    ]
-                                },
-                                1,
-                                0
-                            ]
-                        }
-                    },
-                    'mixed': {
-                        '$sum': {
-                            '$cond': [
-                                {
-                                    '$and': [
-                                        {'$gte': ['$originality_score', 20]},
-                                        {'$lt': ['$originality_score', 50]}
-                                    ]
-                                },
-                                1,
-                                0
-                            ]
-                        }
-                    },
-                    'low_original': {
-                        '$sum': {
-                            '$cond': [{'$lt': ['$originality_score', 20]}, 1, 0]
-                        }
-                    }
-                }
-            }
-        ]
-        
-        score_data = list(db.reports.aggregate(pipeline))
-        
-        stats = {
-            'average_originality': 0,
-            'highest_originality': 0,
-            'lowest_originality': 0,
-            'highly_original': 0,
-            'original': 0,
-            'mixed': 0,
-            'low_original': 0,
-            'total_analyses': total_analyses
-        }
-        
-        if score_data:
-            stats.update({
-                'average_originality': score_data[0].get('average_originality', 0),
-                'highest_originality': score_data[0].get('max_score', 0),
-                'lowest_originality': score_data[0].get('min_score', 0),
-                'highly_original': score_data[0].get('highly_original', 0),
-                'original': score_data[0].get('original', 0),
-                'mixed': score_data[0].get('mixed', 0),
-                'low_original': score_data[0].get('low_original', 0)
-            })
+        # Analysis statistics, from the per-day rollups
+        stats = AnalyticsRollup.summary(trend_days=7)
+        trend = stats.pop('trend')
         
         # Trend data (last 7 days)
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        trend_pipeline = [
-            {
-                '$match': {
-                    'created_at': {'$gte': seven_days_ago}
-                }
-            },
-            {
-                '$group': {
-                    '_id': {
-                        '$dateToString': {
-                            'format': '%Y-%m-%d',
-                            'date': '$created_at'
-                        }
-                    },
-                    'analyses': {'$sum': 1}
-                }
-            },
-            {
-                '$sort': {'_id': 1}
-            }
-        ]
-        
-        trend_data = list(db.reports.aggregate(trend_pipeline))
         trend_data = [
-            {'date': item['_id'], 'analyses': item['analyses'], 'new_users': 0} 
-            for item in trend_data
+            {'date': item['date'], 'analyses': item['analyses'], 'new_users': 0}
+            for item in trend
         ]
         
         return jsonify({
@@ -158,21 +66,24 @@ def get_analytics():
 @bp.route('/users', methods=['GET'])
 @admin_required
 def get_users():
-    """Get all users"""
+    """Get users, newest first, a page at a time (pass back next_cursor as ?cursor=)"""
     db = current_app.db
+    limit = page_size(request.args.get('limit', 50, type=int))
     
     try:
-        users_list = list(db.users.find({}, {
+        users_list, next_cursor = fetch_page(db.users, {}, {
             'password': 0,
             'email_verified': 0
-        }).sort('created_at', pymongo.DESCENDING))
+        }, limit, request.args.get('cursor'))
         
         # Convert ObjectId to string
         for user in users_list:
             user['_id'] = str(user['_id'])
             user['analysis_count'] = user.get('analysis_count', 0)
         
-        return jsonify({'users': users_list})
+        return jsonify({'users': users_list, 'count': len(users_list), 'next_cursor': next_cursor})
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -193,7 +104,8 @@ def delete_user(user_id):
             return jsonify({'error': 'User not found'}), 404
         
         # Delete user's reports
-        db.reports.delete_many({'user_id': user_id})
+        Report.delete_user_reports(user_id)
+        invalidate_admin_cache()
         
         return jsonify({'message': 'User deleted successfully'})
     except Exception as e:
@@ -201,6 +113,7 @@ def delete_user(user_id):
 
 @bp.route('/system-health', methods=['GET'])
 @admin_required
+@cached_response
 def get_system_health():
     """Get system health status"""
     db = current_app.db
@@ -209,9 +122,12 @@ def get_system_health():
         health = {
             'database': 'healthy',
             'collections': {
-                'users': db.users.count_documents({}),
-                'reports': db.reports.count_documents({})
+                'users': db.users.estimated_document_count(),
+                'reports': db.reports.estimated_document_count()
             },
+            'analysis_executor': current_app.analysis_executor.stats(),
+            'admission': current_app.admission.stats(),
+            'write_behind': current_app.write_behind.stats() if hasattr(current_app, 'write_behind') else None,
             'timestamp': datetime.utcnow().isoformat()
         }
         
@@ -225,8 +141,21 @@ def get_system_health():
             }
         }), 500
 
+@bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Get analysis result cache hit/miss counters"""
+    return jsonify({'cache': current_app.result_cache.stats(), 'admin_cache': current_app.admin_cache.stats()})
+
+@bp.route('/timings', methods=['GET'])
+@admin_required
+def get_timings():
+    """Get request and analyzer stage latency histograms for this process"""
+    return jsonify({'timings': current_app.timing_histograms.stats()})
+
 @bp.route('/summary', methods=['GET'])
 @admin_required
+@cached_response
 def get_summary():
     """Get dashboard summary"""
     db = current_app.db
@@ -234,7 +163,7 @@ def get_summary():
     try:
         return jsonify({
             'total_users': db.users.count_documents({}),
-            'total_reports': db.reports.count_documents({}),
+            'total_reports': AnalyticsRollup.summary()['total_analyses'],
             'status': 'healthy'
         })
     except Exception as e:
@@ -313,32 +242,6 @@ def get_summary():
         }
     }), 200
 
-@bp.route('/users', methods=['GET'])
-@jwt_required()
-def get_all_users():
-    """Get all users (admin only)"""
-    user_id = get_jwt_identity()
-    
-    if not check_admin(user_id):
-        return jsonify({'success': False, 'message': 'Unauthorized - Admin only'}), 403
-    
-    db = current_app.db
-    
-    users = list(db.users.find(
-        {},
-        {'password': 0}
-    ).sort('created_at', -1))
-    
-    for user in users:
-        user['_id'] = str(user['_id'])
-        user['created_at'] = user['created_at'].isoformat()
-    
-    return jsonify({
-        'success': True,
-        'users': users,
-        'count': len(users)
-    }), 200
-
 @bp.route('/system-health', methods=['GET'])
 @jwt_required()
 def system_health():
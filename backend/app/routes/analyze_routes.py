@@ -1,13 +1,33 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.ai_analyzer import OriginallityAnalyzer
+from app.utils.batch_scorer import BatchScorer
+from app.utils.analysis_executor import AnalysisQueueFull, AnalysisTimeout
+from app.utils.admission import admission_controlled, busy_response
+from app.utils.stream_analyzer import StreamingAnalyzer
+from app.utils.style_baseline import StyleBaseline
+from app.utils.timing import span
+from app.utils.minhash import MINHASHER
+from app.utils.pagination import page_size
+from app.models.job import AnalysisJob
+import json
+import time
 from app.models.report import Report
 from app.models.user import User
 
 bp = Blueprint('analyze', __name__, url_prefix='/api/analyze')
 
+MAX_BATCH_SIZE = 500
+MAX_JOB_TEXT_CHARS = 1000000
+# An open event stream holds a server thread, so streams end after this long and
+# the browser's EventSource reconnects (after JOB_EVENTS_RETRY_MS) to resume
+JOB_EVENTS_TIMEOUT = 20
+JOB_EVENTS_RETRY_MS = 2000
+DUPLICATE_THRESHOLD = 0.8
+
 @bp.route('/text', methods=['POST'])
 @jwt_required()
+@admission_controlled
 def analyze_text():
     """Analyze text for originality"""
     user_id = get_jwt_identity()
@@ -21,20 +41,37 @@ def analyze_text():
     if len(text) < 10:
         return jsonify({'success': False, 'message': 'Text must be at least 10 characters'}), 400
     
-    # Perform analysis
-    analysis_result = OriginallityAnalyzer.analyze_text(text)
+    # Perform analysis (identical texts are served from the result cache)
+    try:
+        with span('analyze'):
+            analysis_result = current_app.result_cache.get_or_compute(text, current_app.analysis_executor.analyze)
+    except AnalysisQueueFull:
+        return busy_response()
+    except AnalysisTimeout:
+        return jsonify({'success': False, 'message': 'Analysis timed out'}), 504
+    
+    # Look for a near-duplicate among the user's earlier reports
+    with span('minhash'):
+        signature = MINHASHER.signature(text)
+    duplicate_of = None
+    if signature is not None:
+        with span('db.similar'):
+            matches = Report.find_similar(signature, user_id=user_id, min_similarity=DUPLICATE_THRESHOLD, limit=1)
+        if matches:
+            duplicate_of = {'report_id': matches[0]['report_id'], 'similarity': matches[0]['similarity']}
     
-    # Create report
-    report_id = Report.create_report(
+    # Create report and update user analysis count and style baseline, comparing against the baseline so far
+    report_doc = Report.build_report(
         user_id=user_id,
         content=text[:500],  # Store first 500 chars
         originality_score=analysis_result['originality_score'],
         drift_details=analysis_result['drift_details'],
-        style_analysis=analysis_result['style_fingerprint']
+        style_analysis=analysis_result['style_fingerprint'],
+        signature=signature
     )
-    
-    # Update user analysis count
-    User.increment_analysis_count(user_id)
+    report_ids, baseline = Report.save_analyses(user_id, [report_doc], [analysis_result])
+    report_id = report_ids[0]
+    baseline_drift, baseline_details = StyleBaseline.drift(baseline, StyleBaseline.metrics(analysis_result))
     
     return jsonify({
         'success': True,
@@ -45,22 +82,314 @@ def analyze_text():
         'confidence': analysis_result['confidence'],
         'drift_details': analysis_result['drift_details'],
         'suggestions': analysis_result['suggestions'],
-        'style_fingerprint': analysis_result['style_fingerprint']
+        'style_fingerprint': analysis_result['style_fingerprint'],
+        'special_case': analysis_result.get('special_case'),
+        'known_text': analysis_result.get('known_text'),
+        'sentence_spans': analysis_result.get('sentence_spans'),
+        'baseline_drift': baseline_drift,
+        'baseline_details': baseline_details,
+        'duplicate_of': duplicate_of
+    }), 201
+
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+@admission_controlled
+def analyze_batch():
+    """Analyze many texts in one request"""
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or not isinstance(data.get('texts'), list) or not data['texts']:
+        return jsonify({'success': False, 'message': 'A non-empty list of texts is required'}), 400
+    
+    if len(data['texts']) > MAX_BATCH_SIZE:
+        return jsonify({'success': False, 'message': f'At most {MAX_BATCH_SIZE} texts per batch'}), 400
+    
+    texts = [text.strip() if isinstance(text, str) else '' for text in data['texts']]
+    valid = [i for i, text in enumerate(texts) if len(text) >= 10]
+    
+    # Serve repeated texts from the cache, score the rest in one vectorized pass
+    cache = current_app.result_cache
+    with span('cache'):
+        analyses = [cache.get(texts[i]) for i in valid]
+    misses = [n for n, analysis in enumerate(analyses) if analysis is None]
+    miss_texts = [texts[valid[n]] for n in misses]
+    try:
+        with span('analyze'):
+            scored = current_app.analysis_executor.run(
+                BatchScorer.analyze_texts, miss_texts, size=sum(len(t) for t in miss_texts)
+            )
+    except AnalysisQueueFull:
+        return busy_response()
+    except AnalysisTimeout:
+        return jsonify({'success': False, 'message': 'Analysis timed out'}), 504
+    for n, analysis in zip(misses, scored):
+        cache.set(texts[valid[n]], analysis)
+        analyses[n] = analysis
+    
+    # Store all reports with a single insert (or queue them for the write-behind buffer)
+    report_docs = [
+        Report.build_report(
+            user_id=user_id,
+            content=texts[i][:500],  # Store first 500 chars
+            originality_score=analysis['originality_score'],
+            drift_details=analysis['drift_details'],
+            style_analysis=analysis['style_fingerprint'],
+            signature=MINHASHER.signature(texts[i])
+        )
+        for i, analysis in zip(valid, analyses)
+    ]
+    report_ids, baseline = Report.save_analyses(user_id, report_docs, analyses)
+    
+    results = [
+        {'index': i, 'success': False, 'message': 'Text must be at least 10 characters'}
+        for i in range(len(texts))
+    ]
+    for i, analysis, report_id in zip(valid, analyses, report_ids):
+        baseline_drift, baseline_details = StyleBaseline.drift(baseline, StyleBaseline.metrics(analysis))
+        results[i] = {
+            'index': i,
+            'success': True,
+            'report_id': report_id,
+            'originality_score': analysis['originality_score'],
+            'ai_similarity': analysis['ai_similarity'],
+            'style_drift': analysis['style_drift'],
+            'confidence': analysis['confidence'],
+            'drift_details': analysis['drift_details'],
+            'suggestions': analysis['suggestions'],
+            'style_fingerprint': analysis['style_fingerprint'],
+            'special_case': analysis.get('special_case'),
+            'known_text': analysis.get('known_text'),
+            'sentence_spans': analysis.get('sentence_spans'),
+            'baseline_drift': baseline_drift,
+            'baseline_details': baseline_details
+        }
+    
+    return jsonify({
+        'success': True,
+        'results': results,
+        'count': len(report_ids)
     }), 201
 
+@bp.route('/stream', methods=['POST'])
+@jwt_required()
+@admission_controlled
+def analyze_stream():
+    """Analyze a very large document as a stream, reporting per-section scores
+
+    Accepts either a multipart upload in the `file` field or the raw text
+    as the request body. Responds with newline-delimited JSON: one
+    `section` event per section, then a final `result` event.
+    """
+    user_id = get_jwt_identity()
+    is_upload = request.mimetype == 'multipart/form-data'
+    analyzer = StreamingAnalyzer()
+    
+    def generate():
+        # The body is only read once the response starts streaming
+        if is_upload and 'file' not in request.files:
+            yield json.dumps({'type': 'error', 'message': 'File field required'}) + '\n'
+            return
+        source = request.files['file'].stream if is_upload else request.stream
+        text_chunks = analyzer.iter_text_chunks(analyzer.iter_stream(source))
+        for event in analyzer.analyze(text_chunks):
+            if event['type'] == 'result':
+                analysis = event['analysis']
+                if len(event['preview']) >= 10:
+                    report_doc = Report.build_report(
+                        user_id=user_id,
+                        content=event['preview'],
+                        originality_score=analysis['originality_score'],
+                        drift_details=analysis['drift_details'],
+                        style_analysis=analysis['style_fingerprint']
+                    )
+                    event['report_id'] = Report.save_analyses(user_id, [report_doc], [analysis])[0][0]
+                del event['preview']
+            yield json.dumps(event) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@bp.route('/incremental', methods=['POST'])
+@jwt_required()
+@admission_controlled
+def analyze_incremental():
+    """Re-analyze an edited draft, recomputing only the paragraphs that changed
+
+    Pass the `draft_id` returned by the previous call (or the
+    `previous_report_id` of a draft saved with `save: true`). Reports are
+    only stored when `save` is true, so this can back live scoring.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or 'text' not in data:
+        return jsonify({'success': False, 'message': 'Text content required'}), 400
+    
+    text = data.get('text', '').strip()
+    
+    if len(text) < 10:
+        return jsonify({'success': False, 'message': 'Text must be at least 10 characters'}), 400
+    
+    previous_id = data.get('draft_id') or data.get('previous_report_id')
+    analysis_result, draft_id, info = current_app.incremental_analyzer.analyze(user_id, text, previous_id)
+    
+    response = {
+        'success': True,
+        'draft_id': draft_id,
+        'incremental': info,
+        'originality_score': analysis_result['originality_score'],
+        'ai_similarity': analysis_result['ai_similarity'],
+        'style_drift': analysis_result['style_drift'],
+        'confidence': analysis_result['confidence'],
+        'drift_details': analysis_result['drift_details'],
+        'suggestions': analysis_result['suggestions'],
+        'style_fingerprint': analysis_result['style_fingerprint']
+    }
+    
+    if data.get('save'):
+        report_doc = Report.build_report(
+            user_id=user_id,
+            content=text[:500],  # Store first 500 chars
+            originality_score=analysis_result['originality_score'],
+            drift_details=analysis_result['drift_details'],
+            style_analysis=analysis_result['style_fingerprint'],
+            signature=MINHASHER.signature(text)
+        )
+        response['report_id'] = Report.save_analyses(user_id, [report_doc], [analysis_result])[0][0]
+        current_app.incremental_analyzer.alias(user_id, draft_id, response['report_id'])
+    
+    return jsonify(response), 200
+
+@bp.route('/jobs', methods=['POST'])
+@jwt_required()
+def create_analysis_job():
+    """Queue a text (or a batch of texts) for background analysis"""
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or ('text' not in data and 'texts' not in data):
+        return jsonify({'success': False, 'message': 'Text content required'}), 400
+    
+    if 'texts' in data:
+        if not isinstance(data['texts'], list) or not data['texts'] or len(data['texts']) > MAX_BATCH_SIZE:
+            return jsonify({'success': False, 'message': f'Between 1 and {MAX_BATCH_SIZE} texts required'}), 400
+        texts = [text.strip() for text in data['texts'] if isinstance(text, str) and len(text.strip()) >= 10]
+        if not texts:
+            return jsonify({'success': False, 'message': 'Text must be at least 10 characters'}), 400
+        size = sum(len(text) for text in texts)
+        text = None
+    else:
+        text = data.get('text', '').strip()
+        if len(text) < 10:
+            return jsonify({'success': False, 'message': 'Text must be at least 10 characters'}), 400
+        size = len(text)
+        texts = None
+    
+    if size > MAX_JOB_TEXT_CHARS:
+        return jsonify({'success': False, 'message': f'Jobs are limited to {MAX_JOB_TEXT_CHARS} characters'}), 413
+    
+    # Back-pressure: refuse new work while the queue is full
+    if AnalysisJob.count_queued() >= current_app.config['JOB_MAX_QUEUED']:
+        response = jsonify({'success': False, 'message': 'Job queue is full, please retry later'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    job_id = AnalysisJob.create_job(user_id, text=text, texts=texts)
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'queued'
+    }), 202
+
+def get_owned_job(job_id, user_id):
+    """Return (job, error_response)"""
+    job = AnalysisJob.get_job(job_id)
+    if not job:
+        return None, (jsonify({'success': False, 'message': 'Job not found'}), 404)
+    if job['user_id'] != user_id:
+        return None, (jsonify({'success': False, 'message': 'Unauthorized'}), 403)
+    return job, None
+
+def job_payload(job):
+    """Public view of a job document"""
+    payload = {
+        'job_id': job['_id'],
+        'status': job['status'],
+        'attempts': job.get('attempts', 0),
+        'created_at': job['created_at'].isoformat()
+    }
+    if job['status'] == 'done':
+        payload['result'] = job.get('result')
+        payload['report_ids'] = job.get('report_ids', [])
+    if job['status'] == 'failed' or job.get('error'):
+        payload['error'] = job.get('error')
+    return payload
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_analysis_job(job_id):
+    """Poll an analysis job"""
+    job, error = get_owned_job(job_id, get_jwt_identity())
+    if error:
+        return error
+    
+    return jsonify({'success': True, 'job': job_payload(job)}), 200
+
+@bp.route('/jobs/<job_id>/events', methods=['GET'])
+@jwt_required()
+def stream_analysis_job(job_id):
+    """Server-Sent Events stream of job status changes, ending with the result
+
+    Each connection lasts at most JOB_EVENTS_TIMEOUT seconds and then sends
+    a `timeout` event; reconnect to keep following the job.
+    """
+    job, error = get_owned_job(job_id, get_jwt_identity())
+    if error:
+        return error
+    
+    def generate():
+        last_status = None
+        deadline = time.monotonic() + JOB_EVENTS_TIMEOUT
+        yield f"retry: {JOB_EVENTS_RETRY_MS}\n\n"
+        while True:
+            current = AnalysisJob.get_job(job_id)
+            if current is None:
+                yield 'event: error\ndata: {"message": "Job not found"}\n\n'
+                return
+            if current['status'] != last_status:
+                last_status = current['status']
+                event = 'result' if last_status in ('done', 'failed') else 'status'
+                yield f"event: {event}\ndata: {json.dumps(job_payload(current))}\n\n"
+                if event == 'result':
+                    return
+            if time.monotonic() > deadline:
+                yield 'event: timeout\ndata: {}\n\n'
+                return
+            time.sleep(1.0)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @bp.route('/history', methods=['GET'])
 @jwt_required()
 def get_analysis_history():
-    """Get user's analysis history"""
+    """Get user's analysis history, a page at a time (pass back next_cursor as ?cursor=)"""
     user_id = get_jwt_identity()
-    limit = request.args.get('limit', 10, type=int)
+    limit = page_size(request.args.get('limit', 10, type=int))
     
-    reports = Report.get_user_reports(user_id, limit=min(limit, 50))
+    try:
+        reports, next_cursor = Report.get_user_reports(user_id, limit=limit, cursor=request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
     
     return jsonify({
         'success': True,
         'reports': reports,
-        'count': len(reports)
+        'count': len(reports),
+        'next_cursor': next_cursor
     }), 200
 
 @bp.route('/trend', methods=['GET'])
@@ -87,6 +416,23 @@ def get_originality_trend():
         'average_score': sum(r['originality_score'] for r in reports) / len(reports) if reports else 0
     }), 200
 
+@bp.route('/baseline', methods=['GET'])
+@jwt_required()
+def get_style_baseline():
+    """Get the user's running style baseline"""
+    user_id = get_jwt_identity()
+    user = User.get_user_by_id(user_id)
+
+    if not user:
+        return jsonify({'success': False, 'message': 'User not found'}), 404
+
+    profile = user.get('style_profile') or {}
+    return jsonify({
+        'success': True,
+        'samples': profile.get('samples', 0),
+        'baseline': StyleBaseline.summary(profile)
+    }), 200
+
 @bp.route('/report/<report_id>', methods=['GET'])
 @jwt_required()
 def get_report(report_id):
@@ -106,3 +452,39 @@ def get_report(report_id):
         'success': True,
         'report': report
     }), 200
+
+@bp.route('/report/<report_id>/similar', methods=['GET'])
+@jwt_required()
+def get_similar_reports(report_id):
+    """Get near-duplicate reports (admins search every user's reports)"""
+    user_id = get_jwt_identity()
+    
+    report = Report.get_report_by_id(report_id)
+    
+    if not report:
+        return jsonify({'success': False, 'message': 'Report not found'}), 404
+    
+    user = User.get_user_by_id(user_id)
+    is_admin = bool(user) and user.get('role') == 'admin'
+    
+    # Check ownership
+    if str(report['user_id']) != user_id and not is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    
+    signature = Report.get_report_signature(report_id)
+    if signature is None:
+        return jsonify({'success': True, 'indexed': False, 'similar': []}), 200
+    
+    similar = Report.find_similar(
+        signature,
+        user_id=None if is_admin else user_id,
+        exclude_id=report_id,
+        min_similarity=min(max(request.args.get('min_similarity', 0.5, type=float), 0.0), 1.0),
+        limit=min(request.args.get('limit', 10, type=int), 50)
+    )
+    
+    return jsonify({
+        'success': True,
+        'indexed': True,
+        'similar': similar
+    }), 200
@@ -0,0 +1,128 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+
+
+class ResponseCache:
+    """Per-process TTL cache of admin read responses with single-flight recomputation
+
+    Entries are whole 200 responses keyed by request path and query
+    string, kept for `ttl_seconds`. When an entry is missing or expired,
+    one request recomputes it while concurrent requests for the same key
+    wait for that result instead of recomputing it too, so a dashboard
+    refresh from several admins costs one computation. A failed or
+    non-200 computation is not stored; waiters then compute their own.
+
+    `invalidate` drops every entry and stops computations already in
+    progress from storing their (possibly stale) result. Report writes
+    invalidate only when `invalidate_on_write` is set, since under steady
+    traffic that would leave little to cache. Invalidation reaches this
+    process only; other workers serve their entries until they expire.
+    """
+
+    def __init__(self, ttl_seconds=15, max_entries=64, invalidate_on_write=False):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.invalidate_on_write = invalidate_on_write
+        self._entries = OrderedDict()
+        self._computing = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'waits': 0, 'invalidations': 0}
+
+    def get_or_compute(self, key, compute):
+        """(value, age in seconds) for key, computing it on a miss
+
+        `compute` returns (value, cacheable); uncacheable values are
+        returned to this caller only. A ttl of 0 or less disables the
+        cache, so every call computes independently.
+        """
+        if self.ttl_seconds <= 0:
+            value, _ = compute()
+            return value, 0.0
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                now = time.monotonic()
+                if entry is not None and now - entry[1] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return entry[0], now - entry[1]
+                pending = self._computing.get(key)
+                if pending is None:
+                    pending = self._computing[key] = threading.Event()
+                    generation = self._generation
+                    self._counters['misses'] += 1
+                    break
+                self._counters['waits'] += 1
+            # Another request is computing this key; use its result once it lands.
+            # The event is always set when that computation ends, even on error.
+            pending.wait()
+
+        try:
+            value, cacheable = compute()
+            if cacheable:
+                self._store(key, value, generation)
+        finally:
+            with self._lock:
+                del self._computing[key]
+            pending.set()
+        return value, 0.0
+
+    def _store(self, key, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._counters['invalidations'] += 1
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['invalidate_on_write'] = self.invalidate_on_write
+        return stats
+
+
+def invalidate_admin_cache(write=False):
+    """Invalidate the app's admin response cache; `write` marks a routine report write"""
+    cache = getattr(current_app, 'admin_cache', None)
+    if cache is not None and (cache.invalidate_on_write or not write):
+        cache.invalidate()
+
+
+def cached_response(view):
+    """Serve the view from the app's ResponseCache, with Cache-Control and Age headers
+
+    Place it below the auth decorator so every request is still authorized.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        cache = current_app.admin_cache
+
+        def compute():
+            response = make_response(view(*args, **kwargs))
+            return (response.get_data(), response.status_code, response.mimetype), response.status_code == 200
+
+        (body, status, mimetype), age = cache.get_or_compute(request.full_path, compute)
+        response = current_app.response_class(body, status=status, mimetype=mimetype)
+        if status == 200:
+            response.headers['Cache-Control'] = f'private, max-age={math.floor(cache.ttl_seconds)}'
+            response.headers['Age'] = str(math.floor(age))
+        return response
+    return decorated_function
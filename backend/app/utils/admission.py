@@ -0,0 +1,176 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request can't be admitted within the wait limit"""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Over analysis budget, retry after {retry_after}s')
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Cost-aware admission control for analysis requests
+
+    A request costs its body size in characters (analysis time grows
+    with text length), plus a fixed `base_cost` for per-request
+    overhead. Admitted requests hold their cost against `max_cost`
+    until they finish. Requests larger than `small_request_cost` may
+    only fill `large_share` of the budget, so a few huge pastes can't
+    crowd out normal-sized requests during a burst. A request that
+    doesn't fit waits up to `max_wait` seconds, with at most `max_queue`
+    requests waiting. Otherwise it is rejected with a retry delay
+    estimated from the recent completion rate.
+
+    The budget is per process; with several gunicorn workers the total
+    is workers * max_cost. A max_cost of 0 admits everything. It only
+    has something to arbitrate when a process serves requests
+    concurrently: sync gunicorn workers handle one request at a time,
+    so run threaded workers (gunicorn.conf.py uses gthread).
+    """
+
+    # Completions this recent (seconds) feed the throughput estimate, summed per second
+    THROUGHPUT_WINDOW = 10
+
+    def __init__(self, max_cost=2000000, small_request_cost=20000, large_share=0.5,
+                 max_queue=64, max_wait=2.0, base_cost=1000):
+        self.max_cost = max_cost
+        self.small_request_cost = small_request_cost
+        self.large_budget = min(max(int(max_cost * large_share), small_request_cost), max_cost)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.base_cost = base_cost
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._large_in_flight = 0
+        self._waiting = 0
+        self._waiting_cost = 0
+        # Ring of per-second completed cost: (second, cost) per slot
+        self._completions = [(0, 0)] * self.THROUGHPUT_WINDOW
+        self._admitted = 0
+        self._rejected = 0
+
+    def estimate_cost(self, content_length):
+        """Cost of a request from its body size (bodies of unknown size count as large)"""
+        if content_length is None:
+            return self.large_budget
+        return self.base_cost + content_length
+
+    def _fits(self, cost, large):
+        if self._in_flight + cost > self.max_cost:
+            return False
+        return not large or self._large_in_flight + cost <= self.large_budget
+
+    def acquire(self, cost):
+        """Admit a request of this cost, waiting for budget if needed; returns a ticket for release()"""
+        if self.max_cost <= 0:
+            return None
+        large = cost > self.small_request_cost
+        # Oversized requests are charged the whole budget they may use, so they still run (alone)
+        cost = min(cost, self.large_budget if large else self.max_cost)
+        deadline = time.monotonic() + self.max_wait
+
+        with self._condition:
+            if not self._fits(cost, large):
+                if self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    raise AdmissionRejected(self._retry_after(cost))
+                self._waiting += 1
+                self._waiting_cost += cost
+                try:
+                    while not self._fits(cost, large):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._rejected += 1
+                            raise AdmissionRejected(self._retry_after(cost))
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+                    self._waiting_cost -= cost
+
+            self._in_flight += cost
+            if large:
+                self._large_in_flight += cost
+            self._admitted += 1
+        return cost, large
+
+    def release(self, ticket):
+        """Return an admitted request's cost to the budget"""
+        if ticket is None:
+            return
+        cost, large = ticket
+        with self._condition:
+            self._in_flight -= cost
+            if large:
+                self._large_in_flight -= cost
+            second = int(time.monotonic())
+            slot = second % self.THROUGHPUT_WINDOW
+            bucket_second, completed = self._completions[slot]
+            self._completions[slot] = (second, completed + cost if bucket_second == second else cost)
+            self._condition.notify_all()
+
+    def _throughput(self):
+        """Cost completed per second over the last THROUGHPUT_WINDOW seconds (caller holds the lock)"""
+        oldest = int(time.monotonic()) - self.THROUGHPUT_WINDOW
+        return sum(cost for second, cost in self._completions if second > oldest) / self.THROUGHPUT_WINDOW
+
+    def _retry_after(self, cost):
+        """Seconds until the backlog ahead of a request of this cost has likely drained"""
+        throughput = self._throughput()
+        if throughput <= 0:
+            return 5
+        backlog = self._in_flight + self._waiting_cost + cost - self.max_cost
+        return min(60, max(1, math.ceil(backlog / throughput)))
+
+    def stats(self):
+        """Current budget usage and admission counters"""
+        with self._condition:
+            return {
+                'max_cost': self.max_cost,
+                'large_budget': self.large_budget,
+                'in_flight_cost': self._in_flight,
+                'large_in_flight_cost': self._large_in_flight,
+                'waiting': self._waiting,
+                'waiting_cost': self._waiting_cost,
+                'throughput_per_sec': round(self._throughput(), 1),
+                'admitted': self._admitted,
+                'rejected': self._rejected
+            }
+
+
+def busy_response(retry_after=5):
+    """503 telling the client when to retry"""
+    response = jsonify({'success': False, 'message': 'Analyzer is busy, please retry shortly'})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
+
+def admission_controlled(view):
+    """Run the view only once the app's AdmissionController admits the request
+
+    The request's cost is held until the response is fully sent, which
+    for streamed responses is after the view has returned.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        controller = current_app.admission
+        try:
+            ticket = controller.acquire(controller.estimate_cost(request.content_length))
+        except AdmissionRejected as e:
+            return busy_response(e.retry_after)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except BaseException:
+            controller.release(ticket)
+            raise
+        if response.is_streamed:
+            response.call_on_close(lambda: controller.release(ticket))
+        else:
+            controller.release(ticket)
+        return response
+    return decorated_function
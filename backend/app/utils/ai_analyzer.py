@@ -1,5 +1,41 @@
-import re
+import os
 from collections import Counter
+from app.utils.text_features import TextFeatures
+from app.utils.phrase_matcher import PhraseMatcher
+from app.utils.patterns import SPECIAL_CASE_PATTERNS, match_special_case
+from app.utils.timing import span
+from app.utils.known_texts import LazyKnownTextIndex
+from app.utils.scoring_model import ScoringModel
+
+# Learned originality weights (see `flask scoring-model-train`); without them the rules below score
+SCORING_MODEL_PATH = os.getenv(
+    'SCORING_MODEL_PATH',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'scoring_model', 'weights.npy'))
+)
+SCORING_MODEL = ScoringModel.load_or_none(SCORING_MODEL_PATH)
+
+# Bump RULES_VERSION whenever scoring changes so cached and stored results can be told apart
+RULES_VERSION = '1.2'
+ANALYZER_VERSION = RULES_VERSION if SCORING_MODEL is None else f'{RULES_VERSION}+model.{SCORING_MODEL.version}'
+
+# Reference texts for known-text detection and where their index is stored
+KNOWN_TEXTS_DIR = os.getenv(
+    'KNOWN_TEXTS_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'known_texts'))
+)
+KNOWN_TEXTS_INDEX_DIR = os.getenv('KNOWN_TEXTS_INDEX_DIR', os.path.join(KNOWN_TEXTS_DIR, '.index'))
+
+# Percentage of a text's words inside known passages that makes it a special case
+KNOWN_TEXT_THRESHOLD = 50.0
+
+# check_special_cases default: the known-text match hasn't been computed yet
+NOT_MATCHED = object()
+
+# Exercises every stage once; used to warm the analyzer at startup
+WARMUP_TEXT = (
+    "Furthermore, it is worth noting that I don't think the results were clear. "
+    "Honestly, we tried again! The second attempt was better... Maybe?\n\n"
+    "In conclusion, we're done. Copyright notices aside, this is ours."
+)
 
 class OriginallityAnalyzer:
     """Advanced AI originality analyzer with consistency"""
@@ -15,14 +51,49 @@ class OriginallityAnalyzer:
         'it is evident that', 'it is clear that', 'it is important to note'
     ]
     
-    # Copyrighted/Special content detection
-    COPYRIGHTED_PATTERNS = [
-        r'\b(national anthem|pledge of allegiance|star-spangled banner)\b',
-        r'\b(to be or not to be|hamlet|shakespeare)\b',
-        r'\b(copyright|©|®|trademark)\b',
-        r'\b(all rights reserved|licensed under)\b'
+    # Lexicons matched in a single pass by PHRASE_MATCHER (see bottom of module)
+    PASSIVE_PATTERNS = [' was ', ' were ', ' is being ', ' are being ', ' be ', ' been ']
+    
+    DRIFT_PASSIVE_PATTERNS = [' was ', ' were ', ' is being ', ' are being']
+    
+    VERBOSE_PATTERNS = [
+        'it is worth noting', 'it should be noted', 'in conclusion',
+        'to summarize', 'in essence', 'in light of the fact',
+        'furthermore', 'moreover', 'nevertheless', 'however',
+        'it is evident', 'it is clear', 'it is important to note',
+        'the aforementioned', 'as previously mentioned', 'as noted above',
+        'in any case', 'in point of fact', 'needless to say',
+        'as a result', 'consequently', 'therefore', 'thus',
+        'in conclusion', 'ultimately', 'essentially', 'notably'
+    ]
+    
+    CONTRACTIONS = [
+        "don't", "can't", "won't", "isn't", "doesn't", "aren't", "haven't", "hadn't",
+        "wasn't", "weren't", "i'm", "you're", "it's", "we're", "they're",
+        "i've", "you've", "we've", "they've", "i'll", "you'll", "we'll", "they'll"
+    ]
+    
+    PERSONAL_PRONOUNS = [' i ', ' i\'', ' me ', ' my ', ' mine ', ' we ', ' us ', ' our ', ' ours ']
+    
+    CASUAL_WORDS = [
+        'like', 'just', 'really', 'actually', 'literally', 'honestly', 'you know',
+        'i think', 'i feel', 'kinda', 'sorta', 'lol', 'btw', 'imo', 'tbh', 'ngl'
     ]
     
+    TRANSITIONS = [
+        'however', 'therefore', 'moreover', 'furthermore', 'additionally',
+        'conversely', 'consequently', 'subsequently', 'ultimately', 'notably'
+    ]
+    
+    SUGGESTION_CONTRACTIONS = ["don't", "can't", "won't", "isn't", "i'm", "you're", "it's", "i've"]
+    
+    SUGGESTION_PRONOUNS = ['i ', ' i ', ' me ', ' my ', ' we ']
+    
+    STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'is', 'was', 'are', 'be', 'it', 'that', 'this', 'with', 'by', 'as', 'from'}
+    
+    # Copyrighted/Special content detection (compiled in app.utils.patterns)
+    COPYRIGHTED_PATTERNS = SPECIAL_CASE_PATTERNS
+    
     @staticmethod
     def analyze_text(text):
         """Analyze text for AI originality with consistency"""
@@ -51,115 +122,244 @@ class OriginallityAnalyzer:
         
         try:
             # Check for special cases first
-            special_case = OriginallityAnalyzer.check_special_cases(text)
+            with span('analyzer.special_cases'):
+                known_text = OriginallityAnalyzer.match_known_text(text)
+                special_case = OriginallityAnalyzer.check_special_cases(text, known_text)
             if special_case:
                 return special_case
             
+            # Extract text features once, shared by every stage below
+            with span('analyzer.features'):
+                features = OriginallityAnalyzer.extract_features(text)
+            
             # Get style fingerprint
-            style_fingerprint = OriginallityAnalyzer.get_style_fingerprint(text)
+            with span('analyzer.fingerprint'):
+                style_fingerprint = OriginallityAnalyzer.get_style_fingerprint(text, features)
             
             # Calculate scores using deterministic methods
-            originality_score = OriginallityAnalyzer.calculate_originality(text, style_fingerprint)
-            ai_similarity = 100.0 - originality_score
-            style_drift = OriginallityAnalyzer.calculate_style_drift(text, style_fingerprint)
-            confidence = OriginallityAnalyzer.calculate_confidence(text, originality_score)
+            with span('analyzer.scoring'):
+                signals = OriginallityAnalyzer.extract_signals(text, style_fingerprint, features)
+                originality_score = OriginallityAnalyzer.score_originality(signals)
+                style_drift = OriginallityAnalyzer.score_style_drift(signals)
+                confidence = OriginallityAnalyzer.calculate_confidence(text, originality_score, features)
             
             # Generate actionable suggestions
-            suggestions = OriginallityAnalyzer.generate_suggestions(text, originality_score, style_drift, style_fingerprint)
+            with span('analyzer.suggestions'):
+                suggestions = OriginallityAnalyzer.generate_suggestions(text, originality_score, style_drift, style_fingerprint, features)
             
-            return {
-                'originality_score': float(round(originality_score, 1)),
-                'ai_similarity': float(round(ai_similarity, 1)),
-                'style_drift': float(round(style_drift, 1)),
-                'confidence': float(round(confidence, 1)),
-                'drift_details': {
-                    'ai_phrase_count': int(style_fingerprint.get('ai_phrase_count', 0)),
-                    'avg_sentence_length': float(style_fingerprint.get('avg_sentence_length', 0)),
-                    'vocabulary_diversity': float(style_fingerprint.get('vocabulary_diversity', 0)),
-                    'repetition_ratio': float(style_fingerprint.get('repetition_ratio', 0))
-                },
-                'suggestions': suggestions,
-                'style_fingerprint': {
-                    'word_count': int(style_fingerprint.get('word_count', 0)),
-                    'sentence_count': int(style_fingerprint.get('sentence_count', 0)),
-                    'vocabulary_diversity': float(style_fingerprint.get('vocabulary_diversity', 0)),
-                    'avg_sentence_length': float(style_fingerprint.get('avg_sentence_length', 0)),
-                    'ai_phrase_count': int(style_fingerprint.get('ai_phrase_count', 0)),
-                    'unique_word_ratio': float(style_fingerprint.get('unique_word_ratio', 0))
-                }
-            }
+            return OriginallityAnalyzer.build_result(
+                originality_score, style_drift, confidence, suggestions, style_fingerprint, known_text,
+                features.sentence_spans
+            )
         except Exception as e:
             print(f"Analysis error: {e}")
-            return {
-                'originality_score': 50.0,
-                'ai_similarity': 50.0,
-                'style_drift': 25.0,
-                'confidence': 60.0,
-                'drift_details': {},
-                'suggestions': ['Unable to analyze text, please try again'],
-                'style_fingerprint': {}
+            return OriginallityAnalyzer.error_result()
+    
+    @staticmethod
+    def error_result():
+        """Neutral result returned when analysis fails; `analysis_error` keeps it out of the result cache"""
+        return {
+            'originality_score': 50.0,
+            'ai_similarity': 50.0,
+            'style_drift': 25.0,
+            'confidence': 60.0,
+            'drift_details': {},
+            'suggestions': ['Unable to analyze text, please try again'],
+            'style_fingerprint': {},
+            'analysis_error': True
+        }
+    
+    @staticmethod
+    def build_result(originality_score, style_drift, confidence, suggestions, style_fingerprint, known_text=None, sentence_spans=None):
+        """Assemble the public analysis result from computed scores
+
+        `sentence_spans` are the (start, end) offsets of the analyzed
+        text's sentences, returned so clients can highlight them.
+        """
+        result = {
+            'originality_score': float(round(originality_score, 1)),
+            'ai_similarity': float(round(100.0 - originality_score, 1)),
+            'style_drift': float(round(style_drift, 1)),
+            'confidence': float(round(confidence, 1)),
+            'drift_details': {
+                'ai_phrase_count': int(style_fingerprint.get('ai_phrase_count', 0)),
+                'avg_sentence_length': float(style_fingerprint.get('avg_sentence_length', 0)),
+                'vocabulary_diversity': float(style_fingerprint.get('vocabulary_diversity', 0)),
+                'repetition_ratio': float(style_fingerprint.get('repetition_ratio', 0))
+            },
+            'suggestions': suggestions,
+            'style_fingerprint': {
+                'word_count': int(style_fingerprint.get('word_count', 0)),
+                'sentence_count': int(style_fingerprint.get('sentence_count', 0)),
+                'vocabulary_diversity': float(style_fingerprint.get('vocabulary_diversity', 0)),
+                'avg_sentence_length': float(style_fingerprint.get('avg_sentence_length', 0)),
+                'ai_phrase_count': int(style_fingerprint.get('ai_phrase_count', 0)),
+                'unique_word_ratio': float(style_fingerprint.get('unique_word_ratio', 0))
             }
+        }
+        if known_text:
+            result['known_text'] = known_text
+        if sentence_spans is not None:
+            result['sentence_spans'] = [[start, end] for start, end in sentence_spans]
+        return result
     
     @staticmethod
-    def check_special_cases(text):
-        """Check for copyrighted or special content"""
-        text_lower = text.lower()
-        
-        # Check for copyrighted content
-        for pattern in OriginallityAnalyzer.COPYRIGHTED_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                return {
-                    'originality_score': 5.0,
-                    'ai_similarity': 95.0,
-                    'style_drift': 10.0,
-                    'confidence': 95.0,
-                    'drift_details': {
-                        'ai_phrase_count': 0,
-                        'avg_sentence_length': 0.0,
-                        'vocabulary_diversity': 0.0,
-                        'repetition_ratio': 0.0
-                    },
-                    'suggestions': [
-                        '⚠️ This appears to be copyrighted or well-known content',
-                        '📝 Paraphrase in your own words to make it original',
-                        '📚 Use proper citations for referencing published material'
-                    ],
-                    'style_fingerprint': {}
-                }
+    def extract_features(text):
+        """Build the shared TextFeatures for text, including all lexicon hits"""
+        return TextFeatures.from_text(text, PHRASE_MATCHER)
+    
+    @staticmethod
+    def warm_up():
+        """Run one analysis so the first real request pays no first-call costs"""
+        OriginallityAnalyzer.analyze_text(WARMUP_TEXT)
+    
+    @staticmethod
+    def match_known_text(text):
+        """Overlap of text with the known-text corpus, or None"""
+        return KNOWN_TEXTS.match(text)
+    
+    @staticmethod
+    def known_text_coverage(text):
+        """Mergeable known-text counts of text (see KnownTextIndex.coverage)"""
+        return KNOWN_TEXTS.coverage(text)
+    
+    @staticmethod
+    def check_special_cases(text, known_text=NOT_MATCHED):
+        """Check for copyright notices and well-known reference texts
+
+        `known_text` is a precomputed match_known_text(text) result; pass
+        None to check notices only.
+        """
+        # Check for copyright/license notices (all categories in a single scan)
+        matched = match_special_case(text)
+        if not matched:
+            if known_text is NOT_MATCHED:
+                known_text = OriginallityAnalyzer.match_known_text(text)
+            if known_text and known_text['overlap'] >= KNOWN_TEXT_THRESHOLD:
+                matched = 'known_text'
+        if matched:
+            return OriginallityAnalyzer.special_case_result(
+                matched, known_text if known_text is not NOT_MATCHED else None
+            )
         
         return None
     
     @staticmethod
-    def calculate_originality(text, fingerprint):
+    def special_case_result(category, known_text=None):
+        """Fixed low-originality result for a special-case category"""
+        result = {
+            'originality_score': 5.0,
+            'ai_similarity': 95.0,
+            'style_drift': 10.0,
+            'confidence': 95.0,
+            'drift_details': {
+                'ai_phrase_count': 0,
+                'avg_sentence_length': 0.0,
+                'vocabulary_diversity': 0.0,
+                'repetition_ratio': 0.0
+            },
+            'suggestions': [
+                '⚠️ This appears to be copyrighted or well-known content',
+                '📝 Paraphrase in your own words to make it original',
+                '📚 Use proper citations for referencing published material'
+            ],
+            'style_fingerprint': {},
+            'special_case': category
+        }
+        if known_text:
+            result['known_text'] = known_text
+        return result
+    
+    @staticmethod
+    def extract_signals(text, fingerprint, features=None):
+        """Extract the raw numeric signals every scoring rule is evaluated on"""
+        features = features or OriginallityAnalyzer.extract_features(text)
+        hits = features.phrase_hits
+        word_count = features.word_count
+        sentence_lengths = features.sentence_word_counts
+        para_lengths = features.paragraph_word_counts
+        
+        # Top content-word repetition (only meaningful past 20 words)
+        top_repetition_score = 0
+        if word_count > 20:
+            stop_words = OriginallityAnalyzer.STOP_WORDS
+            word_freq = features.word_counts
+            content_counts = sorted(
+                (count for w, count in word_freq.items() if w not in stop_words and len(w) > 3),
+                reverse=True
+            )
+            # Check top 5 most used content words
+            for count in content_counts[:5]:
+                ratio = (count / word_count) * 100
+                if ratio > 3:  # More than 3% is suspicious
+                    top_repetition_score += ratio
+        
+        # Repetition of sentence openers (only meaningful past 2 sentences)
+        first_word_repetition = 0
+        if features.sentence_count > 2:
+            first_words = Counter(features.sentence_first_words)
+            first_word_repetition = max(first_words.values()) / features.sentence_count
+        
+        punctuation = features.punctuation_counts
+        
+        return {
+            'word_count': word_count,
+            'sentence_count': len(sentence_lengths),
+            'paragraph_count': len(para_lengths),
+            'ai_phrase_count': fingerprint.get('ai_phrase_count', 0),
+            'passive_count': hits.count_lexicon(OriginallityAnalyzer.PASSIVE_PATTERNS),
+            'drift_passive_count': hits.count_lexicon(OriginallityAnalyzer.DRIFT_PASSIVE_PATTERNS),
+            'sentence_length_std': OriginallityAnalyzer.calculate_variance(sentence_lengths),
+            'paragraph_length_std': OriginallityAnalyzer.calculate_variance(para_lengths),
+            'verbose_count': hits.present_in_lexicon(OriginallityAnalyzer.VERBOSE_PATTERNS),
+            'top_repetition_score': top_repetition_score,
+            'contraction_count': hits.count_lexicon(OriginallityAnalyzer.CONTRACTIONS),
+            'pronoun_count': hits.count_lexicon(OriginallityAnalyzer.PERSONAL_PRONOUNS),
+            'casual_count': hits.present_in_lexicon(OriginallityAnalyzer.CASUAL_WORDS),
+            'emotional_punctuation': punctuation['exclamation'] + punctuation['question'] + punctuation['ellipsis'],
+            'transition_count': hits.count_lexicon(OriginallityAnalyzer.TRANSITIONS),
+            'vocabulary_diversity': fingerprint.get('vocabulary_diversity', 0),
+            'first_word_repetition': first_word_repetition
+        }
+    
+    @staticmethod
+    def calculate_originality(text, fingerprint, features=None):
         """Calculate originality score using ENHANCED AI detection"""
         if not text:
             return 0.0
         
-        text_lower = text.lower()
-        words = text_lower.split()
-        word_count = len(words)
+        signals = OriginallityAnalyzer.extract_signals(text, fingerprint, features)
+        return OriginallityAnalyzer.score_originality(signals)
+    
+    @staticmethod
+    def score_originality(signals):
+        """Score extracted signals with the learned model, or the originality rules without one
+
+        Keep in sync with BatchScorer.score_originality, which evaluates
+        the same rules over whole arrays of documents.
+        """
+        if SCORING_MODEL is not None:
+            return SCORING_MODEL.score(signals)
+        
+        word_count = signals['word_count']
         
         # ========== ENHANCED AI DETECTION ALGORITHM (0-100) ==========
         ai_score = 0.0  # Start at 0 = 100% original
         
         # 1. FORMAL STRUCTURE & AI PHRASES (STRONGEST INDICATOR) - HEAVILY WEIGHTED
-        ai_phrase_count = fingerprint.get('ai_phrase_count', 0)
         if word_count > 0:
-            phrase_density = (ai_phrase_count * 100) / word_count
+            phrase_density = (signals['ai_phrase_count'] * 100) / word_count
             ai_score += min(phrase_density * 2.5, 50)  # INCREASED: Max +50 (was 40)
         
         # 2. PASSIVE VOICE (STRONGEST AI INDICATOR)
-        passive_patterns = [' was ', ' were ', ' is being ', ' are being ', ' be ', ' been ']
-        passive_count = sum(text_lower.count(pattern) for pattern in passive_patterns)
-        sentences = len([s for s in re.split(r'[.!?]+', text) if s.strip()])
+        sentences = signals['sentence_count']
         if sentences > 0:
-            passive_ratio = (passive_count / sentences) * 100
+            passive_ratio = (signals['passive_count'] / sentences) * 100
             ai_score += min(passive_ratio * 0.8, 40)  # INCREASED: Max +40 (was 35)
         
         # 3. SENTENCE UNIFORMITY (VERY AI-LIKE)
-        sentence_lengths = [len(s.split()) for s in re.split(r'[.!?]+', text) if s.strip()]
-        if len(sentence_lengths) > 2:
-            variance = OriginallityAnalyzer.calculate_variance(sentence_lengths)
+        if sentences > 2:
+            variance = signals['sentence_length_std']
             if variance < 2:
                 ai_score += 30  # INCREASED: +30 (was 25)
             elif variance < 4:
@@ -168,84 +368,44 @@ class OriginallityAnalyzer:
                 ai_score += 10
         
         # 4. VERBOSE/FORMAL LANGUAGE (AI signature)
-        verbose_patterns = [
-            'it is worth noting', 'it should be noted', 'in conclusion',
-            'to summarize', 'in essence', 'in light of the fact',
-            'furthermore', 'moreover', 'nevertheless', 'however',
-            'it is evident', 'it is clear', 'it is important to note',
-            'the aforementioned', 'as previously mentioned', 'as noted above',
-            'in any case', 'in point of fact', 'needless to say',
-            'as a result', 'consequently', 'therefore', 'thus',
-            'in conclusion', 'ultimately', 'essentially', 'notably'
-        ]
-        verbose_count = sum(1 for pattern in verbose_patterns if pattern in text_lower)
-        ai_score += min(verbose_count * 7, 35)  # INCREASED: Max +35 (was 25)
+        ai_score += min(signals['verbose_count'] * 7, 35)  # INCREASED: Max +35 (was 25)
         
         # 5. REPETITIVE WORD USE (AI SIGN - they reuse same words)
-        word_freq = Counter(words)
-        total_words = len(words)
-        if total_words > 20:
-            stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'is', 'was', 'are', 'be', 'it', 'that', 'this', 'with', 'by', 'as', 'from'}
-            content_words = [(w, word_freq[w]) for w in word_freq if w not in stop_words and len(w) > 3]
-            if content_words:
-                content_words.sort(key=lambda x: x[1], reverse=True)
-                # Check top 5 most used content words
-                top_repetition_score = 0
-                for w, count in content_words[:5]:
-                    ratio = (count / total_words) * 100
-                    if ratio > 3:  # More than 3% is suspicious
-                        top_repetition_score += ratio
-                ai_score += min(top_repetition_score * 1.5, 25)
+        if word_count > 20:
+            ai_score += min(signals['top_repetition_score'] * 1.5, 25)
         
         # 6. LACK OF HUMAN MARKERS (CRITICAL - absence = AI)
         
         # Contractions - HUMANS use lots, AI avoids
-        contractions = ["don't", "can't", "won't", "isn't", "doesn't", "aren't", "haven't", "hadn't", 
-                       "wasn't", "weren't", "i'm", "you're", "it's", "we're", "they're", 
-                       "i've", "you've", "we've", "they've", "i'll", "you'll", "we'll", "they'll"]
-        contraction_count = sum(text_lower.count(c) for c in contractions)
+        contraction_count = signals['contraction_count']
         if contraction_count == 0 and word_count > 30:
             ai_score += 22  # INCREASED: +22 (was 18) - NO contractions in 30+ words = VERY AI
         elif contraction_count < 1 and word_count > 50:
             ai_score += 18
         
         # Personal pronouns - HUMANS use naturally, AI avoids
-        personal_pronouns = [' i ', ' i\'', ' me ', ' my ', ' mine ', ' we ', ' us ', ' our ', ' ours ']
-        pronoun_count = sum(text_lower.count(p) for p in personal_pronouns)
+        pronoun_count = signals['pronoun_count']
         if pronoun_count == 0 and word_count > 50:
             ai_score += 18  # INCREASED: +18 (was 15) - NO personal voice = VERY AI
         elif pronoun_count < 2 and word_count > 100:
             ai_score += 12
         
         # Casual/conversational markers - HUMANS naturally use
-        casual_words = ['like', 'just', 'really', 'actually', 'literally', 'honestly', 'you know',
-                       'i think', 'i feel', 'kinda', 'sorta', 'lol', 'btw', 'imo', 'tbh', 'ngl']
-        casual_count = sum(1 for w in casual_words if w in text_lower)
-        if casual_count == 0 and word_count > 40:
+        if signals['casual_count'] == 0 and word_count > 40:
             ai_score += 15  # INCREASED: +15 (was 10) - NO casual language = likely AI
         
         # Emotional punctuation - HUMANS use for emphasis
-        exclamation_count = text.count('!')
-        question_count = text.count('?')
-        ellipsis_count = text.count('...')
-        emotional_punctuation = exclamation_count + question_count + ellipsis_count
-        if emotional_punctuation == 0 and word_count > 60:
+        if signals['emotional_punctuation'] == 0 and word_count > 60:
             ai_score += 14  # INCREASED: +14 (was 12) - NO emotional markers = AI
         
         # 7. STRUCTURE PERFECTION (AI writes "perfectly")
         # Check for balanced paragraph structure
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-        if paragraphs:
-            para_lengths = [len(p.split()) for p in paragraphs]
-            if len(para_lengths) > 2:
-                para_variance = OriginallityAnalyzer.calculate_variance(para_lengths)
-                if para_variance < 30:  # Very consistent paragraph lengths
-                    ai_score += 10
+        if signals['paragraph_count'] > 2:
+            if signals['paragraph_length_std'] < 30:  # Very consistent paragraph lengths
+                ai_score += 10
         
         # 8. TRANSITION WORD OVERUSE (AI overuses connectors)
-        transitions = ['however', 'therefore', 'moreover', 'furthermore', 'additionally',
-                      'conversely', 'consequently', 'subsequently', 'ultimately', 'notably']
-        transition_count = sum(text_lower.count(t) for t in transitions)
+        transition_count = signals['transition_count']
         if transition_count > 3:
             ai_score += min(transition_count * 3, 15)
         
@@ -254,8 +414,7 @@ class OriginallityAnalyzer:
         # (This is a heuristic - harder to detect programmatically)
         
         # 10. VOCABULARY PERFECTION
-        vocabulary_diversity = fingerprint.get('vocabulary_diversity', 0)
-        if vocabulary_diversity > 0.8 and word_count > 100:
+        if signals['vocabulary_diversity'] > 0.8 and word_count > 100:
             ai_score += 8  # Too-perfect vocabulary
         
         # ============ FINAL CALCULATION ============
@@ -264,40 +423,35 @@ class OriginallityAnalyzer:
         return float(round(originality_score, 1))
     
     @staticmethod
-    def calculate_style_drift(text, fingerprint):
+    def calculate_style_drift(text, fingerprint, features=None):
         """Calculate style drift - how AI-like the writing is"""
         if not text:
             return 0.0
         
-        text_lower = text.lower()
-        
+        signals = OriginallityAnalyzer.extract_signals(text, fingerprint, features)
+        return OriginallityAnalyzer.score_style_drift(signals)
+    
+    @staticmethod
+    def score_style_drift(signals):
+        """Apply the style drift rules to extracted signals"""
         # Count AI indicators
-        ai_phrase_count = fingerprint.get('ai_phrase_count', 0)
-        ai_count = ai_phrase_count * 2
+        ai_count = signals['ai_phrase_count'] * 2
         
         # Check for passive voice patterns
-        passive_patterns = [' was ', ' were ', ' is being ', ' are being']
-        passive_count = sum(text_lower.count(pattern) for pattern in passive_patterns)
-        ai_count += passive_count
+        ai_count += signals['drift_passive_count']
         
         # Check for repetitive structure
-        sentences = re.split(r'[.!?]+', text_lower)
-        sentences = [s.strip().split() for s in sentences if s.strip()]
-        
-        if len(sentences) > 2:
-            first_words = [s[0] if s else '' for s in sentences]
-            first_word_counts = Counter(first_words)
-            repetition = max(first_word_counts.values()) / len(first_words) if first_words else 0
-            ai_count += repetition * 10
+        if signals['sentence_count'] > 2:
+            ai_count += signals['first_word_repetition'] * 10
         
         # Normalize
         drift_score = min(100.0, float(ai_count * 1.5))
         return drift_score
     
     @staticmethod
-    def calculate_confidence(text, originality_score):
+    def calculate_confidence(text, originality_score, features=None):
         """Calculate confidence level"""
-        word_count = len(text.split())
+        word_count = features.word_count if features else len(text.split())
         
         # More text = higher confidence
         base_confidence = min(95.0, 40.0 + (word_count / 10.0))
@@ -311,11 +465,11 @@ class OriginallityAnalyzer:
         return max(20.0, min(99.0, base_confidence))
     
     @staticmethod
-    def generate_suggestions(text, originality_score, style_drift, fingerprint):
+    def generate_suggestions(text, originality_score, style_drift, fingerprint, features=None):
         """Generate actionable suggestions based on AI detection score"""
         suggestions = []
-        words = text.lower().split()
-        word_count = len(words)
+        features = features or OriginallityAnalyzer.extract_features(text)
+        word_count = features.word_count
         ai_phrase_count = fingerprint.get('ai_phrase_count', 0)
         
         # MAIN GUIDANCE based on originality (inverse of AI score)
@@ -362,20 +516,17 @@ class OriginallityAnalyzer:
             suggestions.append('⚠️ Reduce formal transitions (furthermore, moreover, in addition, etc.)')
         
         # Passive voice check
-        text_lower = text.lower()
-        passive_patterns = [' was ', ' were ', ' is being ', ' are being']
-        passive_count = sum(text_lower.count(pattern) for pattern in passive_patterns)
+        hits = features.phrase_hits
+        passive_count = hits.count_lexicon(OriginallityAnalyzer.DRIFT_PASSIVE_PATTERNS)
         if passive_count > 3:
             suggestions.append('💭 Replace passive voice with active voice for authenticity')
         
         # No contractions = AI sign
-        contractions = ["don't", "can't", "won't", "isn't", "i'm", "you're", "it's", "i've"]
-        if sum(text_lower.count(c) for c in contractions) == 0 and originality_score < 75:
+        if hits.count_lexicon(OriginallityAnalyzer.SUGGESTION_CONTRACTIONS) == 0 and originality_score < 75:
             suggestions.append('💬 Add contractions (don\'t, can\'t, I\'m) for natural tone')
         
         # No personal pronouns = AI sign
-        personal_pronouns = ['i ', ' i ', ' me ', ' my ', ' we ']
-        if sum(text_lower.count(p) for p in personal_pronouns) == 0 and originality_score < 75:
+        if hits.count_lexicon(OriginallityAnalyzer.SUGGESTION_PRONOUNS) == 0 and originality_score < 75:
             suggestions.append('👤 Use first-person perspective (I, me, we)')
         
         # Length considerations
@@ -390,37 +541,35 @@ class OriginallityAnalyzer:
         return suggestions if suggestions else ['✅ Text analysis complete - Continue with your natural writing']
     
     @staticmethod
-    def get_style_fingerprint(text):
+    def get_style_fingerprint(text, features=None):
         """Get detailed style fingerprint"""
         if not text:
             return {}
         
-        words = text.split()
+        features = features or OriginallityAnalyzer.extract_features(text)
+        words = features.tokens
         word_count = len(words)
         
         # Sentence analysis
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        sentence_count = len(sentences)
+        sentence_count = features.sentence_count
         
         # Word length analysis
         word_lengths = [len(w) for w in words]
         avg_word_length = sum(word_lengths) / len(word_lengths) if word_lengths else 0
         
         # Sentence length analysis
-        sentence_lengths = [len(s.split()) for s in sentences]
+        sentence_lengths = features.sentence_word_counts
         avg_sentence_length = sum(sentence_lengths) / len(sentence_lengths) if sentence_lengths else 0
         
         # Vocabulary diversity
-        unique_words = len(set(w.lower() for w in words))
+        word_counts = features.word_counts
+        unique_words = len(word_counts)
         vocabulary_diversity = (unique_words / word_count * 100) if word_count > 0 else 0
         
         # Count AI phrases
-        text_lower = text.lower()
-        ai_phrase_count = sum(1 for phrase in OriginallityAnalyzer.AI_PHRASES if phrase in text_lower)
+        ai_phrase_count = features.phrase_hits.present_in_lexicon(OriginallityAnalyzer.AI_PHRASES)
         
         # Repetition ratio
-        word_counts = Counter(w.lower() for w in words)
         repeated_words = sum(1 for count in word_counts.values() if count > 2)
         repetition_ratio = (repeated_words / unique_words * 100) if unique_words > 0 else 0
         
@@ -443,3 +592,21 @@ class OriginallityAnalyzer:
         avg = sum(values) / len(values)
         variance = sum((x - avg) ** 2 for x in values) / len(values)
         return variance ** 0.5
+
+
+# Compiled once at import: every analyzer lexicon in a single automaton
+PHRASE_MATCHER = PhraseMatcher(
+    OriginallityAnalyzer.AI_PHRASES
+    + OriginallityAnalyzer.PASSIVE_PATTERNS
+    + OriginallityAnalyzer.DRIFT_PASSIVE_PATTERNS
+    + OriginallityAnalyzer.VERBOSE_PATTERNS
+    + OriginallityAnalyzer.CONTRACTIONS
+    + OriginallityAnalyzer.PERSONAL_PRONOUNS
+    + OriginallityAnalyzer.CASUAL_WORDS
+    + OriginallityAnalyzer.TRANSITIONS
+    + OriginallityAnalyzer.SUGGESTION_CONTRACTIONS
+    + OriginallityAnalyzer.SUGGESTION_PRONOUNS
+)
+
+# Opened on first match; memory-mapped, so every worker shares the page cache's one copy
+KNOWN_TEXTS = LazyKnownTextIndex(KNOWN_TEXTS_DIR, KNOWN_TEXTS_INDEX_DIR)
@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from app.utils.ai_analyzer import OriginallityAnalyzer
+from app.utils.timing import collect_spans, current_recorder
+
+
+class AnalysisQueueFull(Exception):
+    """Raised when the executor already holds its maximum number of tasks"""
+
+
+class AnalysisTimeout(Exception):
+    """Raised when a task does not finish within the configured timeout"""
+
+
+def _warm_worker():
+    """Pool initializer: import the analyzer and run it once so the first real task is fast"""
+    OriginallityAnalyzer.warm_up()
+
+
+def _noop():
+    return os.getpid()
+
+
+class AnalysisExecutor:
+    """Runs CPU-bound analysis in a pool of worker processes
+
+    Texts shorter than `inline_max_chars` are analyzed on the calling
+    thread, since shipping them to another process costs more than the
+    analysis itself. Larger texts go to the pool, which holds at most
+    `workers + max_queue` tasks; beyond that AnalysisQueueFull is raised
+    so the caller can shed load instead of queueing indefinitely. With
+    `workers` set to 0 everything runs inline.
+    """
+
+    def __init__(self, workers=0, max_queue=32, timeout=30, inline_max_chars=2000):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.inline_max_chars = inline_max_chars
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers > 0 else None
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """Create the pool lazily, once per process (gunicorn forks after create_app)"""
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                # Workers fork from a clean server process that has the analyzer
+                # preloaded, rather than from this (threaded, Mongo-connected) one
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload(['app.utils.ai_analyzer'])
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_warm_worker
+                )
+                self._pool_pid = os.getpid()
+                # Start every worker now so none pays import/warm-up on a request
+                for _ in range(self.workers):
+                    self._pool.submit(_noop)
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def run(self, fn, *args, size=None):
+        """Run fn(*args), in the pool when size exceeds the inline threshold"""
+        if self._slots is None or (size is not None and size < self.inline_max_chars):
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise AnalysisQueueFull()
+
+        # Sampled requests get the worker's stage timings back with the result
+        recorder = current_recorder()
+        try:
+            if recorder is not None:
+                future = self._get_pool().submit(collect_spans, fn, *args)
+            else:
+                future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except TimeoutError:
+            # A running task can't be interrupted; it finishes in the background
+            future.cancel()
+            raise AnalysisTimeout()
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise
+
+        if recorder is not None:
+            result, spans = result
+            recorder.merge(spans)
+        return result
+
+    def analyze(self, text):
+        """Analyze a single text"""
+        return self.run(OriginallityAnalyzer.analyze_text, text, size=len(text))
+
+    def stats(self):
+        """Current executor configuration and load"""
+        in_use = 0
+        if self._slots is not None:
+            in_use = self.workers + self.max_queue - self._slots._value
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'timeout': self.timeout,
+            'inline_max_chars': self.inline_max_chars,
+            'tasks_in_flight': in_use
+        }
+
+    def shutdown(self):
+        self._reset_pool()
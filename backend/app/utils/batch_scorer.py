@@ -0,0 +1,159 @@
+import numpy as np
+from app.utils.ai_analyzer import OriginallityAnalyzer, SCORING_MODEL
+from app.utils.scoring_model import SIGNAL_NAMES, signal_row
+
+
+class BatchScorer:
+    """Vectorized scoring of many documents at once
+
+    Feature extraction stays per document, but the originality, style
+    drift and confidence rules (or the learned scoring model) are
+    evaluated as NumPy array operations over a signal matrix (one row
+    per document, one column per signal).
+    Results match OriginallityAnalyzer.analyze_text exactly, including
+    its error fallback for a text that fails, which leaves the rest of
+    the batch unaffected.
+    """
+
+    SIGNAL_NAMES = SIGNAL_NAMES
+
+    @staticmethod
+    def analyze_texts(texts):
+        """Analyze a list of texts, returning analyze_text-shaped results in order"""
+        results = [None] * len(texts)
+        rows = []
+        scored = []
+
+        for index, text in enumerate(texts):
+            # Short texts and special cases keep their fixed responses
+            if not text or len(text.strip()) < 10:
+                results[index] = OriginallityAnalyzer.analyze_text(text)
+                continue
+            try:
+                known_text = OriginallityAnalyzer.match_known_text(text)
+                special_case = OriginallityAnalyzer.check_special_cases(text, known_text)
+                if special_case:
+                    results[index] = special_case
+                    continue
+
+                features = OriginallityAnalyzer.extract_features(text)
+                fingerprint = OriginallityAnalyzer.get_style_fingerprint(text, features)
+                signals = OriginallityAnalyzer.extract_signals(text, fingerprint, features)
+                row = signal_row(signals)
+            except Exception as e:
+                print(f"Analysis error: {e}")
+                results[index] = OriginallityAnalyzer.error_result()
+                continue
+            rows.append(row)
+            scored.append((index, text, fingerprint, features, known_text))
+
+        if not scored:
+            return results
+
+        matrix = np.asarray(rows, dtype=np.float64)
+        originality = BatchScorer.score_originality(matrix)
+        style_drift = BatchScorer.score_style_drift(matrix)
+        confidence = BatchScorer.score_confidence(matrix, originality)
+
+        for row, (index, text, fingerprint, features, known_text) in enumerate(scored):
+            originality_score = float(originality[row])
+            drift = float(style_drift[row])
+            try:
+                suggestions = OriginallityAnalyzer.generate_suggestions(
+                    text, originality_score, drift, fingerprint, features
+                )
+                results[index] = OriginallityAnalyzer.build_result(
+                    originality_score, drift, float(confidence[row]), suggestions, fingerprint, known_text,
+                    features.sentence_spans
+                )
+            except Exception as e:
+                print(f"Analysis error: {e}")
+                results[index] = OriginallityAnalyzer.error_result()
+
+        return results
+
+    @staticmethod
+    def _column(matrix, name):
+        return matrix[:, BatchScorer.SIGNAL_NAMES.index(name)]
+
+    @staticmethod
+    def score_originality(matrix):
+        """Vectorized OriginallityAnalyzer.score_originality"""
+        if SCORING_MODEL is not None:
+            return SCORING_MODEL.score_matrix(matrix)
+
+        col = lambda name: BatchScorer._column(matrix, name)
+        word_count = col('word_count')
+        sentences = col('sentence_count')
+        ai_score = np.zeros(len(matrix))
+
+        # 1. AI phrase density
+        safe_words = np.where(word_count > 0, word_count, 1)
+        phrase_density = (col('ai_phrase_count') * 100) / safe_words
+        ai_score += np.where(word_count > 0, np.minimum(phrase_density * 2.5, 50), 0)
+
+        # 2. Passive voice
+        safe_sentences = np.where(sentences > 0, sentences, 1)
+        passive_ratio = (col('passive_count') / safe_sentences) * 100
+        ai_score += np.where(sentences > 0, np.minimum(passive_ratio * 0.8, 40), 0)
+
+        # 3. Sentence uniformity
+        variance = col('sentence_length_std')
+        uniformity = np.select([variance < 2, variance < 4, variance < 8], [30, 20, 10], 0)
+        ai_score += np.where(sentences > 2, uniformity, 0)
+
+        # 4. Verbose/formal language
+        ai_score += np.minimum(col('verbose_count') * 7, 35)
+
+        # 5. Repetitive word use
+        ai_score += np.where(word_count > 20, np.minimum(col('top_repetition_score') * 1.5, 25), 0)
+
+        # 6. Lack of human markers
+        contractions = col('contraction_count')
+        ai_score += np.select(
+            [(contractions == 0) & (word_count > 30), (contractions < 1) & (word_count > 50)],
+            [22, 18], 0
+        )
+        pronouns = col('pronoun_count')
+        ai_score += np.select(
+            [(pronouns == 0) & (word_count > 50), (pronouns < 2) & (word_count > 100)],
+            [18, 12], 0
+        )
+        ai_score += np.where((col('casual_count') == 0) & (word_count > 40), 15, 0)
+        ai_score += np.where((col('emotional_punctuation') == 0) & (word_count > 60), 14, 0)
+
+        # 7. Structure perfection
+        ai_score += np.where(
+            (col('paragraph_count') > 2) & (col('paragraph_length_std') < 30), 10, 0
+        )
+
+        # 8. Transition word overuse
+        transitions = col('transition_count')
+        ai_score += np.where(transitions > 3, np.minimum(transitions * 3, 15), 0)
+
+        # 10. Vocabulary perfection
+        ai_score += np.where((col('vocabulary_diversity') > 0.8) & (word_count > 100), 8, 0)
+
+        originality = 100.0 - np.minimum(ai_score, 100.0)
+        # Python's round() to match the scalar path digit for digit
+        return np.array([round(float(value), 1) for value in originality])
+
+    @staticmethod
+    def score_style_drift(matrix):
+        """Vectorized OriginallityAnalyzer.score_style_drift"""
+        col = lambda name: BatchScorer._column(matrix, name)
+        ai_count = col('ai_phrase_count') * 2
+        ai_count = ai_count + col('drift_passive_count')
+        ai_count = ai_count + np.where(col('sentence_count') > 2, col('first_word_repetition') * 10, 0)
+        return np.minimum(100.0, ai_count * 1.5)
+
+    @staticmethod
+    def score_confidence(matrix, originality):
+        """Vectorized OriginallityAnalyzer.calculate_confidence"""
+        word_count = BatchScorer._column(matrix, 'word_count')
+        confidence = np.minimum(95.0, 40.0 + (word_count / 10.0))
+        confidence -= np.select(
+            [(originality > 90) | (originality < 10), (originality > 80) | (originality < 20)],
+            [15, 10], 0
+        )
+        return np.maximum(20.0, np.minimum(99.0, confidence))
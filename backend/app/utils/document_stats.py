@@ -0,0 +1,287 @@
+import heapq
+from collections import Counter
+from fractions import Fraction
+from operator import itemgetter
+from app.utils.ai_analyzer import KNOWN_TEXT_THRESHOLD, OriginallityAnalyzer
+from app.utils.known_texts import KnownTextIndex
+
+
+class PhraseCounts:
+    """Mergeable per-phrase occurrence counts with the PhraseHits query API"""
+
+    def __init__(self, counts=None):
+        self.counts = Counter(counts or {})
+
+    def contains(self, phrase):
+        return self.counts.get(phrase, 0) > 0
+
+    def count(self, phrase):
+        return self.counts.get(phrase, 0)
+
+    def count_lexicon(self, phrases):
+        return sum(self.count(phrase) for phrase in phrases)
+
+    def present_in_lexicon(self, phrases):
+        return sum(1 for phrase in phrases if self.contains(phrase))
+
+
+class DocumentStats:
+    """Running, mergeable statistics for a document analyzed in sections
+
+    Holds only counters and integer power sums (count, sum, sum of
+    squares), so sections can be added or removed in any order and the
+    document-level fingerprint and scores are recomputed without keeping
+    the text. Lexicon hits and token counts are additive across paragraph
+    breaks, and sentences never cross one (see Segmenter), so stats of a
+    document's paragraphs merge exactly; sections cut mid-paragraph are
+    assumed to end on a sentence boundary.
+
+    Copyright and license notices are found per section. Known-text
+    overlap is kept as counts of covered and total words, so it is
+    judged once against the whole document, as a full analysis does: a
+    quoted paragraph makes its own section 100% known but flags the
+    document only if it is most of it.
+
+    The word counter and the sentence first-word counter are the only
+    structures that grow with the input (the phrase, punctuation and
+    source counters are bounded by their lexicons and the reference
+    corpus), so both are capped: once one exceeds `max_vocabulary`
+    entries its least frequent words are evicted down to PRUNE_RATIO of
+    the cap (so pruning runs once per many merges, not on every one).
+    Evicted words are remembered only as a count of unique words; the
+    first-word counter needs only its largest count, which pruning
+    keeps. Memory is bounded for arbitrarily large input at the cost of
+    exactness past the cap: frequent words are kept and still drive the
+    repetition signals, but an evicted word seen again restarts from
+    zero and is counted as unique a second time.
+    Below the cap every statistic is exact.
+    """
+
+    # Fraction of max_vocabulary kept after pruning
+    PRUNE_RATIO = 0.75
+
+    def __init__(self, max_vocabulary=200000):
+        self.max_vocabulary = max_vocabulary
+        self.char_count = 0
+        self.word_count = 0
+        self.token_length_sum = 0
+        self.sentence_moments = [0, 0, 0]
+        self.paragraph_moments = [0, 0, 0]
+        self.word_counts = Counter()
+        self.pruned_unique_words = 0
+        self.first_words = Counter()
+        self.punctuation_counts = Counter()
+        self.phrase_hits = PhraseCounts()
+        self.special_case = None
+        self.special_case_count = 0
+        self.known_words = 0
+        self.known_word_total = 0
+        self.known_sources = Counter()
+
+    @classmethod
+    def from_text(cls, text, max_vocabulary=200000):
+        """Statistics for a single section of text"""
+        stats = cls(max_vocabulary=max_vocabulary)
+        stats.char_count = len(text.strip())
+        stats.special_case = OriginallityAnalyzer.check_special_cases(text, known_text=None)
+        stats.special_case_count = 1 if stats.special_case else 0
+        stats.known_words, stats.known_word_total, sources = OriginallityAnalyzer.known_text_coverage(text)
+        stats.known_sources = Counter(sources)
+
+        features = OriginallityAnalyzer.extract_features(text)
+        stats.word_count = features.word_count
+        stats.token_length_sum = sum(len(token) for token in features.tokens)
+        stats.sentence_moments = cls._moments(features.sentence_word_counts)
+        stats.paragraph_moments = cls._moments(features.paragraph_word_counts)
+        stats.word_counts = Counter(features.word_counts)
+        stats.first_words = Counter(features.sentence_first_words)
+        stats._prune_vocabulary()
+        stats.punctuation_counts = Counter(features.punctuation_counts)
+        hits = features.phrase_hits
+        stats.phrase_hits = PhraseCounts({phrase: hits.count(phrase) for phrase in hits.offsets})
+        return stats
+
+    # Counter attributes, stored as [key, count] pairs (keys may contain dots)
+    COUNTER_FIELDS = ('word_counts', 'first_words', 'punctuation_counts', 'known_sources')
+    SCALAR_FIELDS = ('max_vocabulary', 'char_count', 'word_count', 'token_length_sum', 'sentence_moments',
+                     'paragraph_moments', 'pruned_unique_words', 'special_case', 'special_case_count',
+                     'known_words', 'known_word_total')
+
+    def to_document(self):
+        """BSON/JSON-safe form of these statistics (see from_document)"""
+        document = {field: getattr(self, field) for field in self.SCALAR_FIELDS}
+        for field in self.COUNTER_FIELDS:
+            document[field] = [[key, count] for key, count in getattr(self, field).items()]
+        document['phrase_hits'] = [[phrase, count] for phrase, count in self.phrase_hits.counts.items()]
+        return document
+
+    @classmethod
+    def from_document(cls, document):
+        """Statistics stored with to_document"""
+        stats = cls(max_vocabulary=document['max_vocabulary'])
+        for field in cls.SCALAR_FIELDS:
+            setattr(stats, field, document[field])
+        for field in cls.COUNTER_FIELDS:
+            setattr(stats, field, Counter(dict(document[field])))
+        stats.phrase_hits = PhraseCounts(dict(document['phrase_hits']))
+        return stats
+
+    @staticmethod
+    def _moments(values):
+        return [len(values), sum(values), sum(v * v for v in values)]
+
+    @staticmethod
+    def _std(moments):
+        """Population standard deviation, as OriginallityAnalyzer.calculate_variance"""
+        n, total, total_sq = moments
+        if n < 2:
+            return 0.0
+        variance = Fraction(total_sq * n - total * total, n * n)
+        return float(variance) ** 0.5
+
+    def _combine(self, other, sign):
+        self.char_count += sign * other.char_count
+        self.word_count += sign * other.word_count
+        self.token_length_sum += sign * other.token_length_sum
+        for mine, theirs in ((self.sentence_moments, other.sentence_moments),
+                             (self.paragraph_moments, other.paragraph_moments)):
+            for i in range(3):
+                mine[i] += sign * theirs[i]
+        for mine, theirs in ((self.word_counts, other.word_counts),
+                             (self.first_words, other.first_words),
+                             (self.punctuation_counts, other.punctuation_counts),
+                             (self.phrase_hits.counts, other.phrase_hits.counts),
+                             (self.known_sources, other.known_sources)):
+            if sign > 0:
+                mine.update(theirs)
+            else:
+                mine.subtract(theirs)
+                for key in [k for k in theirs if mine[k] <= 0]:
+                    del mine[key]
+        self.pruned_unique_words += sign * other.pruned_unique_words
+        self.special_case_count += sign * other.special_case_count
+        self.known_words += sign * other.known_words
+        self.known_word_total += sign * other.known_word_total
+
+    def merge(self, other):
+        """Add another section's statistics into this one"""
+        self._combine(other, 1)
+        if self.special_case is None:
+            self.special_case = other.special_case
+        self._prune_vocabulary()
+        return self
+
+    def subtract(self, other):
+        """Remove a previously merged section's statistics"""
+        self._combine(other, -1)
+        if self.special_case_count <= 0:
+            self.special_case = None
+        return self
+
+    def _prune_vocabulary(self):
+        """Prune the word and first-word counters once they exceed max_vocabulary"""
+        if len(self.word_counts) > self.max_vocabulary:
+            self.pruned_unique_words += self._evict_least_frequent(self.word_counts)
+        if len(self.first_words) > self.max_vocabulary:
+            self._evict_least_frequent(self.first_words)
+
+    def _evict_least_frequent(self, counts):
+        """Evict counts' least frequent keys down to PRUNE_RATIO of max_vocabulary; the number evicted"""
+        evicted = len(counts) - int(self.max_vocabulary * self.PRUNE_RATIO)
+        if evicted <= 0:
+            return 0
+        for word, _ in heapq.nsmallest(evicted, counts.items(), key=itemgetter(1)):
+            del counts[word]
+        return evicted
+
+    def known_text(self):
+        """Known-text match of the whole accumulated document (no spans), or None"""
+        return KnownTextIndex.merged_match(self.known_words, self.known_word_total, self.known_sources)
+
+    @property
+    def unique_words(self):
+        return len(self.word_counts) + self.pruned_unique_words
+
+    def to_fingerprint(self):
+        """Style fingerprint, as OriginallityAnalyzer.get_style_fingerprint"""
+        word_count = self.word_count
+        sentence_count, sentence_total, _ = self.sentence_moments
+        unique_words = self.unique_words
+        repeated_words = sum(1 for count in self.word_counts.values() if count > 2)
+        vocabulary_diversity = (unique_words / word_count * 100) if word_count > 0 else 0
+        return {
+            'word_count': word_count,
+            'sentence_count': sentence_count,
+            'avg_word_length': round(self.token_length_sum / word_count, 1) if word_count else 0,
+            'avg_sentence_length': round(sentence_total / sentence_count, 1) if sentence_count else 0,
+            'vocabulary_diversity': round(vocabulary_diversity, 1),
+            'ai_phrase_count': self.phrase_hits.present_in_lexicon(OriginallityAnalyzer.AI_PHRASES),
+            'repetition_ratio': round((repeated_words / unique_words * 100) if unique_words > 0 else 0, 1),
+            'unique_word_ratio': round(vocabulary_diversity, 1)
+        }
+
+    def to_signals(self, fingerprint):
+        """Scoring signals, as OriginallityAnalyzer.extract_signals"""
+        word_count = self.word_count
+        sentence_count = self.sentence_moments[0]
+        hits = self.phrase_hits
+
+        top_repetition_score = 0
+        if word_count > 20:
+            stop_words = OriginallityAnalyzer.STOP_WORDS
+            content_counts = sorted(
+                (count for w, count in self.word_counts.items() if w not in stop_words and len(w) > 3),
+                reverse=True
+            )
+            for count in content_counts[:5]:
+                ratio = (count / word_count) * 100
+                if ratio > 3:
+                    top_repetition_score += ratio
+
+        first_word_repetition = 0
+        if sentence_count > 2 and self.first_words:
+            first_word_repetition = max(self.first_words.values()) / sentence_count
+
+        punctuation = self.punctuation_counts
+        return {
+            'word_count': word_count,
+            'sentence_count': sentence_count,
+            'paragraph_count': self.paragraph_moments[0],
+            'ai_phrase_count': fingerprint.get('ai_phrase_count', 0),
+            'passive_count': hits.count_lexicon(OriginallityAnalyzer.PASSIVE_PATTERNS),
+            'drift_passive_count': hits.count_lexicon(OriginallityAnalyzer.DRIFT_PASSIVE_PATTERNS),
+            'sentence_length_std': self._std(self.sentence_moments),
+            'paragraph_length_std': self._std(self.paragraph_moments),
+            'verbose_count': hits.present_in_lexicon(OriginallityAnalyzer.VERBOSE_PATTERNS),
+            'top_repetition_score': top_repetition_score,
+            'contraction_count': hits.count_lexicon(OriginallityAnalyzer.CONTRACTIONS),
+            'pronoun_count': hits.count_lexicon(OriginallityAnalyzer.PERSONAL_PRONOUNS),
+            'casual_count': hits.present_in_lexicon(OriginallityAnalyzer.CASUAL_WORDS),
+            'emotional_punctuation': punctuation['exclamation'] + punctuation['question'] + punctuation['ellipsis'],
+            'transition_count': hits.count_lexicon(OriginallityAnalyzer.TRANSITIONS),
+            'vocabulary_diversity': fingerprint.get('vocabulary_diversity', 0),
+            'first_word_repetition': first_word_repetition
+        }
+
+    def analyze(self):
+        """Full analysis result for the accumulated document"""
+        if self.char_count < 10:
+            return OriginallityAnalyzer.analyze_text('')
+        if self.special_case:
+            return self.special_case
+        known_text = self.known_text()
+        if known_text and known_text['overlap'] >= KNOWN_TEXT_THRESHOLD:
+            return OriginallityAnalyzer.special_case_result('known_text', known_text)
+
+        fingerprint = self.to_fingerprint()
+        signals = self.to_signals(fingerprint)
+        originality_score = OriginallityAnalyzer.score_originality(signals)
+        style_drift = OriginallityAnalyzer.score_style_drift(signals)
+        # Stats expose word_count and phrase_hits, which is all these stages read
+        confidence = OriginallityAnalyzer.calculate_confidence(None, originality_score, self)
+        suggestions = OriginallityAnalyzer.generate_suggestions(
+            None, originality_score, style_drift, fingerprint, self
+        )
+        return OriginallityAnalyzer.build_result(
+            originality_score, style_drift, confidence, suggestions, fingerprint, known_text
+        )
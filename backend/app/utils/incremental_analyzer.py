@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from pymongo.errors import BulkWriteError
+from app.utils.ai_analyzer import ANALYZER_VERSION
+from app.utils.document_stats import DocumentStats
+from app.utils.write_behind import DUPLICATE_KEY
+
+
+class IncrementalAnalyzer:
+    """Re-analyzes edited drafts by recomputing only changed paragraphs
+
+    Each analyzed draft keeps its per-paragraph DocumentStats and their
+    merged document total under a draft id. When a new version arrives
+    with a known draft id, paragraphs are diffed by content hash: stats
+    of removed paragraphs are subtracted from the total and only added
+    paragraphs are analyzed, so the cost follows the size of the edit.
+
+    Draft state is in-process and bounded to `max_drafts` (least
+    recently used drafts are dropped). When a Mongo collection is
+    configured, every analyzed paragraph's stats are also stored there,
+    keyed by owner, analyzer version and paragraph hash, and expire via
+    a TTL index. A draft id this process doesn't hold (the previous edit
+    went to another worker, or it was dropped) is then rebuilt from the
+    stored stats of its paragraphs, so only paragraphs never seen before
+    are analyzed. Without the collection an unknown draft id triggers a
+    full paragraph-by-paragraph analysis.
+    """
+
+    def __init__(self, max_drafts=256, collection=None):
+        self.max_drafts = max_drafts
+        self.collection = collection
+        self._drafts = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def split_paragraphs(text):
+        """Raw paragraph pieces; lexicon hits and tokens are additive across them"""
+        return text.split('\n\n')
+
+    @staticmethod
+    def paragraph_key(paragraph):
+        return hashlib.blake2b(paragraph.encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def shared_key(owner, key):
+        return f"{ANALYZER_VERSION}:{owner}:{key}"
+
+    def _load_shared(self, owner, keys):
+        """Stored stats of the given paragraph keys, as {key: DocumentStats}"""
+        if self.collection is None or not keys:
+            return {}
+        ids = {self.shared_key(owner, key): key for key in keys}
+        try:
+            documents = list(self.collection.find({'_id': {'$in': list(ids)}}, {'stats': 1}))
+        except Exception as e:
+            print(f"Paragraph stats lookup error: {e}")
+            return {}
+        return {ids[doc['_id']]: DocumentStats.from_document(doc['stats']) for doc in documents}
+
+    def _store_shared(self, owner, paragraph_stats):
+        """Store newly analyzed paragraphs' stats ({key: DocumentStats})"""
+        if self.collection is None or not paragraph_stats:
+            return
+        now = datetime.utcnow()
+        try:
+            # Unordered, so paragraphs another worker stored meanwhile don't stop the rest
+            self.collection.insert_many([
+                {'_id': self.shared_key(owner, key), 'stats': stats.to_document(), 'created_at': now}
+                for key, stats in paragraph_stats.items()
+            ], ordered=False)
+        except BulkWriteError as e:
+            if any(error.get('code') != DUPLICATE_KEY for error in e.details.get('writeErrors', [])):
+                print(f"Paragraph stats store error: {e}")
+        except Exception as e:
+            print(f"Paragraph stats store error: {e}")
+
+    def _pop_draft(self, draft_key):
+        with self._lock:
+            return self._drafts.pop(draft_key, None)
+
+    def _store_draft(self, draft_key, state):
+        with self._lock:
+            self._drafts[draft_key] = state
+            while len(self._drafts) > self.max_drafts:
+                self._drafts.popitem(last=False)
+
+    def analyze(self, owner, text, draft_id=None):
+        """Analyze text as a new version of draft_id (if known)
+
+        Returns (analysis, new_draft_id, info) where info reports how many
+        paragraphs were reused and recomputed. The previous draft id is
+        consumed; later edits must use the returned one.
+        """
+        paragraphs = self.split_paragraphs(text)
+        keys = [self.paragraph_key(p) for p in paragraphs]
+        new_counts = Counter(keys)
+
+        state = self._pop_draft(f"{owner}:{draft_id}") if draft_id else None
+        if state is None:
+            state = {'paragraphs': {}, 'counts': Counter(), 'stats': DocumentStats()}
+
+        removed = state['counts'] - new_counts
+        added = new_counts - state['counts']
+        paragraph_stats = state['paragraphs']
+        document = state['stats']
+
+        for key, count in removed.items():
+            for _ in range(count):
+                document.subtract(paragraph_stats[key])
+            if key not in new_counts:
+                del paragraph_stats[key]
+
+        added_text = {}
+        for key, paragraph in zip(keys, paragraphs):
+            if key in added and key not in added_text:
+                added_text[key] = paragraph
+        paragraph_stats.update(self._load_shared(owner, [key for key in added if key not in paragraph_stats]))
+        computed = {}
+        for key, count in added.items():
+            if key not in paragraph_stats:
+                paragraph_stats[key] = computed[key] = DocumentStats.from_text(added_text[key])
+            for _ in range(count):
+                document.merge(paragraph_stats[key])
+        self._store_shared(owner, computed)
+
+        state['counts'] = new_counts
+        new_draft_id = uuid.uuid4().hex
+        self._store_draft(f"{owner}:{new_draft_id}", state)
+
+        info = {
+            'paragraphs': len(keys),
+            'recomputed_paragraphs': sum(new_counts[key] for key in computed),
+            'removed_paragraphs': sum(removed.values())
+        }
+        return document.analyze(), new_draft_id, info
+
+    def alias(self, owner, draft_id, alias_id):
+        """Also make a draft reachable under another id (e.g. its saved report id)"""
+        with self._lock:
+            state = self._drafts.pop(f"{owner}:{draft_id}", None)
+            if state is not None:
+                self._drafts[f"{owner}:{alias_id}"] = state
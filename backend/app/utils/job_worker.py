@@ -0,0 +1,127 @@
+import hashlib
+import os
+import socket
+import threading
+from bson.objectid import ObjectId
+from app.models.job import AnalysisJob
+from app.models.report import Report
+from app.models.user import User
+from app.utils.batch_scorer import BatchScorer
+from app.utils.minhash import MINHASHER
+from app.utils.analysis_executor import AnalysisQueueFull
+
+
+class JobWorkerPool:
+    """Background threads draining the analysis_jobs queue
+
+    Each thread claims one job at a time and runs it through the app's
+    AnalysisExecutor, so CPU-bound work still lands in the process pool
+    when one is configured. Threads are started once per process, by the
+    server (gunicorn.conf.py, run.py) rather than by create_app.
+
+    A job whose lease expires mid-write is run again by another worker.
+    Its reports get _ids derived from the job id, so the retry skips the
+    ones already stored and counts only the new ones in the user's
+    profile; counters can lag after a crash but never double.
+    """
+
+    def __init__(self, app, workers=2, lease_seconds=120, max_attempts=3, poll_interval=1.0):
+        self.app = app
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+            thread = threading.Thread(target=self._run, args=(worker_id,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    job = AnalysisJob.claim_next(worker_id, self.lease_seconds)
+                    if job is not None:
+                        self._process(job, worker_id)
+                        continue
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _process(self, job, worker_id):
+        job_id = str(job['_id'])
+
+        if job['attempts'] > self.max_attempts:
+            AnalysisJob.release_job(job_id, worker_id, 'Too many attempts', retry=False)
+            return
+
+        try:
+            result, report_ids = self._execute(job)
+        except AnalysisQueueFull:
+            # Pool saturated by live traffic: put the job back without using up an attempt
+            AnalysisJob.release_job(job_id, worker_id, 'Analyzer busy', retry=True, refund_attempt=True)
+            self._stop.wait(self.poll_interval)
+            return
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            AnalysisJob.release_job(job_id, worker_id, str(e), retry=job['attempts'] < self.max_attempts)
+            return
+
+        AnalysisJob.complete_job(job_id, worker_id, result, report_ids)
+
+    def _execute(self, job):
+        """Analyze the job input and store its report(s)"""
+        executor = self.app.analysis_executor
+        user_id = job['user_id']
+
+        if job['kind'] == 'batch':
+            texts = job['texts']
+            analyses = executor.run(BatchScorer.analyze_texts, texts, size=sum(len(t) for t in texts))
+        else:
+            texts = [job['text']]
+            analyses = [self.app.result_cache.get_or_compute(texts[0], executor.analyze)]
+
+        report_docs = []
+        for index, (text, analysis) in enumerate(zip(texts, analyses)):
+            report = Report.build_report(
+                user_id=user_id,
+                content=text[:500],
+                originality_score=analysis['originality_score'],
+                drift_details=analysis['drift_details'],
+                style_analysis=analysis['style_fingerprint'],
+                signature=MINHASHER.signature(text)
+            )
+            report['_id'] = job_report_id(job['_id'], index)
+            report_docs.append(report)
+
+        stored = {report['_id'] for report in Report.insert_new(report_docs)}
+        new_analyses = [
+            analysis for report, analysis in zip(report_docs, analyses) if report['_id'] in stored
+        ]
+        if new_analyses:
+            User.update_style_profile(str(user_id), new_analyses)
+        report_ids = [str(report['_id']) for report in report_docs]
+        if job['kind'] == 'batch':
+            return analyses, report_ids
+        return analyses[0], report_ids
+
+
+def job_report_id(job_id, index):
+    """Deterministic _id of a job's index-th report
+
+    Keeps the job id's timestamp (so id ranges still follow creation
+    time) and fills the rest from a hash of the job id and index.
+    """
+    job_id = ObjectId(job_id)
+    digest = hashlib.blake2b(f'{job_id}:{index}'.encode('ascii'), digest_size=8).digest()
+    return ObjectId(job_id.binary[:4] + digest)
@@ -0,0 +1,324 @@
+import fcntl
+import json
+import os
+import re
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+# Multiplier of the polynomial shingle hash (odd, so it is invertible mod 2**64)
+HASH_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+INDEX_FILES = ('hashes.npy', 'sources.npy', 'manifest.json')
+
+
+class KnownTextIndex:
+    """Word-shingle index of well-known reference texts
+
+    Every reference text is split into overlapping `shingle_size`-word
+    shingles, each reduced to a 64-bit polynomial hash of its words'
+    hashes. The distinct hashes are kept as one sorted uint64 array (with
+    a parallel array naming the source text) saved as .npy files, so
+    workers open the index with mmap in milliseconds and forked processes
+    share the same page-cache pages instead of copying it.
+
+    Matching hashes a submission's shingles in one pass and looks them
+    all up with a vectorized binary search.
+    """
+
+    def __init__(self, hashes=None, sources=None, names=None, shingle_size=6):
+        self.hashes = hashes if hashes is not None else np.empty(0, dtype=np.uint64)
+        self.sources = sources if sources is not None else np.empty(0, dtype=np.uint16)
+        self.names = names or []
+        self.shingle_size = shingle_size
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @staticmethod
+    def tokenize(text):
+        """Lowercased words of text"""
+        return list(map(str.lower, WORD_PATTERN.findall(text.replace('’', "'"))))
+
+    @staticmethod
+    def word_spans(text):
+        """(start, end) character offsets of the words returned by tokenize"""
+        # Same-length substitution, so offsets still point into the original text
+        return [match.span() for match in WORD_PATTERN.finditer(text.replace('’', "'"))]
+
+    @staticmethod
+    def shingle_hashes(words, shingle_size):
+        """Hash of every run of shingle_size consecutive words (uint64 array)"""
+        count = len(words) - shingle_size + 1
+        if count <= 0:
+            return np.empty(0, dtype=np.uint64)
+        # Each distinct word is hashed once
+        cache = {}
+        word_hashes = np.empty(len(words), dtype=np.uint64)
+        for position, word in enumerate(words):
+            value = cache.get(word)
+            if value is None:
+                value = cache[word] = zlib.crc32(word.encode('utf-8'))
+            word_hashes[position] = value
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(shingle_size):
+            # Products wrap mod 2**64, which is the intended modulus
+            np.multiply(hashes, HASH_BASE, out=hashes)
+            np.add(hashes, word_hashes[offset:offset + count], out=hashes)
+        return hashes
+
+    @staticmethod
+    def source_files(text_dir):
+        """Reference text files in text_dir as sorted (name, size, mtime_ns) triples
+
+        Only stats the files, so checking a saved index for staleness
+        costs no reads of the corpus.
+        """
+        if not os.path.isdir(text_dir):
+            return []
+        files = []
+        for entry in sorted(os.scandir(text_dir), key=lambda entry: entry.name):
+            if not entry.name.endswith('.txt') or entry.name == 'README.txt':
+                continue
+            stat = entry.stat()
+            files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        return files
+
+    @classmethod
+    def build(cls, text_dir, shingle_size=6):
+        """Build an in-memory index from every reference text in text_dir"""
+        files = cls.source_files(text_dir)
+        all_hashes = []
+        all_sources = []
+        for source, (name, *_) in enumerate(files):
+            with open(os.path.join(text_dir, name), encoding='utf-8') as f:
+                words = cls.tokenize(f.read())
+            hashes = cls.shingle_hashes(words, shingle_size)
+            all_hashes.append(hashes)
+            all_sources.append(np.full(len(hashes), source, dtype=np.uint16))
+
+        if not all_hashes:
+            return cls(names=[], shingle_size=shingle_size)
+
+        hashes, first = np.unique(np.concatenate(all_hashes), return_index=True)
+        sources = np.concatenate(all_sources)[first]
+        index = cls(hashes, sources, [name for name, *_ in files], shingle_size)
+        index.files = files
+        return index
+
+    def save(self, index_dir):
+        """Write the index files (each replaced atomically)"""
+        os.makedirs(index_dir, exist_ok=True)
+        manifest = {
+            'shingle_size': self.shingle_size,
+            'names': self.names,
+            'files': [list(entry) for entry in getattr(self, 'files', [])],
+            'count': len(self.hashes)
+        }
+        payloads = {
+            'hashes.npy': lambda f: np.save(f, np.ascontiguousarray(self.hashes, dtype=np.uint64)),
+            'sources.npy': lambda f: np.save(f, np.ascontiguousarray(self.sources, dtype=np.uint16)),
+            'manifest.json': lambda f: f.write(json.dumps(manifest).encode('utf-8'))
+        }
+        for name in INDEX_FILES:
+            fd, tmp_path = tempfile.mkstemp(dir=index_dir, prefix=f'.{name}.')
+            with os.fdopen(fd, 'wb') as f:
+                payloads[name](f)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, os.path.join(index_dir, name))
+
+    @classmethod
+    def load(cls, index_dir):
+        """Open a saved index with its arrays memory-mapped (read-only)"""
+        with open(os.path.join(index_dir, 'manifest.json')) as f:
+            manifest = json.load(f)
+        index = cls(
+            np.load(os.path.join(index_dir, 'hashes.npy'), mmap_mode='r'),
+            np.load(os.path.join(index_dir, 'sources.npy'), mmap_mode='r'),
+            manifest['names'],
+            manifest['shingle_size']
+        )
+        index.files = [tuple(entry) for entry in manifest.get('files', [])]
+        return index
+
+    @classmethod
+    def load_or_build(cls, text_dir, index_dir, shingle_size=6):
+        """Load the saved index, rebuilding (and saving) it if the reference texts changed
+
+        Texts count as changed when any file's name, size or mtime_ns
+        differs from the saved manifest; an edit that keeps the size
+        still moves the mtime, and a checkout that only touches mtimes
+        costs one unneeded rebuild. A fresh index is opened without
+        reading the corpus at all.
+        """
+        index = cls._load_if_current(text_dir, index_dir, shingle_size)
+        if index is not None:
+            return index
+        try:
+            with cls._build_lock(index_dir):
+                # Another worker may have rebuilt it while this one waited
+                index = cls._load_if_current(text_dir, index_dir, shingle_size)
+                if index is not None:
+                    return index
+                cls.build(text_dir, shingle_size).save(index_dir)
+            return cls.load(index_dir)
+        except OSError as e:
+            print(f"Known-text index save error: {e}")
+            return cls.build(text_dir, shingle_size)
+
+    @classmethod
+    def rebuild(cls, text_dir, index_dir, shingle_size=6):
+        """Build and save the index unconditionally, under the build lock"""
+        with cls._build_lock(index_dir):
+            index = cls.build(text_dir, shingle_size)
+            index.save(index_dir)
+        return index
+
+    @classmethod
+    def _load_if_current(cls, text_dir, index_dir, shingle_size):
+        """The saved index if it matches the reference texts, else None"""
+        try:
+            index = cls.load(index_dir)
+        except (OSError, ValueError, KeyError):
+            return None
+        if index.files != cls.source_files(text_dir) or index.shingle_size != shingle_size:
+            return None
+        return index
+
+    @staticmethod
+    @contextmanager
+    def _build_lock(index_dir):
+        """Exclusive flock on index_dir, so concurrent workers build and save it once"""
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, '.lock'), 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _lookup(self, words):
+        """(matched shingle positions, their index positions, per-word covered mask), or None"""
+        if not len(self.hashes):
+            return None
+        hashes = self.shingle_hashes(words, self.shingle_size)
+        if not len(hashes):
+            return None
+
+        positions = np.searchsorted(self.hashes, hashes)
+        np.minimum(positions, len(self.hashes) - 1, out=positions)
+        matched = np.flatnonzero(self.hashes[positions] == hashes)
+        if not len(matched):
+            return None
+
+        # Mark every word inside a matched shingle
+        coverage = np.zeros(len(words) + 1, dtype=np.int32)
+        np.add.at(coverage, matched, 1)
+        np.add.at(coverage, matched + self.shingle_size, -1)
+        covered = np.cumsum(coverage[:-1]) > 0
+        return matched, positions, covered
+
+
+    def match(self, text, max_spans=20):
+        """Overlap of text with the reference texts, or None if nothing matches
+
+        Returns {'overlap': percent of words inside a matched shingle,
+        'spans': [{'start', 'end', 'source'}] character ranges of matched
+        passages, 'sources': names of the matched reference texts}.
+        """
+        words = self.tokenize(text)
+        lookup = self._lookup(words)
+        if lookup is None:
+            return None
+        matched, positions, covered = lookup
+
+        # Runs of covered words become character spans
+        spans = self.word_spans(text)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], covered.astype(np.int8), [0]))))
+        matched_sources = self.sources[positions[matched]]
+        run_spans = []
+        for first, last in zip(edges[0::2], edges[1::2]):
+            first_shingle = matched[np.searchsorted(matched, first)]
+            run_spans.append({
+                'start': spans[first][0],
+                'end': spans[last - 1][1],
+                'source': self.names[int(self.sources[positions[first_shingle]])]
+            })
+
+        source_ids, counts = np.unique(matched_sources, return_counts=True)
+        return {
+            'overlap': round(float(covered.sum()) / len(words) * 100, 1),
+            'spans': run_spans[:max_spans],
+            'sources': [self.names[int(source_ids[i])] for i in np.argsort(-counts, kind='stable')]
+        }
+
+    def coverage(self, text):
+        """Additive form of match: (covered words, total words, {source name: matched shingles})
+
+        Counts of a document's paragraphs add up to the document's own
+        (a shingle spanning a paragraph break aside); see merged_match.
+        """
+        words = self.tokenize(text)
+        lookup = self._lookup(words)
+        if lookup is None:
+            return 0, len(words), {}
+        matched, positions, covered = lookup
+        source_ids, counts = np.unique(self.sources[positions[matched]], return_counts=True)
+        return int(covered.sum()), len(words), {
+            self.names[int(source)]: int(count) for source, count in zip(source_ids, counts)
+        }
+
+    @staticmethod
+    def merged_match(covered_words, total_words, source_counts):
+        """match-style result from summed coverage counts (spans aren't mergeable), or None"""
+        if not covered_words or not total_words:
+            return None
+        # Names are indexed in sorted order, so this ranks ties as match does
+        return {
+            'overlap': round(covered_words / total_words * 100, 1),
+            'spans': [],
+            'sources': sorted(sorted(source_counts), key=lambda name: -source_counts[name])
+        }
+
+
+class LazyKnownTextIndex:
+    """KnownTextIndex opened on first use rather than at import
+
+    Importing the analyzer (every worker, every `flask` command) then
+    costs nothing; the first match loads the saved index, rebuilding and
+    saving it only if the reference texts changed (one worker builds
+    while the others wait on its lock). `flask known-texts-build` builds
+    it ahead of time, e.g. in the deploy step.
+    """
+
+    def __init__(self, text_dir, index_dir, shingle_size=6):
+        self.text_dir = text_dir
+        self.index_dir = index_dir
+        self.shingle_size = shingle_size
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The loaded KnownTextIndex"""
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = KnownTextIndex.load_or_build(self.text_dir, self.index_dir, self.shingle_size)
+                index = self._index
+        return index
+
+    def reset(self):
+        """Reopen the index on next use (after it was rebuilt)"""
+        with self._lock:
+            self._index = None
+
+    def match(self, text, max_spans=20):
+        return self.get().match(text, max_spans)
+
+    def coverage(self, text):
+        return self.get().coverage(text)
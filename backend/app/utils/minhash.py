@@ -0,0 +1,87 @@
+import hashlib
+import re
+import zlib
+import numpy as np
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class MinHasher:
+    """MinHash signatures of word shingles, banded for locality-sensitive lookup
+
+    A signature holds `num_perm` 32-bit minimums of multiply-shift hashes
+    over the text's word `shingle_size`-grams; the fraction of equal
+    positions in two signatures estimates their Jaccard similarity. The
+    signature is cut into `bands` bands and each band hashed to one
+    64-bit key, so two texts share at least one key with probability
+    1 - (1 - s**rows)**bands. With 16 bands of 8 rows the curve crosses
+    0.5 at a similarity of ~0.7: lightly edited copies almost always
+    collide, unrelated texts almost never do, and a lookup is an index
+    probe on the band keys instead of a scan.
+    """
+
+    # Shingles hashed per numpy step, bounding memory at CHUNK * num_perm * 8 bytes
+    CHUNK = 4096
+
+    def __init__(self, num_perm=128, bands=16, shingle_size=5, seed=20240601):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False)
+
+    def shingle_hashes(self, text):
+        """Distinct 32-bit hashes of the text's word shingles"""
+        words = WORD_PATTERN.findall((text or '').lower())
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        k = min(self.shingle_size, len(words))
+        hashes = np.fromiter(
+            (zlib.crc32(' '.join(words[i:i + k]).encode('utf-8')) for i in range(len(words) - k + 1)),
+            dtype=np.uint64
+        )
+        return np.unique(hashes)
+
+    def signature(self, text):
+        """MinHash signature (uint32 array), or None for text without words"""
+        hashes = self.shingle_hashes(text)
+        if hashes.size == 0:
+            return None
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, hashes.size, self.CHUNK):
+            chunk = hashes[start:start + self.CHUNK, None]
+            # Multiply-shift hashing: products wrap mod 2**64, the top 32 bits are the hash
+            permuted = (chunk * self._a + self._b) >> np.uint64(32)
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+    def band_keys(self, signature):
+        """One signed 64-bit key per band (fits a Mongo long, indexable)"""
+        rows = signature.astype('<u4').reshape(self.bands, self.rows)
+        return [
+            int.from_bytes(
+                hashlib.blake2b(band.tobytes(), digest_size=8, salt=index.to_bytes(16, 'little')).digest(),
+                'little', signed=True
+            )
+            for index, band in enumerate(rows)
+        ]
+
+    @staticmethod
+    def to_bytes(signature):
+        return signature.astype('<u4').tobytes()
+
+    @staticmethod
+    def from_bytes(data):
+        return np.frombuffer(data, dtype='<u4')
+
+    @staticmethod
+    def similarity(signature, other):
+        """Estimated Jaccard similarity of the two texts' shingle sets"""
+        return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+MINHASHER = MinHasher()
@@ -0,0 +1,70 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+# Newest first; _id breaks created_at ties so every document has exactly one place in the order
+KEYSET_SORT = [('created_at', -1), ('_id', -1)]
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(document):
+    """Opaque continuation token for the page after this document"""
+    payload = json.dumps(
+        [document['created_at'].isoformat(timespec='milliseconds'), str(document['_id'])],
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, _id) of the last document of the previous page; ValueError if it isn't a token"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, object_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), ObjectId(object_id)
+    except (binascii.Error, ValueError, TypeError, InvalidId) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def page_size(value, default=20):
+    """A requested page size, clamped to 1..MAX_PAGE_SIZE"""
+    if value is None:
+        value = default
+    return min(max(value, 1), MAX_PAGE_SIZE)
+
+
+def fetch_page(collection, query, projection=None, limit=20, cursor=None):
+    """One page of documents, newest first, and the cursor for the next page (None on the last)
+
+    Pages are keyed on (created_at, _id) rather than skipped to: a page
+    starts strictly after the previous page's last document, so with an
+    index ending in created_at -1, _id -1 every page costs an index seek
+    plus `limit` entries however deep it is, and documents inserted
+    meanwhile don't shift later pages. One extra document is read to
+    tell whether another page follows.
+    """
+    limit = page_size(limit)
+    query = dict(query)
+    if cursor:
+        created_at, object_id = decode_cursor(cursor)
+        query['created_at'] = {'$lte': created_at}
+        query['$or'] = [{'created_at': {'$lt': created_at}}, {'_id': {'$lt': object_id}}]
+
+    documents = list(collection.find(query, projection).sort(KEYSET_SORT).limit(limit + 1))
+    if len(documents) > limit:
+        return documents[:limit], encode_cursor(documents[limit - 1])
+    return documents, None
+
+
+def iter_pages(collection, query, projection=None, limit=MAX_PAGE_SIZE):
+    """Every matching document, newest first, one page (list) at a time"""
+    cursor = None
+    while True:
+        documents, cursor = fetch_page(collection, query, projection, limit, cursor)
+        if documents:
+            yield documents
+        if cursor is None:
+            return
@@ -0,0 +1,25 @@
+import re
+
+# Special-case detection: one alternation, one named group per category.
+# Only explicit notices are matched here; well-known passages are found by
+# the known-text index (app.utils.known_texts) instead of title keywords.
+SPECIAL_CASE_PATTERNS = {
+    'copyright_notice': r'(?:\bcopyright\s*(?:©|\(c\))?\s*\d{4}\b|©\s*\d{4}\b)',
+    'license_notice': r'\b(?:all rights reserved|licensed under)\b'
+}
+
+SPECIAL_CASES = re.compile(
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SPECIAL_CASE_PATTERNS.items()),
+    re.IGNORECASE
+)
+
+# Text segmentation (see app.utils.segmenter)
+PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n\s*')
+SENTENCE_BOUNDARY = re.compile(r'(?P<punct>[.!?…]+)["\'”’)\]]*(?=\s|$)')
+WORD_CHAR = re.compile(r'\w')
+
+
+def match_special_case(text):
+    """Name of the first special-case category found in text, or None (single scan)"""
+    match = SPECIAL_CASES.search(text)
+    return match.lastgroup if match else None
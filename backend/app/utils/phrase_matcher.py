@@ -0,0 +1,115 @@
+from collections import deque
+
+
+class PhraseHits:
+    """All phrase occurrences found in one scan, keyed by phrase"""
+
+    def __init__(self, offsets):
+        # phrase -> ascending list of start offsets (overlapping matches included)
+        self.offsets = offsets
+
+    def contains(self, phrase):
+        """Equivalent of `phrase in text`"""
+        return phrase in self.offsets
+
+    def count(self, phrase):
+        """Equivalent of `text.count(phrase)` (non-overlapping occurrences)"""
+        starts = self.offsets.get(phrase)
+        if not starts:
+            return 0
+        count = 0
+        next_allowed = 0
+        length = len(phrase)
+        for start in starts:
+            if start >= next_allowed:
+                count += 1
+                next_allowed = start + length
+        return count
+
+    def count_lexicon(self, phrases):
+        """Sum of non-overlapping occurrence counts for every phrase in a lexicon"""
+        return sum(self.count(phrase) for phrase in phrases)
+
+    def present_in_lexicon(self, phrases):
+        """Number of lexicon entries that occur at least once"""
+        return sum(1 for phrase in phrases if phrase in self.offsets)
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton matching many phrases in one linear pass
+
+    The automaton is compiled into a full transition table (failure links
+    already followed), so scanning costs one dict lookup per character no
+    matter how many phrases are registered.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = tuple(dict.fromkeys(p for p in phrases if p))
+        self._transitions, self._outputs = self._build(self.phrases)
+
+    @staticmethod
+    def _build(phrases):
+        """Build the trie, failure links and the flattened transition table"""
+        goto = [{}]
+        outputs = [()]
+
+        for phrase in phrases:
+            state = 0
+            for ch in phrase:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] = outputs[state] + (phrase,)
+
+        # Breadth-first pass: resolve failure links and inherit their outputs
+        fail = [0] * len(goto)
+        transitions = [dict(goto[0])]
+        transitions.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            fallback = transitions[fail[state]]
+            # Failure state's row is already complete, so copying it
+            # and overriding with our own edges yields the full row
+            row = dict(fallback)
+            for ch, next_state in goto[state].items():
+                fail[next_state] = fallback.get(ch, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+                row[ch] = next_state
+                queue.append(next_state)
+            transitions[state] = row
+
+        return transitions, outputs
+
+    def scan(self, text):
+        """Find every phrase occurrence in text, returning PhraseHits"""
+        transitions = self._transitions
+        outputs = self._outputs
+        offsets = {}
+        state = 0
+
+        for index, ch in enumerate(text):
+            state = transitions[state].get(ch, 0)
+            matched = outputs[state]
+            if matched:
+                end = index + 1
+                for phrase in matched:
+                    start = end - len(phrase)
+                    starts = offsets.get(phrase)
+                    if starts is None:
+                        offsets[phrase] = [start]
+                    else:
+                        starts.append(start)
+
+        # Matches are reported by end offset; shorter phrases ending later
+        # can start earlier than longer ones, so restore start order
+        for starts in offsets.values():
+            if len(starts) > 1:
+                starts.sort()
+
+        return PhraseHits(offsets)
@@ -1,47 +1,247 @@
-from flask import request
+from abc import ABC, abstractmethod
+from flask import request, current_app
 from functools import wraps
-from datetime import datetime, timedelta
-import json
+from collections import OrderedDict
+from datetime import datetime
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
 
-class RateLimiter:
-    """Simple in-memory rate limiter"""
+def gcra_step(arrival, now, max_requests, time_window):
+    """One token-bucket (GCRA) decision: (allowed, new arrival time, seconds to wait)"""
+    interval = time_window / max_requests
+    burst = time_window - interval
+    arrival = max(arrival, now)
+    if arrival - now > burst:
+        return False, arrival, arrival - now - burst
+    return True, arrival + interval, 0.0
+
+class RateLimitBackend(ABC):
+    """Interface of the rate limit stores used by the rate_limit decorator"""
     
-    def __init__(self):
-        self.requests = {}
+    @abstractmethod
+    def check(self, identifier, max_requests=5, time_window=60):
+        """Record a request if allowed; returns (allowed, seconds until the next one is)"""
     
     def is_allowed(self, identifier, max_requests=5, time_window=60):
         """Check if request is allowed (5 requests per minute by default)"""
-        now = datetime.now()
+        return self.check(identifier, max_requests, time_window)[0]
+
+class RateLimiter(RateLimitBackend):
+    """In-memory (per-process) token-bucket rate limiter with a bounded key table
+
+    Each key holds a single float, its "theoretical arrival time" (the
+    GCRA form of a token bucket): every allowed request pushes it
+    forward by time_window / max_requests, and a request is refused
+    while it is more than a full bucket ahead of now. A check is O(1)
+    whatever the limit.
+
+    Keys are kept in least-recently-seen order. A key whose arrival time
+    has passed has a full bucket again, exactly like an unseen key, so
+    each call drops a few such idle keys from the old end at no loss.
+    The table never exceeds `max_keys`: past that the least recently seen
+    key is evicted, so memory stays flat under scans from many addresses.
+    """
+    
+    # Idle keys examined for eviction per call
+    EVICT_PER_CALL = 2
+    
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self.requests = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def check(self, identifier, max_requests=5, time_window=60):
+        """Record a request if allowed; returns (allowed, seconds until the next one is)"""
+        now = time.monotonic()
         key = str(identifier)
         
-        if key not in self.requests:
-            self.requests[key] = []
-        
-        # Remove old requests outside the time window
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if (now - req_time).seconds < time_window
-        ]
-        
-        # Check if limit exceeded
-        if len(self.requests[key]) >= max_requests:
-            return False
-        
-        # Add current request
-        self.requests[key].append(now)
-        return True
+        with self._lock:
+            self._evict_idle(now)
+            allowed, arrival, wait = gcra_step(self.requests.get(key, now), now, max_requests, time_window)
+            self.requests[key] = arrival
+            self.requests.move_to_end(key)
+            if len(self.requests) > self.max_keys:
+                self.requests.popitem(last=False)
+            return allowed, wait
     
-    def get_retry_after(self, identifier, time_window=60):
+    def get_retry_after(self, identifier, time_window=60, max_requests=5):
         """Get seconds until next request is allowed"""
-        key = str(identifier)
-        if key not in self.requests or not self.requests[key]:
+        with self._lock:
+            arrival = self.requests.get(str(identifier))
+        if arrival is None:
             return 0
+        burst = time_window - time_window / max_requests
+        return max(0, math.ceil(arrival - time.monotonic() - burst))
+    
+    def _evict_idle(self, now):
+        """Drop up to EVICT_PER_CALL least recently seen keys whose bucket has refilled (caller holds the lock)"""
+        for _ in range(self.EVICT_PER_CALL):
+            if not self.requests:
+                return
+            key, arrival = next(iter(self.requests.items()))
+            if arrival > now:
+                return
+            del self.requests[key]
+
+class SharedMemoryRateLimiter(RateLimitBackend):
+    """Token-bucket rate limiter shared by every worker process on one host
+
+    Buckets live in a memory-mapped file (by default under /dev/shm) that
+    all gunicorn workers map, so the configured limit holds for the host
+    instead of per worker. The file is a fixed table of 16-byte slots,
+    each a key hash and that key's GCRA arrival time (wall clock, so it
+    stays valid across restarts). A key hashes to one bucket of `WAYS`
+    slots; it takes its own slot there, else a slot whose bucket has
+    refilled, else the one closest to refilled. Memory is therefore
+    fixed at `slots` * 16 bytes and idle keys are reclaimed on reuse.
+
+    Each check locks only its bucket, with an fcntl record lock across
+    processes plus a thread lock within this one.
+    """
+    
+    SLOT = struct.Struct('<Qd')
+    WAYS = 4
+    
+    def __init__(self, path, slots=65536):
+        self.path = path
+        self.buckets = max(1, slots // self.WAYS)
+        size = self.buckets * self.WAYS * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key_hash(identifier):
+        """Nonzero 64-bit hash of the identifier (0 marks an empty slot)"""
+        digest = hashlib.blake2b(str(identifier).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') | 1
+    
+    def check(self, identifier, max_requests=5, time_window=60):
+        key = self.key_hash(identifier)
+        bucket = key % self.buckets
+        base = bucket * self.WAYS * self.SLOT.size
         
-        oldest_request = self.requests[key][0]
-        retry_after = time_window - (datetime.now() - oldest_request).seconds
-        return max(0, retry_after)
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, bucket)
+            try:
+                now = time.time()
+                offset = None
+                arrival = now
+                oldest = None
+                for way in range(self.WAYS):
+                    slot_offset = base + way * self.SLOT.size
+                    slot_key, slot_arrival = self.SLOT.unpack_from(self._map, slot_offset)
+                    if slot_key == key:
+                        offset, arrival = slot_offset, slot_arrival
+                        break
+                    if oldest is None or slot_arrival < oldest[1]:
+                        oldest = (slot_offset, slot_arrival)
+                if offset is None:
+                    # Reuse the slot nearest to (or past) a full bucket
+                    offset = oldest[0]
+                
+                allowed, arrival, wait = gcra_step(arrival, now, max_requests, time_window)
+                self.SLOT.pack_into(self._map, offset, key, arrival)
+                return allowed, wait
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, bucket)
+
+class MongoRateLimiter(RateLimitBackend):
+    """Fixed-window rate limiter shared across hosts through MongoDB
+
+    Each (identifier, window) has a counter document bumped with an
+    atomic $inc and removed by a TTL index once the window is over. To
+    save round trips, every process counts requests locally and sends
+    them in one $inc per `batch_size` requests or `flush_interval`
+    seconds, and on every request once it is within `batch_size` of the
+    limit. A limit can therefore be overshot by at most the counts the
+    other processes have not sent yet (under `batch_size` each).
+
+    If MongoDB is unreachable, decisions fall back to the local counts.
+    """
+    
+    def __init__(self, collection, batch_size=10, flush_interval=1.0, max_keys=100000):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        # key -> [global count at last sync, unsent count, last sync time, window end]
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def check(self, identifier, max_requests=5, time_window=60):
+        now = time.time()
+        window = int(now // time_window)
+        window_end = (window + 1) * time_window
+        key = f'{identifier}:{time_window}:{window}'
+        
+        with self._lock:
+            self._evict_expired(now)
+            state = self._counts.get(key)
+            if state is None:
+                state = self._counts[key] = [0, 0, 0.0, window_end]
+                if len(self._counts) > self.max_keys:
+                    self._counts.popitem(last=False)
+            self._counts.move_to_end(key)
+            synced, pending, synced_at, _ = state
+            
+            if synced + pending >= max_requests and now - synced_at < self.flush_interval:
+                # Known to be over the limit; no need to ask the store again yet
+                return False, window_end - now
+            
+            state[1] = pending = pending + 1
+            if (pending >= self.batch_size or now - synced_at >= self.flush_interval
+                    or synced + pending + self.batch_size > max_requests):
+                self._flush(key, state, now)
+            
+            if state[0] + state[1] > max_requests:
+                return False, window_end - now
+            return True, 0.0
+    
+    def _flush(self, key, state, now):
+        """Send the unsent count for key and learn the global count (caller holds the lock)"""
+        try:
+            document = self.collection.find_one_and_update(
+                {'_id': key},
+                {
+                    '$inc': {'count': state[1]},
+                    '$setOnInsert': {'expires_at': datetime.utcfromtimestamp(state[3])}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            print(f"Rate limit store error: {e}")
+            return
+        state[0] = document['count']
+        state[1] = 0
+        state[2] = now
+    
+    def _evict_expired(self, now):
+        """Drop up to two least recently seen keys whose window is over (caller holds the lock)"""
+        for _ in range(2):
+            if not self._counts:
+                return
+            key, state = next(iter(self._counts.items()))
+            if state[3] > now:
+                return
+            del self._counts[key]
 
-# Global rate limiter instance
+# Global rate limiter instance (used unless the app configures a shared one)
 rate_limiter = RateLimiter()
 
 def rate_limit(max_requests=5, time_window=60):
@@ -52,8 +252,10 @@ def rate_limit(max_requests=5, time_window=60):
             # Get user identifier (IP or user_id)
             identifier = request.remote_addr
             
-            if not rate_limiter.is_allowed(identifier, max_requests, time_window):
-                retry_after = rate_limiter.get_retry_after(identifier, time_window)
+            limiter = getattr(current_app, 'rate_limiter', rate_limiter)
+            allowed, wait = limiter.check(identifier, max_requests, time_window)
+            if not allowed:
+                retry_after = math.ceil(wait)
                 return {
                     'error': 'Rate limit exceeded',
                     'message': f'Too many requests. Please try again in {retry_after} seconds.',
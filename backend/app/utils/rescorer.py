@@ -0,0 +1,171 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from flask import current_app
+from bson.objectid import ObjectId
+from app.models.report import Report
+from app.utils.ai_analyzer import ANALYZER_VERSION
+from app.utils.batch_scorer import BatchScorer
+
+# Routes store only the first 500 characters of a submission
+PREVIEW_CHARS = 500
+
+
+def _rescore_texts(texts):
+    """Worker task: analyze a batch and keep only the fields a report stores"""
+    return [
+        (analysis['originality_score'], analysis['drift_details'], analysis['style_fingerprint'])
+        for analysis in BatchScorer.analyze_texts(texts)
+    ]
+
+
+class ReportRescorer:
+    """Recomputes stored report scores with the current analyzer
+
+    The reports collection is split into `partitions` _id ranges (evenly
+    spaced in ObjectId time) that are streamed in _id order, skipping
+    reports already stamped with ANALYZER_VERSION. Batches are analyzed
+    in `workers` processes (inline with 0) with at most two batches per
+    worker in flight, and their results written back with unordered
+    bulk writes. After each write the partition's last _id is saved in
+    the `rescore_runs` collection, so an interrupted run resumes where
+    it stopped. `max_rate` caps the documents re-scored per second to
+    leave the database and CPU to live traffic.
+
+    Stored content is only the first PREVIEW_CHARS characters of longer
+    submissions, and a score of that preview is not a score of the
+    submission, so those reports are skipped (and keep their old score
+    and version) unless `rescore_previews` is set.
+    """
+
+    def __init__(self, workers=0, batch_size=200, partitions=8, max_rate=0, rescore_previews=False, run_id=None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.partitions = partitions
+        self.max_rate = max_rate
+        self.rescore_previews = rescore_previews
+        self.run_id = run_id or f'rescore-{ANALYZER_VERSION}'
+
+    @staticmethod
+    def plan_partitions(first_id, last_id, count):
+        """_id ranges [start, end) covering first_id..last_id; the last one is open-ended"""
+        start = first_id.generation_time
+        step = (last_id.generation_time - start) / max(count, 1)
+        bounds = [first_id]
+        for index in range(1, count):
+            bound = ObjectId.from_datetime(start + step * index)
+            if bound > bounds[-1]:
+                bounds.append(bound)
+        bounds.append(None)
+        return [
+            {'start': bounds[i], 'end': bounds[i + 1], 'last_id': None, 'done': False}
+            for i in range(len(bounds) - 1)
+        ]
+
+    def load_checkpoint(self, restart=False):
+        """The saved run state, or a freshly planned one"""
+        db = current_app.db
+        if not restart:
+            run = db.rescore_runs.find_one({'_id': self.run_id})
+            if run and run.get('analyzer_version') == ANALYZER_VERSION:
+                return run
+
+        first_id, last_id = Report.id_range()
+        run = {
+            '_id': self.run_id,
+            'analyzer_version': ANALYZER_VERSION,
+            'partitions': self.plan_partitions(first_id, last_id, self.partitions) if first_id else [],
+            'scanned': 0,
+            'rescored': 0,
+            'skipped': 0,
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow(),
+            'finished_at': None
+        }
+        db.rescore_runs.replace_one({'_id': self.run_id}, run, upsert=True)
+        return run
+
+    def _save_progress(self, index, last_id, scanned, rescored, skipped, done=False):
+        update = {
+            '$set': {f'partitions.{index}.last_id': last_id, 'updated_at': datetime.utcnow()},
+            '$inc': {'scanned': scanned, 'rescored': rescored, 'skipped': skipped}
+        }
+        if done:
+            update['$set'][f'partitions.{index}.done'] = True
+        current_app.db.rescore_runs.update_one({'_id': self.run_id}, update)
+
+    def _get_pool(self):
+        # Same process model as AnalysisExecutor: workers fork from a clean, analyzer-preloaded server
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['app.utils.ai_analyzer'])
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    def run(self, restart=False, progress=None):
+        """Re-score every stale report; returns the run's totals
+
+        `progress`, when given, is called with the totals after every write.
+        """
+        run = self.load_checkpoint(restart)
+        totals = {key: run.get(key, 0) for key in ('scanned', 'rescored', 'skipped')}
+        pool = self._get_pool() if self.workers > 0 else None
+        pending = deque()
+        started = time.monotonic()
+        processed = 0
+
+        def finish(entry):
+            nonlocal processed
+            index, last_id, ids, result, scanned, skipped = entry
+            updates = []
+            if ids:
+                scores = result.result() if pool else result
+                updates = [
+                    (report_id, Report.score_fields(*score))
+                    for report_id, score in zip(ids, scores)
+                ]
+            rescored = Report.apply_rescores(updates)
+            self._save_progress(index, last_id, scanned, rescored, skipped, done=ids is None)
+            totals['scanned'] += scanned
+            totals['rescored'] += rescored
+            totals['skipped'] += skipped
+            processed += scanned
+            if progress:
+                progress(dict(totals))
+            if self.max_rate > 0:
+                # Sleep off any lead over the allowed rate
+                lead = processed / self.max_rate - (time.monotonic() - started)
+                if lead > 0:
+                    time.sleep(lead)
+
+        try:
+            for index, partition in enumerate(run['partitions']):
+                if partition['done']:
+                    continue
+                last_id = partition['last_id']
+                for batch in Report.iter_stale_batches(
+                    partition['start'], partition['end'], last_id, self.batch_size
+                ):
+                    last_id = batch[-1]['_id']
+                    if self.rescore_previews:
+                        kept = batch
+                    else:
+                        kept = [report for report in batch if len(report.get('content') or '') < PREVIEW_CHARS]
+                    ids = [report['_id'] for report in kept]
+                    texts = [report.get('content') or '' for report in kept]
+                    result = pool.submit(_rescore_texts, texts) if pool else _rescore_texts(texts)
+                    pending.append((index, last_id, ids, result, len(batch), len(batch) - len(kept)))
+                    while len(pending) > max(self.workers, 1) * 2:
+                        finish(pending.popleft())
+                # Marks the partition done once all its batches are written
+                pending.append((index, last_id, None, None, 0, 0))
+            while pending:
+                finish(pending.popleft())
+        finally:
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        current_app.db.rescore_runs.update_one(
+            {'_id': self.run_id}, {'$set': {'finished_at': datetime.utcnow()}}
+        )
+        return totals
@@ -0,0 +1,121 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from app.utils.ai_analyzer import ANALYZER_VERSION
+
+
+class ResultCache:
+    """Content-addressed cache of analysis results
+
+    Results are keyed by a hash of the normalized text plus the analyzer
+    version, so a heuristics change never serves stale scores. Lookups go
+    to a bounded in-process LRU first and then, when a Mongo collection
+    is configured, to a shared tier whose entries expire via a TTL index
+    (created from the index manifest, see app/models/indexes.py).
+    Error fallbacks (see OriginallityAnalyzer.error_result) are never
+    stored, so a transient failure is retried rather than served.
+    """
+
+    def __init__(self, max_entries=1024, collection=None, ttl_seconds=86400):
+        self.max_entries = max_entries
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'local_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+    @staticmethod
+    def normalize(text):
+        """Normalize text the same way the analyze route does before scoring"""
+        return (text or '').strip()
+
+    @staticmethod
+    def make_key(text):
+        """Hash of the analyzer version and the normalized text"""
+        payload = f"{ANALYZER_VERSION}\0{ResultCache.normalize(text)}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, text):
+        """Return a cached result for text, or None"""
+        key = self.make_key(text)
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._counters['local_hits'] += 1
+                return copy.deepcopy(result)
+
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({'_id': key}, {'result': 1})
+            except Exception as e:
+                print(f"Analysis cache lookup error: {e}")
+                doc = None
+            if doc:
+                self._store_local(key, doc['result'])
+                with self._lock:
+                    self._counters['shared_hits'] += 1
+                return copy.deepcopy(doc['result'])
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    @staticmethod
+    def cacheable(result):
+        """Whether result may be cached (not an analysis error fallback)"""
+        return not result.get('analysis_error')
+
+    def set(self, text, result):
+        """Store a result for text in every configured tier (uncacheable results are skipped)"""
+        if not self.cacheable(result):
+            return
+        key = self.make_key(text)
+        self._store_local(key, copy.deepcopy(result))
+
+        if self.collection is not None:
+            try:
+                self.collection.replace_one(
+                    {'_id': key},
+                    {'result': result, 'analyzer_version': ANALYZER_VERSION, 'created_at': datetime.utcnow()},
+                    upsert=True
+                )
+            except Exception as e:
+                print(f"Analysis cache store error: {e}")
+
+    def get_or_compute(self, text, compute):
+        """Return the cached result for text, computing and storing it on a miss"""
+        result = self.get(text)
+        if result is None:
+            result = compute(self.normalize(text))
+            self.set(text, result)
+        return result
+
+    def _store_local(self, key, result):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['max_entries'] = self.max_entries
+        stats['shared_tier'] = self.collection is not None
+        stats['hit_ratio'] = round((stats['local_hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        return stats
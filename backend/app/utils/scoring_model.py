@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+# Raw signals from OriginallityAnalyzer.extract_signals, in signal-matrix column order
+SIGNAL_NAMES = (
+    'word_count', 'sentence_count', 'paragraph_count', 'ai_phrase_count',
+    'passive_count', 'drift_passive_count', 'sentence_length_std',
+    'paragraph_length_std', 'verbose_count', 'top_repetition_score',
+    'contraction_count', 'pronoun_count', 'casual_count',
+    'emotional_punctuation', 'transition_count', 'vocabulary_diversity',
+    'first_word_repetition'
+)
+
+# Model inputs derived from the signals, in feature-matrix column order
+FEATURE_NAMES = (
+    'log_word_count', 'phrase_density', 'passive_ratio', 'sentence_uniformity',
+    'verbose_count', 'top_repetition_score', 'contraction_rate', 'pronoun_rate',
+    'casual_count', 'emotional_rate', 'transition_rate', 'paragraph_uniformity',
+    'vocabulary_diversity', 'first_word_repetition'
+)
+
+LABELS = {'ai': 1, 'human': 0}
+
+
+def signal_row(signals):
+    """extract_signals() output as one signal-matrix row"""
+    return [signals[name] for name in SIGNAL_NAMES]
+
+
+class ScoringModel:
+    """Logistic originality model: one weight per feature plus a bias
+
+    Signals are turned into the fixed-length FEATURE_NAMES vector and
+    the probability that a text is AI-written is sigmoid(features . w + b);
+    originality is 100 * (1 - that probability). Input standardization is
+    folded into the weights at training time, so scoring a document is a
+    single dot product and scoring a batch is one matrix-vector product.
+
+    Weights are stored as a one-row structured .npy array whose field
+    names are the feature names, so a file trained for another feature
+    set is rejected instead of silently misread.
+    """
+
+    def __init__(self, weights, bias):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        if self.weights.shape != (len(FEATURE_NAMES),):
+            raise ValueError(f'Expected {len(FEATURE_NAMES)} weights, got {self.weights.shape}')
+
+    @property
+    def version(self):
+        """Short digest of the weights, to tell results of different models apart"""
+        payload = self.weights.astype('<f8').tobytes() + np.float64(self.bias).astype('<f8').tobytes()
+        return hashlib.blake2b(payload, digest_size=4).hexdigest()
+
+    @staticmethod
+    def feature_matrix(signals):
+        """Feature matrix (one row per document) from a signal matrix"""
+        signals = np.atleast_2d(np.asarray(signals, dtype=np.float64))
+        col = lambda name: signals[:, SIGNAL_NAMES.index(name)]
+        per_100_words = 100.0 / np.maximum(col('word_count'), 1)
+        sentences = col('sentence_count')
+        return np.column_stack([
+            np.log1p(col('word_count')),
+            col('ai_phrase_count') * per_100_words,
+            col('passive_count') * 100.0 / np.maximum(sentences, 1),
+            np.where(sentences > 2, 1.0 / (1.0 + col('sentence_length_std')), 0.0),
+            col('verbose_count'),
+            col('top_repetition_score'),
+            col('contraction_count') * per_100_words,
+            col('pronoun_count') * per_100_words,
+            col('casual_count'),
+            col('emotional_punctuation') * per_100_words,
+            col('transition_count') * per_100_words,
+            np.where(col('paragraph_count') > 2, 1.0 / (1.0 + col('paragraph_length_std') / 10.0), 0.0),
+            col('vocabulary_diversity'),
+            col('first_word_repetition')
+        ])
+
+    def ai_probability(self, signals):
+        """Probability that each document of a signal matrix is AI-written"""
+        logits = self.feature_matrix(signals) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def score_matrix(self, signals):
+        """Originality scores (0-100, one decimal) for a signal matrix"""
+        originality = 100.0 * (1.0 - self.ai_probability(signals))
+        # Python's round() so single and batch scoring agree digit for digit
+        return np.array([round(float(value), 1) for value in originality])
+
+    def score(self, signals):
+        """Originality score for one extract_signals() dict"""
+        return float(self.score_matrix([signal_row(signals)])[0])
+
+    @classmethod
+    def train(cls, signals, labels, regularization=1.0):
+        """Fit the model on a signal matrix and 0/1 labels (1 = AI-written)"""
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.preprocessing import StandardScaler
+
+        features = cls.feature_matrix(signals)
+        scaler = StandardScaler().fit(features)
+        model = LogisticRegression(C=regularization, class_weight='balanced', max_iter=1000)
+        model.fit(scaler.transform(features), labels)
+
+        # Fold the standardization into the weights: w.((x - mean) / scale) = (w / scale).x - (w / scale).mean
+        weights = model.coef_[0] / scaler.scale_
+        return cls(weights, model.intercept_[0] - weights @ scaler.mean_)
+
+    def accuracy(self, signals, labels):
+        """Fraction of documents whose label the model predicts"""
+        predicted = self.ai_probability(signals) >= 0.5
+        return float(np.mean(predicted == np.asarray(labels, dtype=bool)))
+
+    @staticmethod
+    def read_corpus(path):
+        """(text, label) pairs from a JSON-lines file of {"text", "label"} records
+
+        Labels are "ai"/"human" or 1/0.
+        """
+        samples = []
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                label = record.get('label')
+                label = LABELS.get(label.lower()) if isinstance(label, str) else label
+                if label not in (0, 1) or not isinstance(record.get('text'), str):
+                    raise ValueError(f'{path}:{line_number}: expected a text and an "ai"/"human" label')
+                samples.append((record['text'], int(label)))
+        return samples
+
+    def save(self, path):
+        """Write the weights file (replaced atomically)"""
+        record = np.zeros(1, dtype=[(name, '<f8') for name in FEATURE_NAMES + ('bias',)])
+        for name, weight in zip(FEATURE_NAMES, self.weights):
+            record[name] = weight
+        record['bias'] = self.bias
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.weights.')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, record)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a weights file written by save()"""
+        record = np.load(path, allow_pickle=False)
+        if record.dtype.names != FEATURE_NAMES + ('bias',):
+            raise ValueError(f'{path} was trained for a different feature set')
+        return cls([record[name][0] for name in FEATURE_NAMES], record['bias'][0])
+
+    @classmethod
+    def load_or_none(cls, path):
+        """The model at path, or None (rule-based scoring) if there is none or it is unusable"""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls.load(path)
+        except (OSError, ValueError) as e:
+            print(f"Scoring model load error: {e}")
+            return None
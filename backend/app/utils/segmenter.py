@@ -0,0 +1,114 @@
+from app.utils.patterns import PARAGRAPH_BREAK, SENTENCE_BOUNDARY, WORD_CHAR
+
+
+class Segmenter:
+    """Sentence and paragraph segmentation as (start, end) spans over the original text
+
+    Spans are stripped of surrounding whitespace and sentences include
+    their closing punctuation, so text[start:end] is exactly what a UI
+    highlights. Paragraph breaks (blank lines) always end a sentence.
+    A period followed by whitespace ends a sentence except after a title
+    ("Dr.") or an abbreviation followed by a lowercase word or a number
+    ("approx. 5", "e.g. this"); one inside a number ("3.14") or a domain
+    ("example.com") never does;
+    an ellipsis only ends one when a capitalized word follows, and a
+    quoted question or exclamation doesn't when a lowercase word does.
+    """
+
+    # Never end a sentence
+    TITLES = {
+        'mr', 'mrs', 'ms', 'dr', 'prof', 'rev', 'st', 'mt', 'gen', 'col',
+        'capt', 'lt', 'sgt', 'hon', 'vs', 'e.g', 'i.e', 'cf', 'viz'
+    }
+
+    # End a sentence only when a capitalized word follows
+    ABBREVIATIONS = {
+        'etc', 'inc', 'ltd', 'co', 'corp', 'jr', 'sr', 'no', 'vol', 'fig',
+        'approx', 'dept', 'est', 'al', 'ave', 'jan', 'feb', 'mar', 'apr',
+        'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec', 'u.s',
+        'u.k', 'a.m', 'p.m', 'ph.d'
+    }
+
+    @staticmethod
+    def paragraph_spans(text):
+        """Spans of the non-blank paragraphs of text"""
+        spans = []
+        start = 0
+        for match in PARAGRAPH_BREAK.finditer(text):
+            Segmenter._add_span(text, start, match.start(), spans)
+            start = match.end()
+        Segmenter._add_span(text, start, len(text), spans)
+        return spans
+
+    @staticmethod
+    def sentence_spans(text, paragraph_spans=None):
+        """Spans of the sentences of text (containing at least one word character)"""
+        if paragraph_spans is None:
+            paragraph_spans = Segmenter.paragraph_spans(text)
+        spans = []
+        for paragraph_start, paragraph_end in paragraph_spans:
+            start = paragraph_start
+            for match in SENTENCE_BOUNDARY.finditer(text, paragraph_start, paragraph_end):
+                if Segmenter._is_boundary(text, match, paragraph_end):
+                    Segmenter._add_sentence(text, start, match.end(), spans)
+                    start = match.end()
+            Segmenter._add_sentence(text, start, paragraph_end, spans)
+        return spans
+
+    @staticmethod
+    def _is_boundary(text, match, limit):
+        """Whether the terminator run in match ends a sentence"""
+        punctuation = match.group('punct')
+        next_char = Segmenter._next_char(text, match.end(), limit)
+        if next_char is None:
+            return True
+        if '!' in punctuation or '?' in punctuation:
+            # A quoted exclamation or question can continue the sentence ("Why?" she asked)
+            quoted = match.end() > match.end('punct')
+            return not (quoted and next_char.islower())
+        if punctuation != '.':
+            # Ellipsis: a pause unless a new capitalized sentence follows
+            return next_char.isupper()
+
+        word = Segmenter._word_before(text, match.start()).lower()
+        if word in Segmenter.TITLES:
+            return False
+        if word in Segmenter.ABBREVIATIONS:
+            return next_char.isupper()
+        if '.' in word:
+            # Other dotted acronyms ("a.k.a.") behave like abbreviations
+            return next_char.isupper()
+        # Casual writing often starts sentences in lowercase, so any other period ends one
+        return True
+
+    @staticmethod
+    def _next_char(text, position, limit):
+        """First non-whitespace character at or after position, or None"""
+        while position < limit:
+            if not text[position].isspace():
+                return text[position]
+            position += 1
+        return None
+
+    @staticmethod
+    def _word_before(text, position):
+        """The word ending at position, without leading quotes/brackets"""
+        start = position
+        while start > 0 and not text[start - 1].isspace() and position - start < 20:
+            start -= 1
+        return text[start:position].lstrip('("\'[“‘')
+
+    @staticmethod
+    def _add_span(text, start, end, spans):
+        """Append the span of text[start:end] stripped of whitespace, if non-empty"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            spans.append((start, end))
+
+    @staticmethod
+    def _add_sentence(text, start, end, spans):
+        if WORD_CHAR.search(text, start, end):
+            Segmenter._add_span(text, start, end, spans)
@@ -0,0 +1,113 @@
+import codecs
+from app.utils.document_stats import DocumentStats
+from app.utils.segmenter import Segmenter
+
+
+class StreamingAnalyzer:
+    """Analyzes arbitrarily large documents from a stream of chunks
+
+    The input is cut into sections of whole paragraphs (at most
+    `max_section_chars` each); every section is scored on its own and
+    folded into a running DocumentStats, so only one section of text is
+    held in memory at a time.
+    """
+
+    def __init__(self, max_section_chars=20000, max_vocabulary=200000):
+        self.max_section_chars = max_section_chars
+        self.max_vocabulary = max_vocabulary
+
+    @staticmethod
+    def iter_text_chunks(byte_chunks, encoding='utf-8'):
+        """Decode an iterable of byte chunks incrementally"""
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        for chunk in byte_chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+    @staticmethod
+    def iter_stream(stream, chunk_size=65536):
+        """Read a file-like object (request body, upload) as byte chunks"""
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def iter_sections(self, text_chunks):
+        """Yield (offset, section_text) pieces ending on paragraph boundaries"""
+        buffer = ''
+        offset = 0
+
+        for chunk in text_chunks:
+            buffer += chunk
+            while len(buffer) > self.max_section_chars:
+                cut = self._find_cut(buffer)
+                yield offset, buffer[:cut]
+                offset += cut
+                buffer = buffer[cut:]
+
+        if buffer.strip():
+            yield offset, buffer
+
+    def _find_cut(self, buffer):
+        """Best place to end a section: paragraph break, then sentence end, then whitespace"""
+        limit = self.max_section_chars
+        cut = buffer.rfind('\n\n', 0, limit)
+        if cut > 0:
+            return cut + 2
+
+        # The last sentence before the limit may continue past it, so cut where it starts
+        sentence_spans = Segmenter.sentence_spans(buffer[:limit])
+        if len(sentence_spans) > 1:
+            return sentence_spans[-1][0]
+
+        space = max(buffer.rfind(' ', 0, limit), buffer.rfind('\n', 0, limit))
+        if space > 0:
+            return space + 1
+
+        return limit
+
+    def analyze(self, text_chunks):
+        """Yield one event per section, then a final event with the document result
+
+        Section events: {'type': 'section', 'index', 'start', 'end',
+        'word_count', 'originality_score', 'style_drift'}.
+        Final event: {'type': 'result', 'analysis', 'preview'} where
+        preview is the first 500 characters of the document.
+        """
+        document = DocumentStats(max_vocabulary=self.max_vocabulary)
+        preview = ''
+
+        for index, (start, section) in enumerate(self.iter_sections(text_chunks)):
+            if len(preview) < 500:
+                preview = (preview + section)[:500]
+
+            stats = DocumentStats.from_text(section, max_vocabulary=self.max_vocabulary)
+            section_result = stats.analyze()
+            document.merge(stats)
+
+            yield {
+                'type': 'section',
+                'index': index,
+                'start': start,
+                'end': start + len(section),
+                'word_count': stats.word_count,
+                'originality_score': section_result['originality_score'],
+                'style_drift': section_result['style_drift']
+            }
+
+        yield {
+            'type': 'result',
+            'analysis': document.analyze(),
+            'preview': preview.strip()
+        }
+
+    def analyze_text(self, text):
+        """Convenience wrapper returning only the final analysis for an in-memory text"""
+        for event in self.analyze([text]):
+            if event['type'] == 'result':
+                return event['analysis']
@@ -0,0 +1,85 @@
+class StyleBaseline:
+    """Running per-user baseline of style metrics
+
+    The baseline lives in users.style_profile as a sample count plus, per
+    metric, the running sum and sum of squares. Those power sums are
+    updated with a single atomic $inc (no read-modify-write), are
+    additive across a batch, and yield mean and variance directly, so
+    drift from the author's own history never needs their past reports.
+    """
+
+    # Smallest standard deviation assumed per metric, so a short or very
+    # uniform history doesn't turn tiny differences into huge drift
+    METRICS = {
+        'avg_sentence_length': 2.0,
+        'vocabulary_diversity': 5.0,
+        'ai_phrase_density': 0.5,
+        'repetition_ratio': 2.0
+    }
+
+    # Analyses needed before drift from baseline is reported
+    MIN_SAMPLES = 3
+
+    @staticmethod
+    def metrics(analysis):
+        """Baseline metrics for one analysis result, or None if it has no fingerprint"""
+        fingerprint = analysis.get('style_fingerprint') or {}
+        word_count = fingerprint.get('word_count', 0)
+        if not word_count:
+            return None
+        drift_details = analysis.get('drift_details') or {}
+        return {
+            'avg_sentence_length': float(fingerprint.get('avg_sentence_length', 0)),
+            'vocabulary_diversity': float(fingerprint.get('vocabulary_diversity', 0)),
+            'ai_phrase_density': fingerprint.get('ai_phrase_count', 0) * 100.0 / word_count,
+            'repetition_ratio': float(drift_details.get('repetition_ratio', 0))
+        }
+
+    @staticmethod
+    def increments(metrics_list):
+        """$inc document folding a list of metric dicts into the style profile"""
+        metrics_list = [m for m in metrics_list if m]
+        if not metrics_list:
+            return {}
+        inc = {'style_profile.samples': len(metrics_list)}
+        for name in StyleBaseline.METRICS:
+            inc[f'style_profile.sum.{name}'] = sum(m[name] for m in metrics_list)
+            inc[f'style_profile.sumsq.{name}'] = sum(m[name] * m[name] for m in metrics_list)
+        return inc
+
+    @staticmethod
+    def summary(profile):
+        """Mean and standard deviation per metric from a stored profile"""
+        samples = (profile or {}).get('samples', 0)
+        if not samples:
+            return {}
+        summary = {}
+        for name in StyleBaseline.METRICS:
+            total = profile.get('sum', {}).get(name, 0.0)
+            total_sq = profile.get('sumsq', {}).get(name, 0.0)
+            mean = total / samples
+            variance = max(total_sq / samples - mean * mean, 0.0)
+            summary[name] = {'mean': round(mean, 2), 'std': round(variance ** 0.5, 2)}
+        return summary
+
+    @staticmethod
+    def drift(profile, metrics):
+        """Drift of one analysis from the author's baseline (0-100), with per-metric z-scores
+
+        Returns (None, {}) until the baseline has MIN_SAMPLES analyses.
+        """
+        samples = (profile or {}).get('samples', 0)
+        if not metrics or samples < StyleBaseline.MIN_SAMPLES:
+            return None, {}
+
+        z_scores = {}
+        for name, min_std in StyleBaseline.METRICS.items():
+            total = profile.get('sum', {}).get(name, 0.0)
+            total_sq = profile.get('sumsq', {}).get(name, 0.0)
+            mean = total / samples
+            std = max(total_sq / samples - mean * mean, 0.0) ** 0.5
+            z_scores[name] = round(abs(metrics[name] - mean) / max(std, min_std), 2)
+
+        # An average deviation of 3 standard deviations counts as full drift
+        average_z = sum(z_scores.values()) / len(z_scores)
+        return round(min(100.0, average_z / 3.0 * 100.0), 1), z_scores
@@ -0,0 +1,110 @@
+from collections import Counter, namedtuple
+import numpy as np
+from app.utils.segmenter import Segmenter
+
+# Whitespace as str.split() sees it; every such code point is below U+3001
+_SPACE_LIMIT = 0x3001
+_IS_SPACE = np.array([chr(c).isspace() for c in range(_SPACE_LIMIT + 1)], dtype=bool)
+
+_TextFeaturesBase = namedtuple('_TextFeaturesBase', [
+    'text',
+    'text_lower',
+    'tokens',
+    'lower_tokens',
+    'sentence_spans',
+    'sentence_word_counts',
+    'sentence_first_words',
+    'paragraph_spans',
+    'paragraph_word_counts',
+    'word_counts',
+    'punctuation_counts',
+    'phrase_hits'
+], defaults=(None,))
+
+
+class TextFeatures(_TextFeaturesBase):
+    """Immutable, precomputed view of a text shared by every analyzer stage
+
+    Built once per request so the scoring stages don't re-lowercase,
+    re-split and re-tokenize the same text independently. Sentences and
+    paragraphs are (start, end) spans over `text` (see Segmenter); their
+    word counts come from token offsets, not from copies of each segment.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_text(cls, text, matcher=None):
+        """Extract all features from text in a single pass per feature
+
+        When a PhraseMatcher is given, every lexicon hit in the lowercased
+        text is collected in the same step and exposed as `phrase_hits`.
+        """
+        text = text or ''
+        text_lower = text.lower()
+        tokens = text.split()
+        lower_tokens = text_lower.split()
+
+        paragraph_spans = Segmenter.paragraph_spans(text)
+        sentence_spans = Segmenter.sentence_spans(text, paragraph_spans)
+        token_starts, token_ends = cls.token_offsets(text)
+
+        sentence_word_counts = cls._span_word_counts(token_starts, sentence_spans)
+        first_tokens = np.searchsorted(token_starts, [start for start, _ in sentence_spans])
+        sentence_first_words = tuple(
+            text[token_starts[i]:token_ends[i]].lower() for i in first_tokens.tolist()
+        )
+
+        return cls(
+            text=text,
+            text_lower=text_lower,
+            tokens=tuple(tokens),
+            lower_tokens=tuple(lower_tokens),
+            sentence_spans=tuple(sentence_spans),
+            sentence_word_counts=sentence_word_counts,
+            sentence_first_words=sentence_first_words,
+            paragraph_spans=tuple(paragraph_spans),
+            paragraph_word_counts=cls._span_word_counts(token_starts, paragraph_spans),
+            word_counts=Counter(lower_tokens),
+            punctuation_counts={
+                'exclamation': text.count('!'),
+                'question': text.count('?'),
+                'ellipsis': text.count('...')
+            },
+            phrase_hits=matcher.scan(text_lower) if matcher else None
+        )
+
+    @staticmethod
+    def token_offsets(text):
+        """Start and end offsets of the whitespace-separated tokens of text (as str.split())"""
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        is_token = ~_IS_SPACE[np.minimum(codes, _SPACE_LIMIT)]
+        edges = np.diff(np.concatenate(([False], is_token, [False])).astype(np.int8))
+        return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    @staticmethod
+    def _span_word_counts(token_starts, spans):
+        """Number of tokens inside each (stripped) span"""
+        if not spans:
+            return ()
+        bounds = np.asarray(spans, dtype=np.int64)
+        counts = np.searchsorted(token_starts, bounds[:, 1]) - np.searchsorted(token_starts, bounds[:, 0])
+        return tuple(counts.tolist())
+
+    @property
+    def sentences(self):
+        """Sentence texts (slices of `text`, built on demand)"""
+        return tuple(self.text[start:end] for start, end in self.sentence_spans)
+
+    @property
+    def paragraphs(self):
+        """Paragraph texts (slices of `text`, built on demand)"""
+        return tuple(self.text[start:end] for start, end in self.paragraph_spans)
+
+    @property
+    def word_count(self):
+        return len(self.tokens)
+
+    @property
+    def sentence_count(self):
+        return len(self.sentence_spans)
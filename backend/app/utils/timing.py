@@ -0,0 +1,192 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+from flask import g, request
+
+# Recorder for the current request; None when the request isn't sampled
+_current_recorder = ContextVar('timing_recorder', default=None)
+
+
+class _NoopSpan:
+    """Shared span used when no recorder is active (costs one ContextVar lookup)"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.add(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+def span(name):
+    """Context manager timing a block into the current request's recorder"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return NOOP_SPAN
+    return _Span(recorder, name)
+
+
+def current_recorder():
+    return _current_recorder.get()
+
+
+class SpanRecorder:
+    """Total duration (ns) and count per span name for one request"""
+
+    def __init__(self):
+        self.spans = {}
+
+    def add(self, name, duration_ns, count=1):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [duration_ns, count]
+        else:
+            entry[0] += duration_ns
+            entry[1] += count
+
+    def merge(self, spans):
+        """Add spans recorded elsewhere (e.g. in a pool worker process)"""
+        for name, (duration_ns, count) in spans.items():
+            self.add(name, duration_ns, count)
+
+    def server_timing(self):
+        """Server-Timing header value"""
+        return ', '.join(
+            f"{name};dur={duration_ns / 1e6:.3f}" for name, (duration_ns, _) in self.spans.items()
+        )
+
+
+def collect_spans(fn, *args):
+    """Run fn(*args) under a fresh recorder; returns (result, spans)
+
+    Used to carry analyzer stage timings back from pool worker processes.
+    """
+    recorder = SpanRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        return fn(*args), recorder.spans
+    finally:
+        _current_recorder.reset(token)
+
+
+class TimingHistograms:
+    """In-process latency histograms per span name
+
+    Buckets are log-spaced, four per power of two of nanoseconds (from
+    ~1 µs), so recording is a bit_length, a shift and an increment.
+    Percentiles are reported as the upper bound of their bucket, i.e.
+    within 25% of the true value.
+    """
+
+    OCTAVES = 32
+    SUBDIVISIONS = 4
+    MIN_BITS = 10
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def bucket_index(cls, duration_ns):
+        """Bucket 0 holds durations under 2**MIN_BITS ns; then four per power of two"""
+        bits = int(duration_ns).bit_length()
+        if bits <= cls.MIN_BITS:
+            return 0
+        sub = (duration_ns >> (bits - 3)) & 3
+        return min((bits - cls.MIN_BITS - 1) * cls.SUBDIVISIONS + sub + 1, cls.OCTAVES * cls.SUBDIVISIONS)
+
+    @classmethod
+    def bucket_upper_ns(cls, index):
+        if index == 0:
+            return 1 << cls.MIN_BITS
+        octave, sub = divmod(index - 1, cls.SUBDIVISIONS)
+        return (5 + sub) << (octave + cls.MIN_BITS - 2)
+
+    def record(self, name, duration_ns):
+        index = self.bucket_index(duration_ns)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = {
+                    'count': 0, 'total_ns': 0, 'buckets': [0] * (self.OCTAVES * self.SUBDIVISIONS + 1)
+                }
+            histogram['count'] += 1
+            histogram['total_ns'] += duration_ns
+            histogram['buckets'][index] += 1
+
+    def record_spans(self, spans, prefix=None):
+        for name, (duration_ns, _) in spans.items():
+            self.record(f"{prefix}:{name}" if prefix else name, duration_ns)
+
+    def _percentile_ms(self, buckets, count, fraction):
+        target = count * fraction
+        seen = 0
+        for index, bucket_count in enumerate(buckets):
+            seen += bucket_count
+            if seen >= target:
+                return round(self.bucket_upper_ns(index) / 1e6, 3)
+        return None
+
+    def stats(self):
+        """Count, mean and approximate p50/p95/p99 (ms) per span name"""
+        with self._lock:
+            snapshot = {name: (h['count'], h['total_ns'], list(h['buckets'])) for name, h in self._histograms.items()}
+        return {
+            name: {
+                'count': count,
+                'mean_ms': round(total_ns / count / 1e6, 3),
+                'p50_ms': self._percentile_ms(buckets, count, 0.50),
+                'p95_ms': self._percentile_ms(buckets, count, 0.95),
+                'p99_ms': self._percentile_ms(buckets, count, 0.99)
+            }
+            for name, (count, total_ns, buckets) in snapshot.items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+
+def install_request_timing(app, histograms, sample_rate=1.0):
+    """Time sampled requests: spans go to a Server-Timing header and the histograms"""
+
+    @app.before_request
+    def start_request_timing():
+        if sample_rate >= 1.0 or random.random() < sample_rate:
+            g.timing_token = _current_recorder.set(SpanRecorder())
+            g.timing_start = time.perf_counter_ns()
+
+    @app.after_request
+    def finish_request_timing(response):
+        recorder = _current_recorder.get()
+        if recorder is not None and 'timing_start' in g:
+            recorder.add('total', time.perf_counter_ns() - g.timing_start)
+            response.headers['Server-Timing'] = recorder.server_timing()
+            histograms.record_spans(recorder.spans, prefix=request.endpoint)
+        return response
+
+    @app.teardown_request
+    def stop_request_timing(exc):
+        token = g.pop('timing_token', None)
+        if token is not None:
+            _current_recorder.reset(token)
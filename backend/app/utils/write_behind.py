@@ -0,0 +1,251 @@
+import fcntl
+import glob
+import os
+import threading
+import time
+from flask import current_app
+from bson import json_util
+from pymongo.errors import BulkWriteError
+from app.models.analytics import AnalyticsRollup
+from app.models.user import User
+from app.utils.admin_cache import invalidate_admin_cache
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindFull(Exception):
+    """Raised when the buffer holds max_pending reports and can't take more"""
+
+
+class WriteBehindBuffer:
+    """Buffers report inserts and user counter increments, flushing them in batches
+
+    Routes hand over an analysis' reports (with pre-assigned _ids, so
+    their ids can be returned at once) and the user's $inc document, then
+    respond without waiting for MongoDB. Every `flush_interval` seconds,
+    or as soon as `max_items` reports are waiting, a background thread
+    writes them with one unordered insert_many, one bulk_write of
+    increments coalesced per user, and one analytics rollup update.
+
+    Each entry is first appended to a local spill file (JSON lines in
+    `spill_dir`, flushed to the OS, and fsynced with `fsync`). A spill
+    file is deleted once every entry in it is stored. Files left by a
+    crashed process are picked up by the next one to start; an fcntl
+    lock on each file keeps live workers from taking each other's.
+    Replays are idempotent for reports (duplicate _ids are skipped),
+    and an entry whose reports were all stored before is not counted
+    again, so counters can lag after a crash mid-flush but never double.
+
+    Queued reports can be read back by _id (pending_report) until they
+    are stored, so a report id returned to a client resolves at once in
+    this process; other processes, and history pages, see the report
+    after the flush.
+
+    A failed flush keeps its entries for the next attempt. Once
+    `max_pending` reports are waiting, add() raises WriteBehindFull and
+    the caller writes synchronously instead.
+    """
+
+    def __init__(self, spill_dir, flush_interval=0.2, max_items=100, max_pending=10000, fsync=False):
+        self.spill_dir = spill_dir
+        self.flush_interval = flush_interval
+        self.max_items = max_items
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self._entries = []
+        self._pending_reports = 0
+        # Reports queued or being flushed, by _id
+        self._pending_by_id = {}
+        # Spill files backing self._entries: open files held locked until their entries are stored
+        self._segments = []
+        self._segment = None
+        self._lock = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._counters = {'flushes': 0, 'reports_written': 0, 'failed_flushes': 0, 'recovered': 0}
+        os.makedirs(spill_dir, exist_ok=True)
+
+    def add(self, user_id, report_docs, increments):
+        """Queue reports (from build_report, with _id set) and the user's $inc document"""
+        entry = {'user_id': str(user_id), 'reports': report_docs, 'increments': increments}
+        line = json_util.dumps(entry) + '\n'
+        with self._lock:
+            if self._pending_reports + len(report_docs) > self.max_pending:
+                raise WriteBehindFull(f'{self._pending_reports} reports waiting to be written')
+            if self._segment is None:
+                self._segment = self._open_segment()
+            self._segment.write(line)
+            self._segment.flush()
+            if self.fsync:
+                os.fsync(self._segment.fileno())
+            self._entries.append(entry)
+            self._pending_reports += len(report_docs)
+            self._index(entry)
+            if self._pending_reports >= self.max_items:
+                self._lock.notify()
+
+    def _open_segment(self):
+        """New spill file, locked by this process (caller holds the lock)"""
+        path = os.path.join(self.spill_dir, f'reports-{os.getpid()}-{time.time_ns()}.jsonl')
+        segment = open(path, 'a', encoding='utf-8')
+        fcntl.flock(segment.fileno(), fcntl.LOCK_EX)
+        return segment
+
+    def recover(self):
+        """Adopt spill files no live process holds; their entries are written by the next flush"""
+        recovered = 0
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, 'reports-*.jsonl'))):
+            segment = open(path, 'a+', encoding='utf-8')
+            try:
+                fcntl.flock(segment.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                segment.close()
+                continue
+            if not os.path.exists(path):
+                # Deleted by its owner between glob and lock
+                segment.close()
+                continue
+            segment.seek(0)
+            entries = []
+            for line in segment:
+                try:
+                    entries.append(json_util.loads(line))
+                except ValueError:
+                    # Torn last line of a crashed writer
+                    continue
+            with self._lock:
+                self._entries.extend(entries)
+                self._pending_reports += sum(len(entry['reports']) for entry in entries)
+                for entry in entries:
+                    self._index(entry)
+                self._segments.append(segment)
+                self._counters['recovered'] += len(entries)
+            recovered += len(entries)
+        return recovered
+
+    def flush(self):
+        """Write everything queued so far; returns the number of reports newly stored"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, []
+                pending_reports, self._pending_reports = self._pending_reports, 0
+                if self._segment is not None:
+                    self._segments.append(self._segment)
+                    self._segment = None
+                segments, self._segments = self._segments, []
+            if not entries:
+                self._release(segments)
+                return 0
+
+            try:
+                written = self._write(entries)
+            except Exception:
+                with self._lock:
+                    self._entries = entries + self._entries
+                    self._pending_reports += pending_reports
+                    self._segments = segments + self._segments
+                    self._counters['failed_flushes'] += 1
+                raise
+            self._release(segments)
+            with self._lock:
+                for entry in entries:
+                    for report in entry['reports']:
+                        self._pending_by_id.pop(report['_id'], None)
+                self._counters['flushes'] += 1
+                self._counters['reports_written'] += written
+            return written
+
+    def _index(self, entry):
+        """Make an entry's reports readable by _id until stored (caller holds the lock)"""
+        for report in entry['reports']:
+            self._pending_by_id[report['_id']] = report
+
+    def pending_report(self, report_id):
+        """A report (by ObjectId) queued here and not stored yet, or None"""
+        with self._lock:
+            return self._pending_by_id.get(report_id)
+
+    @staticmethod
+    def _write(entries):
+        """Store the entries' reports and apply the increments of entries with newly stored reports"""
+        docs = [doc for entry in entries for doc in entry['reports']]
+        duplicates = set()
+        if docs:
+            try:
+                current_app.db.reports.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get('writeErrors', [])
+                if any(error.get('code') != DUPLICATE_KEY for error in errors):
+                    raise
+                # Stored by an earlier, interrupted flush
+                duplicates = {docs[error['index']]['_id'] for error in errors}
+
+        increments_by_user = {}
+        inserted = []
+        for entry in entries:
+            new_reports = [doc for doc in entry['reports'] if doc['_id'] not in duplicates]
+            if entry['reports'] and not new_reports:
+                continue
+            inserted.extend(new_reports)
+            totals = increments_by_user.setdefault(entry['user_id'], {})
+            for field, value in entry['increments'].items():
+                totals[field] = totals.get(field, 0) + value
+
+        User.apply_profile_increments(increments_by_user)
+        AnalyticsRollup.record(inserted)
+        invalidate_admin_cache(write=True)
+        return len(inserted)
+
+    @staticmethod
+    def _release(segments):
+        for segment in segments:
+            try:
+                os.unlink(segment.name)
+            except FileNotFoundError:
+                pass
+            segment.close()
+
+    def start(self, app):
+        """Recover leftover spill files and start the background flusher"""
+        self.recover()
+        self._thread = threading.Thread(target=self._run, args=(app,), daemon=True)
+        self._thread.start()
+
+    def stop(self, app):
+        """Stop the flusher and write what is left (spill files keep anything that fails)"""
+        self._stop.set()
+        with self._lock:
+            self._lock.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            with app.app_context():
+                self.flush()
+        except Exception as e:
+            print(f"Write-behind flush error: {e}")
+
+    def _run(self, app):
+        while not self._stop.is_set():
+            with self._lock:
+                if self._pending_reports < self.max_items:
+                    self._lock.wait(self.flush_interval)
+            if self._stop.is_set():
+                return
+            try:
+                with app.app_context():
+                    self.flush()
+            except Exception as e:
+                print(f"Write-behind flush error: {e}")
+                self._stop.wait(self.flush_interval)
+
+    def stats(self):
+        """Queue depth and flush counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['pending_entries'] = len(self._entries)
+            stats['pending_reports'] = self._pending_reports
+            stats['spill_files'] = len(self._segments) + (self._segment is not None)
+        stats['flush_interval'] = self.flush_interval
+        stats['max_items'] = self.max_items
+        return stats
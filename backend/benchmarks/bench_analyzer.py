@@ -0,0 +1,185 @@
+"""Micro-benchmarks for OriginallityAnalyzer
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_analyzer --output benchmarks/baselines/local.json
+    python -m benchmarks.bench_analyzer --compare benchmarks/baselines/local.json
+
+Reports per-stage median timings, end-to-end throughput and peak traced
+memory for each (document kind, size) case of a seeded synthetic corpus.
+With --compare, exits non-zero when any metric regressed by more than
+--threshold against the given baseline.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from app.utils.ai_analyzer import OriginallityAnalyzer, ANALYZER_VERSION
+from benchmarks.corpus import KINDS, SIZES, generate_corpus
+
+STAGES = [
+    'check_special_cases',
+    'extract_features',
+    'get_style_fingerprint',
+    'calculate_originality',
+    'calculate_style_drift',
+    'calculate_confidence',
+    'generate_suggestions'
+]
+
+# Stage differences below this many milliseconds are treated as noise
+NOISE_FLOOR_MS = 0.05
+
+
+def time_stages(text):
+    """Run the analyze_text pipeline on text, timing each stage (ms)"""
+    A = OriginallityAnalyzer
+    timings = {}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[stage] = (time.perf_counter() - start) * 1000
+        return result
+
+    if timed('check_special_cases', A.check_special_cases, text):
+        return timings
+    features = timed('extract_features', A.extract_features, text)
+    fingerprint = timed('get_style_fingerprint', A.get_style_fingerprint, text, features)
+    # calculate_originality/calculate_style_drift share one signal extraction
+    start = time.perf_counter()
+    signals = A.extract_signals(text, fingerprint, features)
+    originality = A.score_originality(signals)
+    timings['calculate_originality'] = (time.perf_counter() - start) * 1000
+    drift = timed('calculate_style_drift', A.score_style_drift, signals)
+    timed('calculate_confidence', A.calculate_confidence, text, originality, features)
+    timed('generate_suggestions', A.generate_suggestions, text, originality, drift, fingerprint, features)
+    return timings
+
+
+def measure_peak_memory(text):
+    """Peak memory traced while analyzing text (KB)"""
+    tracemalloc.start()
+    try:
+        OriginallityAnalyzer.analyze_text(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def bench_case(documents, min_time, max_runs):
+    """Benchmark one list of documents; returns the case's metrics"""
+    stage_samples = {stage: [] for stage in STAGES}
+    for text in documents:
+        for stage, ms in time_stages(text).items():
+            stage_samples[stage].append(ms)
+
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while runs < max_runs and (runs < 3 or elapsed < min_time):
+        for text in documents:
+            OriginallityAnalyzer.analyze_text(text)
+        runs += 1
+        elapsed = time.perf_counter() - start
+
+    return {
+        'docs_per_sec': round(runs * len(documents) / elapsed, 2),
+        'total_ms': round(elapsed * 1000 / (runs * len(documents)), 4),
+        'peak_memory_kb': round(max(measure_peak_memory(text) for text in documents), 1),
+        'stages_ms': {
+            stage: round(statistics.median(samples), 4)
+            for stage, samples in stage_samples.items() if samples
+        }
+    }
+
+
+def run_benchmarks(seed, kinds, sizes, min_time, max_runs):
+    """Benchmark every (kind, size) case of the seeded corpus"""
+    OriginallityAnalyzer.warm_up()
+    corpus = generate_corpus(seed=seed, kinds=kinds, sizes={label: SIZES[label] for label in sizes})
+    results = {}
+    for (kind, label), documents in corpus.items():
+        case = f'{kind}/{label}'
+        results[case] = bench_case(documents, min_time, max_runs)
+        print(f"{case:<20} {results[case]['docs_per_sec']:>10.2f} docs/s "
+              f"{results[case]['total_ms']:>10.3f} ms/doc {results[case]['peak_memory_kb']:>10.1f} KB peak")
+    return {
+        'meta': {
+            'analyzer_version': ANALYZER_VERSION,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': datetime.utcnow().isoformat()
+        },
+        'results': results
+    }
+
+
+def compare(baseline, current, threshold):
+    """List of regressions of current against baseline beyond threshold (fraction)"""
+    regressions = []
+
+    def check(case, metric, old, new, higher_is_worse=True, floor=0.0):
+        if not old:
+            return
+        change = (new - old) / old if higher_is_worse else (old - new) / old
+        if change > threshold and abs(new - old) > floor:
+            regressions.append(f'{case} {metric}: {old} -> {new} ({change:+.0%})')
+
+    for case, new in current['results'].items():
+        old = baseline.get('results', {}).get(case)
+        if old is None:
+            continue
+        check(case, 'docs_per_sec', old['docs_per_sec'], new['docs_per_sec'], higher_is_worse=False)
+        check(case, 'total_ms', old['total_ms'], new['total_ms'], floor=NOISE_FLOOR_MS)
+        check(case, 'peak_memory_kb', old['peak_memory_kb'], new['peak_memory_kb'])
+        for stage, ms in new['stages_ms'].items():
+            if stage in old['stages_ms']:
+                check(case, stage, old['stages_ms'][stage], ms, floor=NOISE_FLOOR_MS)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark OriginallityAnalyzer')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=list(KINDS))
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES))
+    parser.add_argument('--min-time', type=float, default=0.5, help='Seconds to spend per case')
+    parser.add_argument('--max-runs', type=int, default=200)
+    parser.add_argument('--output', help='Write results to this JSON file (a new baseline)')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed regression, e.g. 0.2 for 20%%')
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.seed, args.kinds, args.sizes, args.min_time, args.max_runs)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        baseline_version = baseline.get('meta', {}).get('analyzer_version')
+        if baseline_version != ANALYZER_VERSION:
+            print(f"Warning: baseline is from analyzer {baseline_version}, this is {ANALYZER_VERSION}; "
+                  f"differences include analyzer changes")
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import random
+
+# Document sizes exercised by the benchmarks, in bytes
+SIZES = {
+    '100B': 100,
+    '1KB': 1000,
+    '10KB': 10000,
+    '100KB': 100000,
+    '1MB': 1000000
+}
+
+KINDS = ('casual', 'formal', 'copyrighted')
+
+CASUAL_WORDS = (
+    "i you we my me it's don't can't i'm like just really honestly lol tbh kinda "
+    "yeah so anyway the a and but then got went saw had was fun weird cool "
+    "dog coffee weekend friend phone game movie pizza bus class homework"
+).split()
+
+FORMAL_WORDS = (
+    "the of and to in is that for as with by this which are be from these their "
+    "analysis framework significant furthermore moreover therefore consequently "
+    "however evidence approach demonstrates substantial implications research "
+    "methodology considered established policy economic development outcome"
+).split()
+
+FORMAL_OPENERS = [
+    'Furthermore,', 'Moreover,', 'In conclusion,', 'It is worth noting that',
+    'Consequently,', 'Therefore,', 'It is evident that', 'Ultimately,'
+]
+
+CASUAL_ENDINGS = ['.', '.', '.', '!', '?', '...']
+
+# Inserted into "copyrighted" documents so check_special_cases fires (each must match
+# SPECIAL_CASE_PATTERNS: a quoted passage is diluted below the known-text threshold)
+SPECIAL_SNIPPETS = [
+    'All rights reserved.',
+    '© 2019 Example Press.',
+    'Copyright 2021 by the publisher.',
+    'This work is licensed under a public license.'
+]
+
+
+def make_sentence(rnd, kind):
+    """One synthetic sentence in the style of `kind`"""
+    if kind == 'casual':
+        words = [rnd.choice(CASUAL_WORDS) for _ in range(rnd.randint(3, 12))]
+        return ' '.join(words).capitalize() + rnd.choice(CASUAL_ENDINGS)
+    words = [rnd.choice(FORMAL_WORDS) for _ in range(rnd.randint(14, 30))]
+    if rnd.random() < 0.3:
+        return rnd.choice(FORMAL_OPENERS) + ' ' + ' '.join(words) + '.'
+    return ' '.join(words).capitalize() + '.'
+
+
+def make_document(rnd, kind, size):
+    """Synthetic document of roughly `size` bytes"""
+    base_kind = 'formal' if kind == 'copyrighted' else kind
+    paragraphs = []
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = make_sentence(rnd, base_kind)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+        if len(sentences) >= rnd.randint(3, 7):
+            paragraphs.append(' '.join(sentences))
+            length += 1
+            sentences = []
+    if sentences:
+        paragraphs.append(' '.join(sentences))
+    text = '\n\n'.join(paragraphs)[:size]
+
+    if kind == 'copyrighted':
+        # Near the end, so the special-case scan reads the whole document
+        snippet = rnd.choice(SPECIAL_SNIPPETS)
+        text = text[:max(size - len(snippet) - 1, 0)] + ' ' + snippet
+    return text
+
+
+def generate_corpus(seed=1234, kinds=KINDS, sizes=SIZES, docs_per_case=3):
+    """Deterministic corpus: {(kind, size_label): [documents]}"""
+    rnd = random.Random(seed)
+    return {
+        (kind, label): [make_document(rnd, kind, size) for _ in range(docs_per_case)]
+        for kind in kinds
+        for label, size in sizes.items()
+    }
@@ -0,0 +1,18 @@
+# gunicorn settings, read automatically when gunicorn starts in this directory
+import os
+
+wsgi_app = 'run:app'
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+# Threaded workers: per-process admission control, caches and the job pool all assume a
+# worker serves several requests at once (sync workers serve one). Worker count comes
+# from WEB_CONCURRENCY, which gunicorn reads itself
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+
+def post_worker_init(worker):
+    """Start the job queue workers in each server process once the app is loaded"""
+    job_workers = getattr(worker.wsgi, 'job_workers', None)
+    if job_workers is not None:
+        job_workers.start()
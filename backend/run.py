@@ -6,4 +6,7 @@ app = create_app()
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    # With the reloader on, only the child process serves requests
+    if hasattr(app, 'job_workers') and (not debug or os.getenv('WERKZEUG_RUN_MAIN') == 'true'):
+        app.job_workers.start()
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,40 @@
+import mongomock
+import mongomock.collection
+import pytest
+
+
+def _drop_unsupported_bulk_options(add):
+    # pymongo 4.x passes sort= to bulk operations, which mongomock doesn't accept
+    def wrapper(self, *args, **kwargs):
+        kwargs.pop('sort', None)
+        return add(self, *args, **kwargs)
+    return wrapper
+
+
+for _name in ('add_update', 'add_replace', 'add_delete'):
+    setattr(
+        mongomock.collection.BulkOperationBuilder, _name,
+        _drop_unsupported_bulk_options(getattr(mongomock.collection.BulkOperationBuilder, _name))
+    )
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """App backed by an in-memory mongomock database, with no background workers"""
+    import app as app_package
+    monkeypatch.setenv('JWT_SECRET', 'test-secret-' + 'x' * 32)
+    monkeypatch.setenv('JOB_WORKERS', '0')
+    monkeypatch.setenv('TIMING_SAMPLE_RATE', '0')
+    monkeypatch.setenv('WRITE_BEHIND_DIR', str(tmp_path / 'write_behind'))
+    monkeypatch.setattr(app_package, 'MongoClient', mongomock.MongoClient)
+    application = app_package.create_app()
+    application.config['TESTING'] = True
+    with application.app_context():
+        yield application
+
+
+@pytest.fixture
+def user_id(app):
+    from app.models.user import User
+    user_id, _ = User.create_user('alice', 'alice@example.com', 'secret1')
+    return user_id
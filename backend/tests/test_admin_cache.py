@@ -0,0 +1,115 @@
+import threading
+import time
+from app.utils.admin_cache import ResponseCache
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResponseCache(ttl_seconds=30)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'value', True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)[0]))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ['value'] * 20
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] + stats['waits'] >= 19
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = ResponseCache(ttl_seconds=10)
+    values = iter(['first', 'second'])
+    compute = lambda: (next(values), True)
+
+    assert cache.get_or_compute('k', compute) == ('first', 0.0)
+    now[0] += 4
+    assert cache.get_or_compute('k', compute) == ('first', 4.0)
+    now[0] += 6
+    assert cache.get_or_compute('k', compute)[0] == 'second'
+
+
+def test_uncacheable_results_are_not_stored():
+    cache = ResponseCache()
+    values = iter([('error', False), ('ok', True)])
+    assert cache.get_or_compute('k', lambda: next(values))[0] == 'error'
+    assert cache.get_or_compute('k', lambda: next(values))[0] == 'ok'
+
+
+def test_invalidate_drops_entries_and_in_flight_results():
+    cache = ResponseCache()
+    cache.get_or_compute('a', lambda: ('old', True))
+
+    def compute_during_invalidation():
+        cache.invalidate()
+        return 'stale', True
+
+    cache.invalidate()
+    assert cache.get_or_compute('a', compute_during_invalidation)[0] == 'stale'
+    # Computed across an invalidation, so it was not stored
+    assert cache.get_or_compute('a', lambda: ('fresh', True))[0] == 'fresh'
+    assert cache.stats()['size'] == 1
+
+
+def test_size_is_bounded_least_recently_used_first():
+    cache = ResponseCache(max_entries=2)
+    for key in ('a', 'b'):
+        cache.get_or_compute(key, lambda: (key, True))
+    cache.get_or_compute('a', lambda: ('unused', True))
+    cache.get_or_compute('c', lambda: ('c', True))
+    assert cache.get_or_compute('a', lambda: ('recomputed', True))[0] == 'a'
+    assert cache.get_or_compute('b', lambda: ('recomputed', True))[0] == 'recomputed'
+
+
+def test_admin_views_are_cached_until_a_user_is_deleted(app, user_id):
+    from flask_jwt_extended import create_access_token
+    from app.models.user import User
+    admin_id, _ = User.create_user('root', 'root@example.com', 'secret1', role='admin')
+    headers = {'Authorization': f'Bearer {create_access_token(identity=admin_id)}'}
+    client = app.test_client()
+
+    first = client.get('/api/admin/analytics', headers=headers)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'].startswith('private, max-age=')
+    assert client.get('/api/admin/analytics', headers=headers).get_data() == first.get_data()
+    assert app.admin_cache.stats()['hits'] == 1
+
+    assert client.delete(f'/api/admin/users/{user_id}', headers=headers).status_code == 200
+    client.get('/api/admin/analytics', headers=headers)
+    assert app.admin_cache.stats()['misses'] == 2
+
+
+def test_zero_ttl_computes_concurrent_requests_in_parallel():
+    cache = ResponseCache(ttl_seconds=0)
+    overlap = threading.Barrier(4, timeout=5)
+
+    def compute():
+        # Every caller computes at once; a serialized cache would break the barrier
+        overlap.wait()
+        return 'value', True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)[0]))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ['value'] * 4
+    stats = cache.stats()
+    assert stats['size'] == 0 and stats['waits'] == 0
@@ -0,0 +1,46 @@
+import pytest
+from app.utils import admission
+from app.utils.admission import AdmissionController, AdmissionRejected
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission.time, 'monotonic', fake.monotonic)
+    return fake
+
+
+def test_completion_history_stays_bounded(clock):
+    controller = AdmissionController(max_cost=10000, base_cost=0)
+    for _ in range(10000):
+        controller.release(controller.acquire(100))
+        clock.now += 0.01
+    assert len(controller._completions) == AdmissionController.THROUGHPUT_WINDOW
+
+
+def test_throughput_covers_only_the_window(clock):
+    controller = AdmissionController(max_cost=10000, base_cost=0)
+    for _ in range(5):
+        controller.release(controller.acquire(200))
+    assert controller.stats()['throughput_per_sec'] == 100.0
+
+    clock.now += AdmissionController.THROUGHPUT_WINDOW + 1
+    assert controller.stats()['throughput_per_sec'] == 0.0
+
+
+def test_large_requests_leave_room_for_small_ones(clock):
+    controller = AdmissionController(max_cost=1000, small_request_cost=100, large_share=0.5,
+                                     max_queue=0, base_cost=0)
+    controller.acquire(500)
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(200)
+    controller.acquire(50)
+    assert controller.stats()['in_flight_cost'] == 550
@@ -0,0 +1,74 @@
+import os
+import pytest
+from app.utils.ai_analyzer import KNOWN_TEXTS_DIR, OriginallityAnalyzer
+from app.utils.batch_scorer import BatchScorer
+from app.utils.incremental_analyzer import IncrementalAnalyzer
+from app.utils.stream_analyzer import StreamingAnalyzer
+
+with open(os.path.join(KNOWN_TEXTS_DIR, 'gettysburg_address.txt'), encoding='utf-8') as f:
+    GETTYSBURG = f.read().split('\n\n')
+
+OPENING = (
+    "I visited the battlefield last summer with my grandfather, who had wanted to see it for years. "
+    "We walked the whole ridge before lunch and he kept stopping to read the plaques.\n\n"
+    "He told me the speech everyone remembers was only a couple of minutes long. "
+    "Standing there, I copied out the part he liked best:"
+)
+CLOSING = (
+    "Honestly I didn't get why it mattered so much to him until later that night. "
+    "We talked about his own father, and about how short speeches can stick with you.\n\n"
+    "Next year I want to go back in the fall, when it's quieter, and maybe bring my little brother too."
+)
+
+DOCUMENTS = {
+    # One quoted paragraph: a known section, but under the threshold for the whole essay
+    'partly_quoted': '\n\n'.join([OPENING, GETTYSBURG[2], CLOSING]),
+    # Mostly quoted: a known-text special case however it is analyzed
+    'mostly_quoted': '\n\n'.join([OPENING, *GETTYSBURG[1:]]),
+    'original': '\n\n'.join([OPENING, CLOSING])
+}
+
+
+def all_results(text):
+    incremental, _, _ = IncrementalAnalyzer().analyze('owner', text)
+    return {
+        'full': OriginallityAnalyzer.analyze_text(text),
+        'batch': BatchScorer.analyze_texts([text])[0],
+        'incremental': incremental,
+        'streaming': StreamingAnalyzer(max_section_chars=300).analyze_text(text)
+    }
+
+
+def summary(result):
+    known_text = result.get('known_text') or {}
+    return (
+        result['originality_score'], result['style_drift'], result['confidence'],
+        result.get('special_case'), known_text.get('overlap'), known_text.get('sources')
+    )
+
+
+@pytest.mark.parametrize('name', sorted(DOCUMENTS))
+def test_every_path_agrees(name):
+    results = all_results(DOCUMENTS[name])
+    expected = summary(results['full'])
+    for path, result in results.items():
+        assert summary(result) == expected, path
+
+
+def test_one_quoted_paragraph_is_not_a_special_case():
+    for result in all_results(DOCUMENTS['partly_quoted']).values():
+        assert result.get('special_case') is None
+        assert 0 < result['known_text']['overlap'] < 50
+
+
+def test_mostly_quoted_text_is_a_special_case():
+    for result in all_results(DOCUMENTS['mostly_quoted']).values():
+        assert result['special_case'] == 'known_text'
+        assert result['known_text']['sources'][0] == 'gettysburg_address.txt'
+
+
+def test_incremental_edit_that_removes_the_quote_clears_it():
+    analyzer = IncrementalAnalyzer()
+    _, draft_id, _ = analyzer.analyze('owner', DOCUMENTS['mostly_quoted'])
+    edited, _, _ = analyzer.analyze('owner', DOCUMENTS['original'], draft_id)
+    assert summary(edited) == summary(OriginallityAnalyzer.analyze_text(DOCUMENTS['original']))
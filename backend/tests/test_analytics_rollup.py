@@ -0,0 +1,62 @@
+from datetime import datetime
+from app.models.analytics import AnalyticsRollup, score_bucket
+from app.models.report import Report
+from app.models.user import User
+
+DAY_ONE = datetime(2026, 3, 1, 9, 0)
+DAY_TWO = datetime(2026, 3, 2, 17, 30)
+
+
+def add_reports(user_id, dated_scores):
+    reports = []
+    for created_at, score in dated_scores:
+        report = Report.build_report(user_id, 'text', score, {}, {})
+        report['created_at'] = created_at
+        reports.append(report)
+    Report.create_reports(reports)
+
+
+def rollups(app):
+    return {day['_id']: day for day in app.db.analytics_daily.find({}, {'date': 0})}
+
+
+def test_score_buckets():
+    assert [score_bucket(s) for s in (95, 80, 79.9, 50, 20, 19.9, 0)] == [
+        'highly_original', 'highly_original', 'original', 'original', 'mixed', 'low_original', 'low_original'
+    ]
+
+
+def test_recorded_reports_match_a_rebuild(app, user_id):
+    add_reports(user_id, [(DAY_ONE, 90), (DAY_ONE, 40), (DAY_TWO, 10)])
+    day = rollups(app)['2026-03-01']
+    assert (day['count'], day['score_sum'], day['min_score'], day['max_score']) == (2, 130, 40, 90)
+    assert (day['highly_original'], day['mixed'], day.get('original', 0)) == (1, 1, 0)
+
+    recorded = rollups(app)
+    assert AnalyticsRollup.rebuild() == 2
+    rebuilt = rollups(app)
+    for key, day in recorded.items():
+        for field in ('count', 'score_sum', 'min_score', 'max_score', 'highly_original', 'mixed', 'low_original'):
+            assert day.get(field, 0) == rebuilt[key].get(field, 0), (key, field)
+
+
+def test_deleting_reports_subtracts_them(app, user_id):
+    other_id, _ = User.create_user('bob', 'bob@example.com', 'secret1')
+    add_reports(user_id, [(DAY_ONE, 90), (DAY_TWO, 10)])
+    add_reports(other_id, [(DAY_ONE, 60)])
+
+    assert Report.delete_user_reports(user_id) == 2
+
+    days = rollups(app)
+    assert (days['2026-03-01']['count'], days['2026-03-01']['score_sum']) == (1, 60)
+    assert days['2026-03-01']['highly_original'] == 0
+    assert days['2026-03-02']['count'] == 0
+    summary = AnalyticsRollup.summary()
+    assert (summary['total_analyses'], summary['average_originality'], summary['original']) == (1, 60, 1)
+
+
+def test_rebuild_drops_days_without_reports(app, user_id):
+    add_reports(user_id, [(DAY_ONE, 50), (DAY_TWO, 50)])
+    app.db.reports.delete_many({'created_at': DAY_TWO})
+    AnalyticsRollup.rebuild()
+    assert list(rollups(app)) == ['2026-03-01']
@@ -0,0 +1,42 @@
+from app.utils.ai_analyzer import OriginallityAnalyzer
+from app.utils.batch_scorer import BatchScorer
+
+TEXTS = [
+    "I wrote this over the weekend. Honestly, it wasn't easy, but I'm glad I did it!",
+    "This one trips the analyzer on purpose. It should fail alone.",
+    "Furthermore, the results were reviewed. It is worth noting that they were clear and consistent."
+]
+
+
+def fail_on_second_text(monkeypatch):
+    extract_features = OriginallityAnalyzer.extract_features
+
+    def flaky(text):
+        if text == TEXTS[1]:
+            raise RuntimeError('pathological input')
+        return extract_features(text)
+
+    monkeypatch.setattr(OriginallityAnalyzer, 'extract_features', staticmethod(flaky))
+
+
+def test_one_failing_text_does_not_fail_the_batch(monkeypatch):
+    expected = [OriginallityAnalyzer.analyze_text(text) for text in TEXTS]
+    fail_on_second_text(monkeypatch)
+
+    results = BatchScorer.analyze_texts(TEXTS)
+    assert results[1] == OriginallityAnalyzer.error_result()
+    assert [results[0], results[2]] == [expected[0], expected[2]]
+
+
+def test_batch_route_reports_every_text(app, user_id, monkeypatch):
+    from flask_jwt_extended import create_access_token
+    fail_on_second_text(monkeypatch)
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+    response = app.test_client().post('/api/analyze/batch', json={'texts': TEXTS}, headers=headers)
+    assert response.status_code == 201
+    results = response.get_json()['results']
+    assert all(result['success'] for result in results)
+    assert results[1]['suggestions'] == ['Unable to analyze text, please try again']
+    # The fallback is not cached, so the text is analyzed again next time
+    assert app.result_cache.get(TEXTS[1]) is None
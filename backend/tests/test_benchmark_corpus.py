@@ -0,0 +1,14 @@
+from app.utils.ai_analyzer import OriginallityAnalyzer
+from benchmarks.corpus import SPECIAL_SNIPPETS, generate_corpus
+
+
+def test_every_snippet_is_a_special_case():
+    for snippet in SPECIAL_SNIPPETS:
+        assert OriginallityAnalyzer.check_special_cases(snippet, known_text=None), snippet
+
+
+def test_copyrighted_documents_take_the_special_case_path():
+    corpus = generate_corpus(kinds=('copyrighted',), sizes={'1KB': 1000, '10KB': 10000})
+    for documents in corpus.values():
+        for text in documents:
+            assert OriginallityAnalyzer.analyze_text(text).get('special_case')
@@ -0,0 +1,61 @@
+from app.utils.document_stats import DocumentStats
+
+
+def paragraph_stats(text, max_vocabulary=200000):
+    document = DocumentStats(max_vocabulary=max_vocabulary)
+    for paragraph in text.split('\n\n'):
+        document.merge(DocumentStats.from_text(paragraph, max_vocabulary=max_vocabulary))
+    return document
+
+
+def test_paragraph_merge_matches_whole_document():
+    text = (
+        "I wrote this over the weekend. Honestly, it wasn't easy!\n\n"
+        "Furthermore, the results were reviewed. It is worth noting that they were clear.\n\n"
+        "We tried again... and again. Maybe next time?"
+    )
+    whole = DocumentStats.from_text(text).analyze()
+    merged = paragraph_stats(text).analyze()
+    assert merged['originality_score'] == whole['originality_score']
+    assert merged['style_fingerprint'] == whole['style_fingerprint']
+
+
+def test_subtract_undoes_merge():
+    first = DocumentStats.from_text("The first paragraph has some words. It was written quickly.")
+    second = DocumentStats.from_text("A second one follows, and it repeats words words words.")
+    document = DocumentStats().merge(first).merge(second).subtract(second)
+    assert document.analyze() == DocumentStats().merge(first).analyze()
+
+
+def test_vocabulary_stays_bounded_and_keeps_frequent_words():
+    cap = 1000
+    document = DocumentStats(max_vocabulary=cap)
+    for section in range(200):
+        words = ' '.join(f'word{section}x{i}' for i in range(50))
+        document.merge(DocumentStats.from_text(f'Recurring topic again. {words}.', max_vocabulary=cap))
+        assert len(document.word_counts) <= cap
+
+    assert document.word_counts['recurring'] == 200
+    assert document.word_counts['topic'] == 200
+    # Evicted words are still counted as unique
+    assert document.unique_words == 3 + 200 * 50
+
+
+def test_single_large_section_is_pruned():
+    text = ' '.join(f'w{i}' for i in range(5000)) + '.'
+    stats = DocumentStats.from_text(text, max_vocabulary=1000)
+    assert len(stats.word_counts) <= 1000
+    assert stats.unique_words == 5000
+
+
+def test_first_word_counter_stays_bounded():
+    cap = 1000
+    document = DocumentStats(max_vocabulary=cap)
+    for section in range(100):
+        sentences = ' '.join(f'Opener{section}x{i} starts here.' for i in range(100))
+        document.merge(DocumentStats.from_text(f'Again we go. Again we go. {sentences}', max_vocabulary=cap))
+        assert len(document.word_counts) <= cap
+        assert len(document.first_words) <= cap
+
+    # The largest count, the only one the signals read, survives pruning
+    assert max(document.first_words.values()) == document.first_words['again'] == 200
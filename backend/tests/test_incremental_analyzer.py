@@ -0,0 +1,49 @@
+import mongomock
+from app.utils.document_stats import DocumentStats
+from app.utils.incremental_analyzer import IncrementalAnalyzer
+
+DRAFT = [
+    "I wrote this over the weekend. Honestly, it wasn't easy!",
+    "Furthermore, the results were reviewed. It is worth noting that they were clear.",
+    "We tried again... and again. Maybe next time?"
+]
+
+
+def full_analysis(paragraphs):
+    return DocumentStats.from_text('\n\n'.join(paragraphs)).analyze()
+
+
+def test_edit_recomputes_only_the_changed_paragraph():
+    analyzer = IncrementalAnalyzer()
+    _, draft_id, info = analyzer.analyze('alice', '\n\n'.join(DRAFT))
+    assert info['recomputed_paragraphs'] == 3
+
+    edited = DRAFT[:2] + ["We tried once more, and it finally worked."]
+    analysis, _, info = analyzer.analyze('alice', '\n\n'.join(edited), draft_id)
+    assert (info['recomputed_paragraphs'], info['removed_paragraphs']) == (1, 1)
+    assert analysis == full_analysis(edited)
+
+
+def test_unknown_draft_without_shared_stats_is_analyzed_in_full():
+    _, draft_id, _ = IncrementalAnalyzer().analyze('alice', '\n\n'.join(DRAFT))
+    _, _, info = IncrementalAnalyzer().analyze('alice', '\n\n'.join(DRAFT), draft_id)
+    assert info['recomputed_paragraphs'] == 3
+
+
+def test_another_worker_continues_the_draft_from_shared_stats():
+    collection = mongomock.MongoClient().db.paragraph_stats
+    first, second = IncrementalAnalyzer(collection=collection), IncrementalAnalyzer(collection=collection)
+    _, draft_id, _ = first.analyze('alice', '\n\n'.join(DRAFT))
+
+    edited = DRAFT[:2] + ["We tried once more, and it finally worked."]
+    analysis, _, info = second.analyze('alice', '\n\n'.join(edited), draft_id)
+    assert info['recomputed_paragraphs'] == 1
+    assert analysis == full_analysis(edited)
+    assert collection.count_documents({}) == 4
+
+
+def test_shared_stats_are_scoped_to_their_owner():
+    collection = mongomock.MongoClient().db.paragraph_stats
+    IncrementalAnalyzer(collection=collection).analyze('alice', '\n\n'.join(DRAFT))
+    _, _, info = IncrementalAnalyzer(collection=collection).analyze('bob', '\n\n'.join(DRAFT))
+    assert info['recomputed_paragraphs'] == 3
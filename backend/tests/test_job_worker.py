@@ -0,0 +1,40 @@
+from bson.objectid import ObjectId
+from app.utils.job_worker import JobWorkerPool, job_report_id
+
+TEXTS = [
+    "I walked to the market this morning and bought far too many apples again.",
+    "The committee will reconvene next week to review the revised budget proposal."
+]
+
+
+def test_report_ids_are_stable_and_keep_the_job_timestamp():
+    job_id = ObjectId()
+    assert job_report_id(job_id, 0) == job_report_id(str(job_id), 0)
+    assert job_report_id(job_id, 0) != job_report_id(job_id, 1)
+    assert job_report_id(job_id, 0).generation_time == job_id.generation_time
+
+
+def test_retried_job_stores_and_counts_reports_once(app, user_id):
+    pool = JobWorkerPool(app, workers=0)
+    job = {'_id': ObjectId(), 'kind': 'batch', 'texts': TEXTS, 'user_id': ObjectId(user_id)}
+
+    _, first_ids = pool._execute(job)
+    # A second worker picking the job up after the lease expired
+    _, retry_ids = pool._execute(job)
+
+    assert retry_ids == first_ids
+    assert app.db.reports.count_documents({}) == len(TEXTS)
+    assert app.db.users.find_one({'_id': ObjectId(user_id)})['analysis_count'] == len(TEXTS)
+    assert app.db.analytics_daily.find_one()['count'] == len(TEXTS)
+
+
+def test_retry_counts_only_reports_missing_after_a_partial_write(app, user_id):
+    pool = JobWorkerPool(app, workers=0)
+    job = {'_id': ObjectId(), 'kind': 'batch', 'texts': TEXTS, 'user_id': ObjectId(user_id)}
+    pool._execute(job)
+    app.db.reports.delete_one({'_id': job_report_id(job['_id'], 1)})
+
+    pool._execute(job)
+
+    assert app.db.reports.count_documents({}) == len(TEXTS)
+    assert app.db.users.find_one({'_id': ObjectId(user_id)})['analysis_count'] == len(TEXTS) + 1
@@ -0,0 +1,91 @@
+import os
+import threading
+from app.utils.known_texts import KnownTextIndex, LazyKnownTextIndex
+
+QUOTE = "the quick brown fox jumps over the lazy dog while the cat sleeps in the warm sun"
+
+
+def write_texts(text_dir, content):
+    text_dir.mkdir(exist_ok=True)
+    (text_dir / 'fable.txt').write_text(content, encoding='utf-8')
+
+
+def test_same_size_edit_rebuilds_the_saved_index(tmp_path):
+    text_dir, index_dir = tmp_path / 'texts', tmp_path / 'index'
+    write_texts(text_dir, QUOTE)
+    assert KnownTextIndex.load_or_build(text_dir, index_dir).match(QUOTE)['overlap'] == 100.0
+
+    edited = QUOTE.replace('quick brown fox', 'quick green elk')
+    assert len(edited) == len(QUOTE)
+    mtime_ns = (text_dir / 'fable.txt').stat().st_mtime_ns
+    write_texts(text_dir, edited)
+    # An edit moves the mtime; pin it apart in case the clock didn't tick
+    os.utime(text_dir / 'fable.txt', ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    index = KnownTextIndex.load_or_build(text_dir, index_dir)
+    assert index.match(edited)['overlap'] == 100.0
+    assert index.match('the quick brown fox jumps over the lazy dog') is None
+
+
+def test_current_index_loads_without_reading_the_texts(tmp_path, monkeypatch):
+    text_dir, index_dir = tmp_path / 'texts', tmp_path / 'index'
+    write_texts(text_dir, QUOTE)
+    KnownTextIndex.load_or_build(text_dir, index_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('reference texts were rebuilt')
+
+    monkeypatch.setattr(KnownTextIndex, 'build', fail)
+    assert KnownTextIndex.load_or_build(text_dir, index_dir).match(QUOTE)['overlap'] == 100.0
+
+
+def test_concurrent_loads_of_a_stale_index_build_it_once(tmp_path, monkeypatch):
+    text_dir, index_dir = tmp_path / 'texts', tmp_path / 'index'
+    write_texts(text_dir, QUOTE)
+    builds = []
+    build = KnownTextIndex.build.__func__
+
+    def counting_build(cls, *args, **kwargs):
+        builds.append(1)
+        return build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(KnownTextIndex, 'build', classmethod(counting_build))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(KnownTextIndex.load_or_build(text_dir, index_dir)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(builds) == 1
+    assert [index.match(QUOTE)['overlap'] for index in results] == [100.0] * 8
+
+
+def test_lazy_index_touches_nothing_until_first_use(tmp_path):
+    text_dir, index_dir = tmp_path / 'texts', tmp_path / 'index'
+    write_texts(text_dir, QUOTE)
+    lazy = LazyKnownTextIndex(str(text_dir), str(index_dir))
+    assert not index_dir.exists()
+
+    assert lazy.match(QUOTE)['sources'] == ['fable.txt']
+    assert (index_dir / 'manifest.json').exists()
+
+
+def test_paragraph_coverage_adds_up_to_the_document_match(tmp_path):
+    text_dir = tmp_path / 'texts'
+    write_texts(text_dir, QUOTE)
+    index = KnownTextIndex.build(str(text_dir))
+    paragraphs = ["My own opening words come first here.", QUOTE, "And then a closing line of mine."]
+
+    covered, total, sources = 0, 0, {}
+    for paragraph in paragraphs:
+        words, count, matched = index.coverage(paragraph)
+        covered += words
+        total += count
+        for name, shingles in matched.items():
+            sources[name] = sources.get(name, 0) + shingles
+
+    merged = KnownTextIndex.merged_match(covered, total, sources)
+    whole = index.match('\n\n'.join(paragraphs))
+    assert merged['overlap'] == whole['overlap']
+    assert merged['sources'] == whole['sources']
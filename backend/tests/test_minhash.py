@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from app.utils.minhash import MinHasher, MINHASHER
+
+ESSAY = (
+    "Last summer my grandmother taught me how to bake bread in her tiny kitchen. We started before sunrise, "
+    "measuring flour by the handful because she never trusted a scale. She told me stories about the bakery "
+    "her father ran after the war, and how the whole street woke up to the smell of his rye loaves. By noon "
+    "the dough had risen twice, the counters were dusted white, and I finally understood why she still bakes "
+    "every Sunday even though the shop down the road sells perfectly good bread."
+)
+EDITED = ESSAY.replace('tiny kitchen', 'small kitchen')
+UNRELATED = (
+    "The city council voted on Tuesday to extend the bus network into the northern suburbs. Officials expect "
+    "the new routes to open next spring, with buses every fifteen minutes during rush hour and a night service "
+    "on weekends. Residents who attended the meeting asked about bike racks, accessible stops and whether the "
+    "old depot would be rebuilt or sold to a developer."
+)
+
+
+def test_signature_is_deterministic_and_none_without_words():
+    assert MINHASHER.signature('') is None
+    assert MINHASHER.signature('... !!!') is None
+    signature = MINHASHER.signature(ESSAY)
+    assert signature.dtype == np.uint32 and len(signature) == MINHASHER.num_perm
+    assert np.array_equal(signature, MinHasher().signature(ESSAY))
+    assert np.array_equal(MinHasher.from_bytes(MinHasher.to_bytes(signature)), signature)
+
+
+def test_chunked_hashing_matches_a_single_pass(monkeypatch):
+    whole = MINHASHER.signature(ESSAY)
+    monkeypatch.setattr(MinHasher, 'CHUNK', 7)
+    assert np.array_equal(MINHASHER.signature(ESSAY), whole)
+
+
+def test_near_duplicates_share_band_keys_and_unrelated_texts_do_not():
+    essay, edited, unrelated = (MINHASHER.signature(text) for text in (ESSAY, EDITED, UNRELATED))
+    assert MinHasher.similarity(essay, edited) > 0.7
+    assert MinHasher.similarity(essay, unrelated) < 0.1
+
+    keys = set(MINHASHER.band_keys(essay))
+    assert len(keys) == MINHASHER.bands
+    assert keys & set(MINHASHER.band_keys(edited))
+    assert not keys & set(MINHASHER.band_keys(unrelated))
+    assert all(-2 ** 63 <= key < 2 ** 63 for key in keys)
+
+
+def test_bands_must_divide_the_signature():
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=100, bands=16)
+
+
+def test_similar_reports_are_found_within_the_owners_reports(app, user_id):
+    from flask_jwt_extended import create_access_token
+    from app.models.user import User
+    bob_id, _ = User.create_user('bob', 'bob@example.com', 'secret1')
+    admin_id, _ = User.create_user('root', 'root@example.com', 'secret1', role='admin')
+    headers = {name: {'Authorization': f'Bearer {create_access_token(identity=identity)}'}
+               for name, identity in (('alice', user_id), ('bob', bob_id), ('admin', admin_id))}
+    client = app.test_client()
+
+    def submit(user, text):
+        response = client.post('/api/analyze/text', json={'text': text}, headers=headers[user])
+        assert response.status_code == 201
+        return response.get_json()
+
+    original = submit('alice', ESSAY)
+    submit('alice', UNRELATED)
+    copy = submit('bob', EDITED)
+    # Bob's copy is not flagged against another user's report
+    assert copy['duplicate_of'] is None
+    assert submit('alice', EDITED)['duplicate_of']['report_id'] == original['report_id']
+
+    def similar(user, report_id):
+        response = client.get(f'/api/analyze/report/{report_id}/similar', headers=headers[user])
+        return response.status_code, response.get_json()
+
+    status, body = similar('alice', original['report_id'])
+    assert status == 200 and body['indexed']
+    assert {match['user_id'] for match in body['similar']} == {user_id}
+    assert len(body['similar']) == 1
+
+    _, body = similar('admin', original['report_id'])
+    assert {match['user_id'] for match in body['similar']} == {user_id, bob_id}
+
+    assert similar('bob', original['report_id'])[0] == 403
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+import pytest
+from bson.objectid import ObjectId
+from app.utils.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, fetch_page, iter_pages, page_size
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def items(app):
+    # Groups of three documents share a created_at, so _id has to break the ties
+    app.db.items.insert_many([
+        {'_id': ObjectId(), 'created_at': START + timedelta(seconds=i // 3), 'n': i} for i in range(25)
+    ])
+    return app.db.items
+
+
+def test_cursor_round_trip():
+    document = {'created_at': datetime(2026, 5, 1, 8, 30, 15, 123000), '_id': ObjectId()}
+    assert decode_cursor(encode_cursor(document)) == (document['created_at'], document['_id'])
+
+
+@pytest.mark.parametrize('cursor', ['', 'not a cursor', 'WyIyMDI2Il0', encode_cursor({'created_at': START, '_id': 'x' * 24})])
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_page_size_is_clamped():
+    assert page_size(None) == 20
+    assert page_size(0) == 1
+    assert page_size(10 ** 6) == MAX_PAGE_SIZE
+
+
+def test_pages_cover_every_document_once_in_keyset_order(items):
+    seen = []
+    cursor = None
+    while True:
+        documents, cursor = fetch_page(items, {}, limit=4, cursor=cursor)
+        seen.extend(documents)
+        if cursor is None:
+            break
+    expected = sorted(items.find({}), key=lambda d: (d['created_at'], d['_id']), reverse=True)
+    assert [d['_id'] for d in seen] == [d['_id'] for d in expected]
+
+
+def test_last_full_page_has_no_next_cursor(items):
+    documents, cursor = fetch_page(items, {}, limit=25)
+    assert len(documents) == 25 and cursor is None
+
+
+def test_new_documents_do_not_shift_later_pages(items):
+    first, cursor = fetch_page(items, {}, limit=5)
+    items.insert_one({'created_at': START + timedelta(days=1), 'n': 'new'})
+    second, _ = fetch_page(items, {}, limit=5, cursor=cursor)
+    assert second[0]['n'] == first[-1]['n'] - 1
+
+
+def test_iter_pages_respects_the_query(items):
+    pages = list(iter_pages(items, {'n': {'$lt': 10}}, limit=3))
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+
+
+def test_history_rejects_a_bad_cursor(app, user_id):
+    from flask_jwt_extended import create_access_token
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    response = app.test_client().get('/api/analyze/history?cursor=bogus', headers=headers)
+    assert response.status_code == 400
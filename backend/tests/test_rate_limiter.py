@@ -0,0 +1,61 @@
+import pytest
+from app.utils import rate_limiter as rate_limiter_module
+from app.utils.rate_limiter import RateLimitBackend, RateLimiter, SharedMemoryRateLimiter, gcra_step
+
+
+def run(arrival, now, count, max_requests=5, time_window=60):
+    decisions = []
+    for _ in range(count):
+        allowed, arrival, wait = gcra_step(arrival, now, max_requests, time_window)
+        decisions.append((allowed, wait))
+    return decisions, arrival
+
+
+def test_a_full_bucket_allows_max_requests_at_once():
+    decisions, arrival = run(100.0, 100.0, 6)
+    assert [allowed for allowed, _ in decisions] == [True] * 5 + [False]
+    assert arrival == 160.0
+    # The next token arrives one interval (60 / 5 s) after the first request
+    assert decisions[-1][1] == pytest.approx(12.0)
+
+
+def test_tokens_refill_one_interval_at_a_time():
+    _, arrival = run(100.0, 100.0, 5)
+    assert gcra_step(arrival, 111.9, 5, 60)[0] is False
+    allowed, arrival, _ = gcra_step(arrival, 112.0, 5, 60)
+    assert allowed
+    assert gcra_step(arrival, 112.0, 5, 60)[0] is False
+
+
+def test_an_idle_key_is_a_full_bucket_again():
+    _, arrival = run(100.0, 100.0, 5)
+    decisions, _ = run(arrival, 100.0 + 60, 5)
+    assert all(allowed for allowed, _ in decisions)
+
+
+def test_rate_limit_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(rate_limiter_module.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize('make_limiter', [
+    lambda tmp_path: RateLimiter(),
+    lambda tmp_path: SharedMemoryRateLimiter(str(tmp_path / 'limits'), slots=64)
+])
+def test_backends_follow_gcra(clock, tmp_path, make_limiter):
+    limiter = make_limiter(tmp_path)
+    assert [limiter.check('client', 3, 30)[0] for _ in range(4)] == [True, True, True, False]
+    assert limiter.check('other', 3, 30)[0]
+
+    clock[0] += 10
+    assert limiter.check('client', 3, 30) == (True, 0.0)
+    allowed, wait = limiter.check('client', 3, 30)
+    assert not allowed and wait == pytest.approx(10.0)
@@ -0,0 +1,35 @@
+from app.models.report import Report
+from app.utils.ai_analyzer import ANALYZER_VERSION
+from app.utils.rescorer import PREVIEW_CHARS, ReportRescorer
+
+SHORT_TEXT = "I wrote this short note myself after the game last night, and it was fun."
+
+
+def insert_old_reports(app, user_id):
+    reports = []
+    for content in (SHORT_TEXT, ('A much longer submission. ' * 40)[:PREVIEW_CHARS]):
+        report = Report.build_report(user_id, content, 42.0, {'ai_similarity': 58.0, 'style_drift': 1.0}, {})
+        report['analyzer_version'] = '0.9'
+        reports.append(report)
+    Report.create_reports(reports)
+    return reports[0]['_id'], reports[1]['_id']
+
+
+def test_truncated_previews_are_skipped_by_default(app, user_id):
+    short_id, preview_id = insert_old_reports(app, user_id)
+
+    totals = ReportRescorer(workers=0, run_id='test-default').run()
+
+    assert (totals['rescored'], totals['skipped']) == (1, 1)
+    assert app.db.reports.find_one({'_id': short_id})['analyzer_version'] == ANALYZER_VERSION
+    preview = app.db.reports.find_one({'_id': preview_id})
+    assert (preview['analyzer_version'], preview['originality_score']) == ('0.9', 42.0)
+
+
+def test_previews_are_rescored_when_asked(app, user_id):
+    _, preview_id = insert_old_reports(app, user_id)
+
+    totals = ReportRescorer(workers=0, rescore_previews=True, run_id='test-previews').run()
+
+    assert (totals['rescored'], totals['skipped']) == (2, 0)
+    assert app.db.reports.find_one({'_id': preview_id})['analyzer_version'] == ANALYZER_VERSION
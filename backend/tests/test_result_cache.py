@@ -0,0 +1,42 @@
+import mongomock
+from app.utils.ai_analyzer import OriginallityAnalyzer
+from app.utils.result_cache import ResultCache
+
+TEXT = 'A short paragraph that is long enough to analyze.'
+
+
+def test_results_are_served_from_both_tiers():
+    collection = mongomock.MongoClient().db.analysis_cache
+    cache = ResultCache(collection=collection)
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return {'originality_score': 80.0}
+
+    assert cache.get_or_compute(TEXT, compute) == {'originality_score': 80.0}
+    assert cache.get_or_compute('  ' + TEXT + '\n', compute) == {'originality_score': 80.0}
+    assert ResultCache(collection=collection).get(TEXT) == {'originality_score': 80.0}
+    assert calls == [TEXT]
+
+
+def test_error_fallback_is_not_cached():
+    collection = mongomock.MongoClient().db.analysis_cache
+    cache = ResultCache(collection=collection)
+    results = iter([OriginallityAnalyzer.error_result(), {'originality_score': 80.0}])
+
+    assert cache.get_or_compute(TEXT, lambda text: next(results))['analysis_error']
+    assert cache.get(TEXT) is None
+    assert collection.count_documents({}) == 0
+    # The next request analyzes again instead of replaying the failure
+    assert cache.get_or_compute(TEXT, lambda text: next(results)) == {'originality_score': 80.0}
+
+
+def test_analyzer_failure_returns_the_error_fallback(monkeypatch):
+    def fail(text):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(OriginallityAnalyzer, 'extract_features', staticmethod(fail))
+    result = OriginallityAnalyzer.analyze_text(TEXT + ' It keeps going for a while.')
+    assert result == OriginallityAnalyzer.error_result()
+    assert not ResultCache.cacheable(result)
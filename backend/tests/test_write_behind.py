@@ -0,0 +1,131 @@
+import pytest
+from bson.objectid import ObjectId
+from flask_jwt_extended import create_access_token
+from app.models.report import Report
+from app.models.user import User
+from app.utils.timing import collect_spans
+from app.utils.write_behind import WriteBehindBuffer
+
+ANALYSIS = {
+    'originality_score': 71.0,
+    'drift_details': {'ai_similarity': 29.0, 'style_drift': 4.0},
+    'style_fingerprint': {'word_count': 12, 'sentence_count': 2, 'vocabulary_diversity': 80.0,
+                          'avg_sentence_length': 6.0, 'ai_phrase_count': 0, 'unique_word_ratio': 80.0}
+}
+
+
+def report_docs(user_id, count=1):
+    return [
+        Report.build_report(user_id, 'Some submitted text.', ANALYSIS['originality_score'],
+                            ANALYSIS['drift_details'], ANALYSIS['style_fingerprint'])
+        for _ in range(count)
+    ]
+
+
+def analysis_count(app, user_id):
+    return app.db.users.find_one({'_id': ObjectId(user_id)})['analysis_count']
+
+
+def queue(buffer, user_id, count=2):
+    docs = report_docs(user_id, count)
+    for doc in docs:
+        doc['_id'] = ObjectId()
+    buffer.add(user_id, docs, User.profile_increments([ANALYSIS] * count))
+    return docs
+
+
+def crash(buffer):
+    """Drop a buffer without flushing, as a killed process would (its spill file stays)"""
+    buffer._segment.close()
+
+
+@pytest.fixture
+def spill_dir(tmp_path):
+    return str(tmp_path / 'spill')
+
+
+def test_recovered_spill_file_is_written_once(app, user_id, spill_dir):
+    first = WriteBehindBuffer(spill_dir)
+    queue(first, user_id)
+    crash(first)
+
+    second = WriteBehindBuffer(spill_dir)
+    assert second.recover() == 1
+    assert second.flush() == 2
+    assert WriteBehindBuffer(spill_dir).recover() == 0
+    assert app.db.reports.count_documents({}) == 2
+    assert analysis_count(app, user_id) == 2
+
+
+def test_replay_after_reports_were_stored_does_not_count_twice(app, user_id, spill_dir):
+    first = WriteBehindBuffer(spill_dir)
+    stored = queue(first, user_id)
+    queue(first, user_id, count=1)
+    # Crash mid-flush: the first entry's reports were inserted, nothing else happened
+    app.db.reports.insert_many([dict(doc) for doc in stored])
+    crash(first)
+
+    second = WriteBehindBuffer(spill_dir)
+    assert second.recover() == 2
+    assert second.flush() == 1
+    assert app.db.reports.count_documents({}) == 3
+    # The stored entry's increments are skipped: counters lag rather than double
+    assert analysis_count(app, user_id) == 1
+
+
+def test_fully_stored_replay_changes_nothing(app, user_id, spill_dir):
+    first = WriteBehindBuffer(spill_dir)
+    queue(first, user_id)
+    entries = list(first._entries)
+    first.flush()
+
+    first._entries = entries
+    assert first.flush() == 0
+    assert analysis_count(app, user_id) == 2
+    assert app.db.analytics_daily.find_one()['count'] == 2
+
+
+def test_spill_files_of_a_live_buffer_are_not_adopted(app, user_id, spill_dir):
+    live = WriteBehindBuffer(spill_dir)
+    queue(live, user_id)
+    assert WriteBehindBuffer(spill_dir).recover() == 0
+    assert live.flush() == 2
+
+
+def test_failed_flush_keeps_entries(app, user_id, spill_dir, monkeypatch):
+    buffer = WriteBehindBuffer(spill_dir)
+    queue(buffer, user_id)
+
+    def fail(entries):
+        raise RuntimeError('database down')
+    monkeypatch.setattr(buffer, '_write', fail)
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert buffer.stats()['pending_reports'] == 2
+
+    monkeypatch.undo()
+    assert buffer.flush() == 2
+
+
+def test_queued_report_is_readable_before_the_flush(app, user_id, spill_dir):
+    app.write_behind = WriteBehindBuffer(spill_dir)
+    (report_id,), _ = Report.save_analyses(user_id, report_docs(user_id), [ANALYSIS])
+    assert app.db.reports.count_documents({}) == 0
+
+    headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+    response = app.test_client().get(f'/api/analyze/report/{report_id}', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['report']['originality_score'] == ANALYSIS['originality_score']
+
+    app.write_behind.flush()
+    assert app.write_behind.pending_report(ObjectId(report_id)) is None
+    assert Report.get_report_by_id(report_id)['_id'] == report_id
+
+
+def test_save_analyses_times_each_call(app, user_id, spill_dir):
+    _, spans = collect_spans(Report.save_analyses, user_id, report_docs(user_id), [ANALYSIS])
+    assert {'db.report', 'db.rollup', 'db.user'} <= set(spans)
+
+    app.write_behind = WriteBehindBuffer(spill_dir)
+    _, spans = collect_spans(Report.save_analyses, user_id, report_docs(user_id), [ANALYSIS])
+    assert set(spans) == {'db.user', 'write_behind.add'}
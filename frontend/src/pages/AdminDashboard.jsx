@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { motion } from 'framer-motion';
 import { BarChart, Bar, LineChart, Line, PieChart, Pie, Cell, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { LogOut, Users, TrendingUp, Activity, Server, Zap, RefreshCw, Trash2, Eye, Search } from 'lucide-react';
@@ -6,10 +6,19 @@ import './AdminDashboard.css';
 
 const COLORS = ['#667eea', '#764ba2', '#f093fb', '#4facfe'];
 
+// Users of `more` not already in `list`, appended (pages can overlap as users sign up)
+const appendUsers = (list, more) => {
+  const seen = new Set(list.map(u => u._id));
+  return [...list, ...more.filter(u => !seen.has(u._id))];
+};
+
 export default function AdminDashboard() {
   const [user, setUser] = useState(null);
   const [analytics, setAnalytics] = useState(null);
   const [users, setUsers] = useState([]);
+  const [usersCursor, setUsersCursor] = useState(null);
+  const [loadingMoreUsers, setLoadingMoreUsers] = useState(false);
+  const morePagesLoaded = useRef(false);
   const [systemHealth, setSystemHealth] = useState(null);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('analytics');
@@ -50,7 +59,14 @@ export default function AdminDashboard() {
       });
       if (usersRes.ok) {
         const data = await usersRes.json();
-        setUsers(data.users || []);
+        const firstPage = data.users || [];
+        if (morePagesLoaded.current) {
+          // Keep the pages loaded with "Load more"; only the first page is refreshed
+          setUsers(prev => appendUsers(firstPage, prev));
+        } else {
+          setUsers(firstPage);
+          setUsersCursor(data.next_cursor || null);
+        }
       }
       
       const healthRes = await fetch('http://127.0.0.1:5000/api/admin/system-health', {
@@ -92,6 +108,28 @@ export default function AdminDashboard() {
     }
   };
 
+  const loadMoreUsers = async () => {
+    const token = localStorage.getItem('token');
+    if (!token || !usersCursor) return;
+    try {
+      setLoadingMoreUsers(true);
+      const response = await fetch(
+        `http://127.0.0.1:5000/api/admin/users?cursor=${encodeURIComponent(usersCursor)}`,
+        { headers: { 'Authorization': `Bearer ${token}` } }
+      );
+      if (response.ok) {
+        const data = await response.json();
+        morePagesLoaded.current = true;
+        setUsers(prev => appendUsers(prev, data.users || []));
+        setUsersCursor(data.next_cursor || null);
+      }
+    } catch (error) {
+      console.error('Error loading more users:', error);
+    } finally {
+      setLoadingMoreUsers(false);
+    }
+  };
+
   const handleRefresh = async () => {
     const token = localStorage.getItem('token');
     if (token) {
@@ -143,7 +181,7 @@ export default function AdminDashboard() {
           className={`nav-tab ${activeTab === 'users' ? 'active' : ''}`}
           onClick={() => setActiveTab('users')}
         >
-          <Users size={18} /> Users ({users.length})
+          <Users size={18} /> Users ({users.length}{usersCursor ? '+' : ''})
         </button>
         <button 
           className={`nav-tab ${activeTab === 'health' ? 'active' : ''}`}
@@ -337,6 +375,18 @@ export default function AdminDashboard() {
                 </tbody>
               </table>
             </motion.div>
+
+            {usersCursor && (
+              <div className="load-more">
+                <button
+                  className="refresh-btn"
+                  onClick={loadMoreUsers}
+                  disabled={loadingMoreUsers}
+                >
+                  {loadingMoreUsers ? 'Loading...' : 'Load more users'}
+                </button>
+              </div>
+            )}
           </motion.div>
         )}
 
@@ -3,6 +3,9 @@ import { motion } from 'framer-motion';
 import { Upload, X, Download, Trash2, CheckCircle, AlertCircle } from 'lucide-react';
 import './BatchAnalyzer.css';
 
+// Matches MAX_BATCH_SIZE in backend/app/routes/analyze_routes.py
+const MAX_FILES = 500;
+
 export default function BatchAnalyzer() {
   const [files, setFiles] = useState([]);
   const [analyzing, setAnalyzing] = useState(false);
@@ -26,7 +29,7 @@ export default function BatchAnalyzer() {
   const addFiles = (newFiles) => {
     const textFiles = newFiles.filter(f => f.type === 'text/plain' || f.name.endsWith('.txt'));
     const updated = [...files, ...textFiles.map((f, i) => ({ id: Date.now() + i, file: f, status: 'pending' }))];
-    setFiles(updated.slice(0, 20)); // Max 20 files
+    setFiles(updated.slice(0, MAX_FILES));
   };
 
   const handleFileChange = (e) => {
@@ -46,46 +49,50 @@ export default function BatchAnalyzer() {
     setAnalyzing(true);
     const token = localStorage.getItem('token');
     const analysisResults = [];
-
-    for (const item of files) {
-      try {
-        const text = await item.file.text();
-        
-        setFiles(prev => prev.map(f => f.id === item.id ? { ...f, status: 'analyzing' } : f));
-
-        const response = await fetch('http://127.0.0.1:5000/api/analyze/text', {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${token}`
-          },
-          body: JSON.stringify({ text })
-        });
-
-        if (response.ok) {
-          const data = await response.json();
+    setFiles(prev => prev.map(f => ({ ...f, status: 'analyzing' })));
+
+    try {
+      const texts = await Promise.all(files.map(item => item.file.text()));
+
+      // One request for the whole batch: scored together and stored in a single insert
+      const response = await fetch('http://127.0.0.1:5000/api/analyze/batch', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${token}`
+        },
+        body: JSON.stringify({ texts })
+      });
+
+      const data = response.ok ? await response.json() : null;
+
+      files.forEach((item, i) => {
+        const result = data && data.results[i];
+        if (result && result.success) {
           analysisResults.push({
             filename: item.file.name,
-            originality: data.originality_score,
+            originality: result.originality_score,
             status: 'success'
           });
-          setFiles(prev => prev.map(f => f.id === item.id ? { ...f, status: 'completed' } : f));
         } else {
           analysisResults.push({
             filename: item.file.name,
-            error: 'Analysis failed',
+            error: (result && result.message) || 'Analysis failed',
             status: 'error'
           });
-          setFiles(prev => prev.map(f => f.id === item.id ? { ...f, status: 'error' } : f));
         }
-      } catch (error) {
-        analysisResults.push({
-          filename: item.file.name,
-          error: error.message,
-          status: 'error'
-        });
-        setFiles(prev => prev.map(f => f.id === item.id ? { ...f, status: 'error' } : f));
-      }
+      });
+      setFiles(prev => prev.map((f, i) => ({
+        ...f,
+        status: analysisResults[i] && analysisResults[i].status === 'success' ? 'completed' : 'error'
+      })));
+    } catch (error) {
+      files.forEach(item => analysisResults.push({
+        filename: item.file.name,
+        error: error.message,
+        status: 'error'
+      }));
+      setFiles(prev => prev.map(f => ({ ...f, status: 'error' })));
     }
 
     setResults(analysisResults);
@@ -114,7 +121,7 @@ export default function BatchAnalyzer() {
     <div className="batch-analyzer">
       <motion.div className="batch-header" initial={{ opacity: 0 }} animate={{ opacity: 1 }}>
         <h2>📦 Batch File Analysis</h2>
-        <p>Upload up to 20 text files for simultaneous analysis</p>
+        <p>Upload up to {MAX_FILES} text files for simultaneous analysis</p>
       </motion.div>
 
       {results.length === 0 ? (
@@ -129,7 +136,7 @@ export default function BatchAnalyzer() {
           >
             <Upload size={40} />
             <h3>Drag files here or click to browse</h3>
-            <p>Supported: .txt files (Max 20 files)</p>
+            <p>Supported: .txt files (Max {MAX_FILES} files)</p>
             <input 
               type="file" 
               multiple 
@@ -146,7 +153,7 @@ export default function BatchAnalyzer() {
           {files.length > 0 && (
             <motion.div className="batch-files" initial={{ opacity: 0 }} animate={{ opacity: 1 }}>
               <div className="files-header">
-                <h3>Files to analyze ({files.length}/20)</h3>
+                <h3>Files to analyze ({files.length}/{MAX_FILES})</h3>
                 <button className="clear-btn" onClick={clearAll}>Clear All</button>
               </div>
               <div className="files-list">
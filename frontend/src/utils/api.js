@@ -41,6 +41,8 @@ export const authAPI = {
 export const analyzeAPI = {
   analyzeText: (text) =>
     api.post('/analyze/text', { text }),
+  analyzeBatch: (texts) =>
+    api.post('/analyze/batch', { texts }),
   getHistory: (limit = 10) =>
     api.get(`/analyze/history?limit=${limit}`),
   getTrend: (days = 30) =>